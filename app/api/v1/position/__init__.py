@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.services.position_service import PositionService
+from app.core.client_registry import get_position_service
 import logging
 
 router = APIRouter()
@@ -7,11 +9,13 @@ logger = logging.getLogger(__name__)
 
 @router.post("/reduce-all")
 async def reduce_all_positions(
-    position_service: PositionService = Depends(PositionService)
+    dry_run: bool = False,
+    position_service: PositionService = Depends(get_position_service)
 ):
-    """모든 해외 주식 포지션을 절반으로 줄입니다."""
+    """모든 해외 주식 포지션을 절반으로 줄입니다. (dry_run=true 이면 매도 계획만 반환)"""
     try:
-        result = position_service.reduce_all_positions_by_half()
+        # 동기 서비스이므로 스레드풀에서 실행하여 이벤트 루프를 막지 않음
+        result = await run_in_threadpool(position_service.reduce_all_positions_by_half, dry_run)
         if result["status"] == "error":
             raise HTTPException(status_code=500, detail=result["message"])
         return result
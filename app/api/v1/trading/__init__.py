@@ -1,8 +1,10 @@
 from app.core.constants import OrderType
-from fastapi import APIRouter, Depends, HTTPException
-from app.services.trading_service import TradingService
-from app.core.config import get_settings
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.services.trading_service import AsyncTradingService
+from app.core.client_registry import get_async_trading_service, get_order_tracker, get_cancel_service
+from app.services.cancel_service import BulkCancelService
+from app.core.order_tracker import OrderTracker
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,20 +13,20 @@ router = APIRouter()
 
 @router.get("/balance")
 async def get_balance(
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    balance, holdings = trading_service.get_balance()
+    balance, holdings = await trading_service.get_balance()
     return {
         "total_balance": balance,
-        "holdings": holdings.to_dict(orient='records') if not holdings.empty else []
+        "holdings": holdings.to_records()
     }
 
 @router.get("/current-price/{stock_code}")
 async def get_current_price(
     stock_code: str,
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.get_current_price(stock_code)
+    result = await trading_service.get_current_price(stock_code)
     if not result:
         raise HTTPException(status_code=404, detail="Stock not found")
     return result
@@ -32,21 +34,21 @@ async def get_current_price(
 @router.get("/hoga/{stock_code}")
 async def get_hoga(
     stock_code: str,
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.get_hoga_info(stock_code)
+    result = await trading_service.get_hoga_info(stock_code)
     if not result:
         raise HTTPException(status_code=404, detail="Hoga info not found")
     return result
 
 @router.get("/fluctuation-rank")
 async def get_fluctuation_rank(
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.get_fluctuation_rank()
+    result = await trading_service.get_fluctuation_rank()
     if not result:
         raise HTTPException(status_code=404, detail="Fluctuation rank not found")
-    return result
+    return result.to_records()
 
 @router.post("/order/buy")
 async def place_buy_order(
@@ -54,12 +56,12 @@ async def place_buy_order(
     quantity: int,
     price: float,
     order_type: str = "01",
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.place_buy_order(stock_code, quantity, price, order_type)
+    result = await trading_service.place_buy_order(stock_code, quantity, price, order_type)
     if not result:
         raise HTTPException(status_code=400, detail="Order failed")
-    return result
+    return result.get_json()
 
 @router.post("/order/sell")
 async def place_sell_order(
@@ -67,54 +69,120 @@ async def place_sell_order(
     quantity: int,
     price: float,
     order_type: str = "01",
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.place_sell_order(stock_code, quantity, price, order_type)
+    result = await trading_service.place_sell_order(stock_code, quantity, price, order_type)
     if not result:
         raise HTTPException(status_code=400, detail="Order failed")
-    return result
+    return result.get_json()
 
 @router.get("/orders")
 async def get_orders(
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.get_orders()
+    result = await trading_service.get_orders()
     if result is None:
         raise HTTPException(status_code=404, detail="Orders not found")
-    return result.to_dict(orient='records') if not result.empty else []
+    return result.to_records()
+
+@router.get("/tracked-orders")
+async def get_tracked_orders(
+    symbol: Optional[str] = None,
+    open_only: bool = True,
+    order_tracker: Optional[OrderTracker] = Depends(get_order_tracker)
+):
+    """체결통보로 추적 중인 주문 상태 (API 호출 없음)"""
+    if order_tracker is None:
+        raise HTTPException(status_code=404, detail="Order tracker is disabled")
+    return [state.to_dict() for state in order_tracker.orders(symbol, open_only=open_only)]
+
+@router.get("/tracked-orders/{order_no}")
+async def get_tracked_order(
+    order_no: str,
+    order_tracker: Optional[OrderTracker] = Depends(get_order_tracker)
+):
+    if order_tracker is None:
+        raise HTTPException(status_code=404, detail="Order tracker is disabled")
+    state = order_tracker.get(order_no)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return state.to_dict()
+
+@router.post("/orders/cancel-all")
+async def cancel_all_orders(
+    market: str = "all",
+    symbol: Optional[List[str]] = Query(None),
+    side: Optional[str] = None,
+    exchange: Optional[List[str]] = Query(None),
+    min_age_sec: Optional[float] = None,
+    dry_run: bool = False,
+    cancel_service: BulkCancelService = Depends(get_cancel_service)
+):
+    """미체결 주문 일괄 취소 (긴급 청산용)
+
+    market: all / domestic / overseas, side: buy / sell, min_age_sec: 주문 후 경과시간(초) 이상인 주문만
+    """
+    markets = {"all": ("domestic", "overseas"), "domestic": ("domestic",), "overseas": ("overseas",)}.get(market)
+    if markets is None:
+        raise HTTPException(status_code=422, detail=f"Invalid market: {market}")
+    if side not in (None, "buy", "sell"):
+        raise HTTPException(status_code=422, detail=f"Invalid side: {side}")
+    return await cancel_service.cancel_orders(
+        markets=markets,
+        symbols=symbol,
+        side=side,
+        exchanges=exchange,
+        min_age_sec=min_age_sec,
+        dry_run=dry_run,
+    )
 
 @router.post("/order/cancel")
 async def cancel_order(
     order_no: str,
     quantity: int,
     price: str = "01",
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.cancel_order(order_no, quantity, price)
+    result = await trading_service.cancel_order(order_no, quantity, price)
     if not result:
         raise HTTPException(status_code=400, detail="Cancel failed")
-    return result
+    return result.get_json()
 
 # 해외주식 관련 엔드포인트 추가
+@router.get("/overseas/orders")
+async def get_overseas_orders(
+    exchange: Optional[List[str]] = Query(None),
+    symbol: Optional[str] = None,
+    refresh: bool = False,
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
+):
+    """전체(또는 지정한) 해외 거래소의 미체결 주문을 동시에 조회하여 병합"""
+    result = await trading_service.get_all_overseas_orders(exchange, refresh)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Orders not found")
+    if symbol:
+        return [order.to_dict() for order in result if order.symbol.upper() == symbol.upper()]
+    return result.to_records()
+
 @router.get("/overseas/current-price/{exchange_code}/{stock_code}")
 async def get_current_price_overseas(
     exchange_code: str,
     stock_code: str,
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.get_current_price_overseas(exchange_code, stock_code)
+    result = await trading_service.get_current_price_overseas(exchange_code, stock_code)
     if not result:
         raise HTTPException(status_code=404, detail="Stock not found")
     return result
 
 @router.get("/overseas/balance")
 async def get_balance_overseas(
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    balance, holdings = trading_service.get_balance_overseas()
+    balance, holdings = await trading_service.get_balance_overseas()
     return {
         "total_profit_loss": balance,
-        "holdings": holdings.to_dict(orient='records') if not holdings.empty else []
+        "holdings": holdings.to_records()
     }
 
 @router.post("/overseas/order/buy")
@@ -124,12 +192,12 @@ async def place_buy_order_overseas(
     price: float,
     quantity: int,
     order_type: str = "00",
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.place_buy_order_overseas(exchange_code, stock_code, price, quantity, order_type)
+    result = await trading_service.place_buy_order_overseas(exchange_code, stock_code, price, quantity, order_type)
     if not result:
         raise HTTPException(status_code=400, detail="Order failed")
-    return result
+    return result.get_json()
 
 @router.post("/overseas/order/sell")
 async def place_sell_order_overseas(
@@ -138,21 +206,21 @@ async def place_sell_order_overseas(
     price: float,
     quantity: int,
     order_type: str = "00",
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
-    result = trading_service.place_sell_order_overseas(exchange_code, stock_code, price, quantity, order_type)
+    result = await trading_service.place_sell_order_overseas(exchange_code, stock_code, price, quantity, order_type)
     if not result:
         raise HTTPException(status_code=400, detail="Order failed")
-    return result
+    return result.get_json()
 
 @router.get("/overseas/hoga/{exchange_code}/{stock_code}")
 async def get_overseas_hoga(
     exchange_code: str,
     stock_code: str,
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
     """해외주식 호가 정보 조회"""
-    result = trading_service.get_hoga_info_overseas(exchange_code, stock_code)
+    result = await trading_service.get_hoga_info_overseas(exchange_code, stock_code)
     if not result:
         raise HTTPException(status_code=404, detail="Failed to get hoga information")
     return result
@@ -162,10 +230,10 @@ async def get_overseas_buyable_amount(
     exchange_code: str,
     stock_code: str,
     price: float,
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
     """해외주식 매수가능금액 조회"""
-    result = trading_service.get_buyable_amount_overseas(exchange_code, stock_code, price)
+    result = await trading_service.get_buyable_amount_overseas(exchange_code, stock_code, price)
     if not result:
         raise HTTPException(status_code=404, detail="Failed to get buyable amount")
     return result
@@ -174,10 +242,10 @@ async def get_overseas_buyable_amount(
 async def get_overseas_max_buy_quantity(
     exchange_code: str,
     stock_code: str,
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
     """해외주식 최대 매수 가능 수량 조회"""
-    result = trading_service.calculate_overseas_max_buy_quantity(exchange_code, stock_code)
+    result = await trading_service.calculate_overseas_max_buy_quantity(exchange_code, stock_code)
     if not result:
         raise HTTPException(status_code=404, detail="Failed to calculate max buy quantity")
     return {
@@ -192,26 +260,23 @@ async def place_overseas_market_buy(
     exchange_code: str,
     stock_code: str,
     quantity: Optional[int] = 0,  # 0이면 최대 수량으로 매수
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
     """해외주식 시장가 매수 (최우선 매도호가 사용)"""
     try:
-        # 호가 정보 조회
-        hoga_info = trading_service.get_hoga_info_overseas(exchange_code, stock_code)
-        if not hoga_info:
+        # 호가 조회 (수량이 0이면 그 호가로 최대 매수 가능 수량까지 계산)
+        context = await trading_service.prepare_overseas_order(exchange_code, stock_code, "buy", quantity)
+        if not context.hoga:
             raise HTTPException(status_code=404, detail="Failed to get hoga information")
-
-        # 수량이 0이면 최대 매수 가능 수량 계산
-        if quantity == 0:
-            quantity = trading_service.calculate_overseas_max_buy_quantity(exchange_code, stock_code)
-            if not quantity:
-                raise HTTPException(status_code=400, detail="Failed to calculate max buy quantity")
+        if not context.quantity:
+            raise HTTPException(status_code=400, detail="Failed to calculate max buy quantity")
+        quantity, price = context.quantity, context.price
 
         # 주문 실행
-        result = trading_service.place_buy_order_overseas(
+        result = await trading_service.place_buy_order_overseas(
             exchange_code=exchange_code,
             stock_code=stock_code,
-            price=hoga_info['ask_price'],
+            price=price,
             quantity=quantity,
             order_type=OrderType.LIMIT
         )
@@ -231,7 +296,7 @@ async def place_overseas_market_buy(
             "status": "success",
             "order_info": order_info,
             "quantity": quantity,
-            "price": hoga_info['ask_price']
+            "price": price
         }
 
     except HTTPException:
@@ -246,26 +311,23 @@ async def place_overseas_market_sell(
     exchange_code: str,
     stock_code: str,
     quantity: Optional[int] = 0,  # 0이면 최대 수량으로 매도
-    trading_service: TradingService = Depends(TradingService)
+    trading_service: AsyncTradingService = Depends(get_async_trading_service)
 ):
     """해외주식 시장가 매도 (최우선 매수호가 사용)"""
     try:
-        # 호가 정보 조회
-        hoga_info = trading_service.get_hoga_info_overseas(exchange_code, stock_code)
-        if not hoga_info:
+        # 호가 조회 (수량이 0이면 보유 종목도 동시에 조회)
+        context = await trading_service.prepare_overseas_order(exchange_code, stock_code, "sell", quantity)
+        if not context.hoga:
             raise HTTPException(status_code=404, detail="Failed to get hoga information")
-        
-        # 수량이 0이면 최대 매도 가능 수량 계산
-        if not quantity:
-            quantity = trading_service.calculate_overseas_max_sell_quantity(exchange_code, stock_code)
-            if not quantity:
-                raise HTTPException(status_code=400, detail="No holdings available for sell")
+        if not context.quantity:
+            raise HTTPException(status_code=400, detail="No holdings available for sell")
+        quantity, price = context.quantity, context.price
 
         # 주문 실행
-        result = trading_service.place_sell_order_overseas(
+        result = await trading_service.place_sell_order_overseas(
             exchange_code=exchange_code,
             stock_code=stock_code,
-            price=hoga_info['bid_price'],  # 최우선 매수호가
+            price=price,  # 최우선 매수호가
             quantity=quantity,
             order_type=OrderType.LIMIT  # 시장가 주문
         )
@@ -285,7 +347,7 @@ async def place_overseas_market_sell(
             "status": "success",
             "order_info": order_info,
             "quantity": quantity,
-            "price": hoga_info['bid_price']
+            "price": price
         }
 
     except HTTPException:
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Request, HTTPException
-from app.core.constants import OrderType
-from app.services.trading_service import TradingService
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from app.models.webhook import TradingViewAlert
-from app.core.exchange_codes import ExchangeCodeConverter
+from app.services.webhook_service import WebhookService, AlertProcessingError, resolve_exchange
+from app.services.webhook_queue import WebhookWorkerPool, FAILED
+from app.services.idempotency import IdempotencyIndex
+from app.core.client_registry import get_webhook_service, get_webhook_workers, get_idempotency_index
+from app.core.tracing import trace, span
 import logging
 
 # 로거 생성
@@ -11,99 +17,98 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/tradingview")
-async def tradingview_webhook(request: Request):
-    try:
-        body = await request.json()
-        logger.info(f"Received webhook data: {body}")
-        
-        # 데이터 검증
-        alert = TradingViewAlert(**body)
-        logger.info(f"Parsed alert data: {alert}")
-        
-        # 트레이딩 로직 실행
-        trading_service = TradingService()
-        
-        # TradingView exchange 코드를 내부 코드로 변환
-        exchange = ExchangeCodeConverter.from_tradingview(alert.exchange)
-        if not exchange:
-            raise ValueError(f"Invalid exchange code from TradingView: {alert.exchange}")
-        
-        upper_exchange_code = exchange.name
-        upper_symbol = alert.symbol.upper()
-        
-        # 주문 파라미터 로깅
-        logger.info(f"Placing order: timeframe={alert.timeframe}, symbol={upper_symbol}, "
-                   f"exchange={upper_exchange_code}, quantity={alert.quantity}")
-        
-        # market에 따라 주문 실행
-        if alert.market == "korea":
-            # 기존 국내 주식 로직
-            pass
-        else:  # Overseas market
-            # 호가 정보 조회
-            hoga_info = trading_service.get_hoga_info_overseas(upper_exchange_code, upper_symbol)
-            if not hoga_info:
-                raise HTTPException(status_code=404, detail="Failed to get hoga information")
+async def tradingview_webhook(
+    request: Request,
+    webhook_service: WebhookService = Depends(get_webhook_service),
+    webhook_workers: Optional[WebhookWorkerPool] = Depends(get_webhook_workers),
+    idempotency_index: IdempotencyIndex = Depends(get_idempotency_index)
+):
+    # 처리 구간별 소요시간은 응답의 timing 에 포함 (큐 사용 시 주문 구간은 알림 결과에 기록)
+    with trace("webhook") as t:
+        with span("webhook.parse"):
+            try:
+                body = await request.json()
+                logger.info(f"Received webhook data: {body}")
 
-            if alert.action == "buy":
-                # 수량이 0이면 최대 매수 가능 수량 계산
-                quantity = alert.quantity if alert.quantity > 0 else trading_service.calculate_overseas_max_buy_quantity(
-                    upper_exchange_code,
-                    upper_symbol
-                )
-                
-                if not quantity:
-                    raise HTTPException(status_code=400, detail="Failed to calculate buy quantity")
+                # 데이터 검증
+                alert = TradingViewAlert(**body)
+                resolve_exchange(alert)
+                logger.info(f"Parsed alert data: {alert}")
+            except ValueError as e:
+                logger.error(f"Validation error: {str(e)}")
+                raise HTTPException(status_code=422, detail=str(e))
 
-                # 매수 주문 실행
-                result = trading_service.place_buy_order_overseas(
-                    exchange_code=upper_exchange_code,
-                    stock_code=upper_symbol,
-                    price=hoga_info['ask_price'],
-                    quantity=quantity,
-                    order_type=OrderType.LIMIT
-                )
+        # 재전송/중복 알림은 KIS 호출 없이 원래 결과를 반환
+        key, ttl = idempotency_index.key_for(alert)
 
-            elif alert.action == "sell":
-                # 수량이 0이면 최대 매도 가능 수량 계산
-                quantity = alert.quantity if alert.quantity > 0 else trading_service.calculate_overseas_max_sell_quantity(
-                    upper_exchange_code,
-                    upper_symbol
-                )
-                
-                if not quantity:
-                    raise HTTPException(status_code=400, detail="No holdings available for sell")
+        if webhook_workers is not None:
+            queue = webhook_workers.queue
+            alert_id = idempotency_index.get(key)
+            if alert_id is not None:
+                original = await run_in_threadpool(queue.get, alert_id)
+                if original is None or original["status"] == FAILED:
+                    # 실패한 알림은 재전송 시 다시 처리 (큐의 중복 판별 키는 fail() 에서 제거됨)
+                    idempotency_index.discard(key)
+                    alert_id = None
+            duplicate = alert_id is not None
+            if not duplicate:
+                # 큐에 기록만 하고 바로 응답, 주문은 워커가 처리
+                with span("webhook.enqueue"):
+                    alert_id, duplicate = await run_in_threadpool(
+                        queue.enqueue, alert.model_dump(), key, ttl, webhook_service.net_key(alert))
+                if duplicate:
+                    original = await run_in_threadpool(queue.get, alert_id)
+                else:
+                    idempotency_index.put(key, alert_id, ttl)
+            if duplicate:
+                logger.info(f"Duplicate webhook alert ignored: {key} -> alert {alert_id}")
+                return {"status": "duplicate", "alert_id": alert_id, "original": original, "timing": t.summary()}
+            webhook_workers.notify()
+            return JSONResponse(status_code=202, content={
+                "status": "accepted", "alert_id": alert_id, "timing": t.summary()})
 
-                # 매도 주문 실행
-                result = trading_service.place_sell_order_overseas(
-                    exchange_code=upper_exchange_code,
-                    stock_code=upper_symbol,
-                    price=hoga_info['bid_price'],
-                    quantity=quantity,
-                    order_type=OrderType.LIMIT
-                )
+        # 큐를 쓰지 않는 경우: 처리 중이거나 처리된 알림의 결과(Future)를 공유
+        while True:
+            pending = idempotency_index.get(key)
+            if pending is None:
+                break
+            logger.info(f"Duplicate webhook alert ignored: {key}")
+            try:
+                return {"status": "duplicate", "original": await asyncio.shield(pending), "timing": t.summary()}
+            except asyncio.CancelledError:
+                # 원래 알림이 실패했으면 먼저 깨어난 중복 요청이 새 알림으로 처리
+                if not pending.cancelled():
+                    raise
 
-            if not result:
-                raise HTTPException(status_code=400, detail="Order failed")
+        future = asyncio.get_running_loop().create_future()
+        idempotency_index.put(key, future, ttl)
+        try:
+            result = await webhook_service.submit_alert(alert)
+            future.set_result(result)
+            return dict(result, timing=t.summary())
+        except AlertProcessingError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except ValueError as e:
+            logger.error(f"Validation error: {str(e)}")
+            raise HTTPException(status_code=422, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error processing webhook: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            if not future.done():
+                # 실패하거나 취소된 알림은 재전송 시 다시 처리되도록 키를 제거하고 기다리던 중복 요청도 풀어줌
+                idempotency_index.discard(key)
+                future.cancel()
 
-            # result 객체에서 필요한 정보만 추출
-            order_info = {
-                "rt_cd": result.get_body().rt_cd,
-                "msg_cd": result.get_body().msg_cd,
-                "msg1": result.get_body().msg1,
-                "output": result.get_body().output
-            }
-
-            return {
-                "status": "success",
-                "order_info": order_info,
-                "quantity": quantity,
-                "price": hoga_info['ask_price'] if alert.action == "buy" else hoga_info['bid_price']
-            }
-
-    except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
-        raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error processing webhook: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+@router.get("/alerts/{alert_id}")
+async def get_alert_status(
+    alert_id: int,
+    webhook_workers: Optional[WebhookWorkerPool] = Depends(get_webhook_workers)
+):
+    """큐에 접수된 알림의 처리 상태와 결과 조회"""
+    if webhook_workers is None:
+        raise HTTPException(status_code=404, detail="Webhook queue is disabled")
+    alert = await run_in_threadpool(webhook_workers.queue.get, alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return alert
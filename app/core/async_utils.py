@@ -0,0 +1,291 @@
+import asyncio
+import json
+import logging
+import time
+
+from app.core.utils import KoreaInvestAPI, BALANCE_CTX_KEYS, OVERSEAS_CTX_KEYS, MAX_PAGES, overseas_order_exchanges
+from app.core.http_client import get_async_http_client
+from app.core.rate_limiter import get_rate_limiter
+from app.core.quote_cache import get_quote_cache, get_open_orders_cache
+from app.core.order_latency import get_order_latency_stats
+from app.core.metrics import get_metrics
+from app.core.tracing import record_span
+
+logger = logging.getLogger(__name__)
+
+class AsyncKoreaInvestAPI(KoreaInvestAPI):
+    """KIS OpenAPI 비동기 클라이언트
+
+    KoreaInvestAPI 와 같은 메소드 구성을 가지며, 요청 생성/응답 해석 로직은 그대로 재사용하고
+    전송만 httpx 기반 AsyncKISHttpClient 로 처리합니다.
+    """
+
+    async def set_order_hash_key(self, headers, params):
+        url = f"{self.using_url}/uapi/hashkey"
+
+        res = await get_async_http_client().post(url, headers=headers, data=json.dumps(params))
+        rescode = res.status_code
+        if rescode == 200:
+            headers['hashkey'] = res.json()['HASH']
+        else:
+            logger.error(f"Error in set_order_hash_key: {rescode}")
+            return None
+
+    async def _url_fetch(self, url, tr_id, params, is_post=False, use_hash=False, tr_cont=""):
+        try:
+            url = f"{self.using_url}{url}"
+            headers = self._build_headers(tr_id)
+            if tr_cont:
+                headers["tr_cont"] = tr_cont
+            limiter = get_rate_limiter()
+
+            is_order = is_post and use_hash
+            started = time.perf_counter()
+            hashkey_ms = 0.0
+            if is_order and self.hashkey_mode == "sync":
+                await limiter.acquire_async(tr_id)
+                await self.set_order_hash_key(headers, params)
+                hashkey_ms = (time.perf_counter() - started) * 1000
+                record_span("kis.hashkey", started)
+
+            for attempt in range(2):
+                waiting = time.perf_counter()
+                if await limiter.acquire_async(tr_id):
+                    record_span("rate_limit_wait", waiting)
+                sent = time.perf_counter()
+                if is_post:
+                    res = await get_async_http_client().post(url, headers=headers, data=json.dumps(params))
+                else:
+                    res = await get_async_http_client().get(url, headers=headers, params=params)
+                record_span(f"kis.{tr_id}", sent)
+                if attempt == 1 or not self._is_throttled(res):
+                    break
+                self._record_response(tr_id, sent, res)
+                await limiter.on_throttled_async(tr_id)
+
+            if is_order:
+                get_order_latency_stats().record(
+                    self.hashkey_mode, (time.perf_counter() - started) * 1000, hashkey_ms)
+            api_response = self._to_api_response(res)
+            self._record_response(tr_id, sent, res, api_response)
+            return api_response
+        except Exception as e:
+            get_metrics().observe_kis_error(tr_id, e)
+            logger.error(f"API request failed: {e}")
+            return None
+
+    async def _iter_pages(self, request, ctx_keys, prefetch=False):
+        """연속 조회 응답을 페이지 순서대로 반환 (prefetch=True 이면 다음 페이지를 미리 요청)"""
+        res = await self._url_fetch(**request)
+        task = None
+        try:
+            for _ in range(MAX_PAGES):
+                next_request = self._next_page_request(request, res, ctx_keys)
+                task = asyncio.create_task(self._url_fetch(**next_request)) if prefetch and next_request else None
+                yield res
+                if next_request is None:
+                    return
+                res = await task if task else await self._url_fetch(**next_request)
+                task = None
+                request = next_request
+            logger.warning(f"Stopped paging {request['tr_id']} after {MAX_PAGES} pages")
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+
+    async def _collect_pages(self, request, ctx_keys, list_field):
+        last, rows = None, []
+        page = 0
+        async for res in self._iter_pages(request, ctx_keys):
+            page += 1
+            if res is None or not res.is_ok():
+                # 중간 페이지가 실패하면 일부만 모인 목록을 전체로 오인하지 않도록 실패 응답만 반환
+                if page > 1:
+                    logger.error(f"Paging {request['tr_id']} failed at page {page}, discarding {len(rows)} rows")
+                return res, []
+            last = res
+            rows.extend(getattr(res.get_body(), list_field, None) or [])
+        return last, rows
+
+    async def get_account_info(self):
+        url = f"{self.using_url}/uapi/account/GetAccountInfo"
+        res = await get_async_http_client().post(url, headers=self.base_headers)
+        return res.json()
+
+    async def get_current_price(self, stock_code):
+        return await get_quote_cache().get_or_fetch_async(
+            ("price", "KRX", stock_code), lambda: self._fetch_current_price(stock_code))
+
+    async def _fetch_current_price(self, stock_code):
+        res = await self._url_fetch(**self._current_price_request(stock_code))
+        return self._parse_current_price(res)
+
+    async def get_hoga_info(self, stock_code):
+        live = self._live_hoga(stock_code)
+        if live:
+            return live
+        return await get_quote_cache().get_or_fetch_async(
+            ("hoga", "KRX", stock_code), lambda: self._fetch_hoga_info(stock_code))
+
+    async def _fetch_hoga_info(self, stock_code):
+        res = await self._url_fetch(**self._hoga_info_request(stock_code))
+        return self._parse_hoga_info(res)
+
+    async def get_account_balance(self, stock_code):
+        res, rows = await self._collect_pages(self._account_balance_request(), BALANCE_CTX_KEYS, "output1")
+        return self._parse_account_balance(res, rows)
+
+    async def iter_account_balance(self, prefetch=False):
+        async for res in self._iter_pages(self._account_balance_request(), BALANCE_CTX_KEYS, prefetch):
+            yield self._parse_account_balance(res)
+
+    async def get_fluctuation_rank(self):
+        res = await self._url_fetch(**self._fluctuation_rank_request())
+        return self._parse_fluctuation_rank(res)
+
+    async def do_order(self, stock_code, order_qty=1, order_price=0, is_buy=True, order_type="01", prd_code="01"):
+        t1 = await self._url_fetch(**self._order_request(stock_code, order_qty, order_price, is_buy, order_type))
+        return self._parse_order(t1)
+
+    async def do_sell_order(self, stock_code, order_qty, order_price, order_type):
+        return await self.do_order(stock_code, order_qty, order_price, is_buy=False, order_type=order_type)
+
+    async def do_buy_order(self, stock_code, order_qty, order_price, order_type):
+        return await self.do_order(stock_code, order_qty, order_price, is_buy=True, order_type=order_type)
+
+    async def _do_cancel_revise(self, order_no, order_qty, order_price, order_branch, prd_code, order_dv, cncl_dv, qty_all_yn):
+        t1 = await self._url_fetch(**self._cancel_revise_request(order_no, order_qty, order_price, order_branch, order_dv, cncl_dv, qty_all_yn))
+        return self._parse_order(t1)
+
+    async def do_cancel_order(self, order_no, order_qty, order_price="01", order_branch="06010", prd_code="01", order_dv="00", cncl_dv="02", qty_all_yn="Y"):
+        return await self._do_cancel_revise(order_no, order_qty, order_price, order_branch, prd_code, order_dv, cncl_dv, qty_all_yn)
+
+    async def do_revise_order(self, order_no, order_qty, order_price, order_branch="06010", prd_code="01", order_dv="00", cncl_dv="02", qty_all_yn="Y"):
+        return await self._do_cancel_revise(order_no, order_qty, order_price, order_branch, prd_code, order_dv, cncl_dv, qty_all_yn)
+
+    async def get_orders(self):
+        t1, rows = await self._collect_pages(self._orders_request(), BALANCE_CTX_KEYS, "output")
+        return self._parse_orders(t1, rows)
+
+    async def iter_orders(self, prefetch=False):
+        async for t1 in self._iter_pages(self._orders_request(), BALANCE_CTX_KEYS, prefetch):
+            yield self._parse_orders(t1)
+
+    async def do_cancel_all_orders(self, skip_codes=[]):
+        orders = await self.get_orders()
+        if orders is not None:
+            # 취소 요청은 동시에 보내고 속도는 RateLimiter 가 조절
+            targets = [order for order in orders if order.symbol not in skip_codes]
+            results = await asyncio.gather(*(
+                self.do_cancel_order(order.order_no, order.cancelable_quantity, order.price, order.branch)
+                for order in targets), return_exceptions=True)
+            for order, ar in zip(targets, results):
+                logger.info(f"Cancel Order {order.order_no}: {ar}")
+
+    # 해외 주식
+
+    async def get_hoga_info_overseas(self, exchange_code: str, stock_code: str):
+        """해외주식 호가 정보 조회"""
+        live = self._live_hoga_overseas(exchange_code, stock_code)
+        if live:
+            return live
+        return await get_quote_cache().get_or_fetch_async(
+            ("hoga_overseas", exchange_code.upper(), stock_code.upper()),
+            lambda: self._fetch_hoga_info_overseas(exchange_code, stock_code))
+
+    async def _fetch_hoga_info_overseas(self, exchange_code: str, stock_code: str):
+        try:
+            t1 = await self._url_fetch(**self._hoga_info_overseas_request(exchange_code, stock_code))
+            return self._parse_hoga_info_overseas(t1)
+        except Exception as e:
+            logger.error(f"Error getting overseas hoga: {str(e)}")
+            logger.exception("Detailed error:")
+            return None
+
+    async def get_buyable_amount_overseas(self, exchange_code: str, stock_code: str, price: float):
+        try:
+            t1 = await self._url_fetch(**self._buyable_amount_overseas_request(exchange_code, stock_code, price))
+            return self._parse_buyable_amount_overseas(t1)
+        except Exception as e:
+            logger.error(f"Error getting overseas buyable amount: {e}")
+            return None
+
+    async def get_current_price_overseas(self, exchange_code, stock_code):
+        return await get_quote_cache().get_or_fetch_async(
+            ("price_overseas", exchange_code.upper(), stock_code.upper()),
+            lambda: self._fetch_current_price_overseas(exchange_code, stock_code))
+
+    async def _fetch_current_price_overseas(self, exchange_code, stock_code):
+        t1 = await self._url_fetch(**self._current_price_overseas_request(exchange_code, stock_code))
+        return self._parse_current_price_overseas(t1)
+
+    async def get_account_balance_overseas(self):
+        """해외주식 잔고 조회"""
+        res, rows = await self._collect_pages(self._account_balance_overseas_request(), OVERSEAS_CTX_KEYS, "output1")
+        return self._parse_account_balance_overseas(res, rows)
+
+    async def iter_account_balance_overseas(self, prefetch=False):
+        async for res in self._iter_pages(self._account_balance_overseas_request(), OVERSEAS_CTX_KEYS, prefetch):
+            yield self._parse_account_balance_overseas(res)
+
+    async def do_order_overseas(self, exchange_code, stock_code, price, quantity, order_type="00", prd_code="01", buy_flag=True):
+        try:
+            t1 = await self._url_fetch(**self._order_overseas_request(exchange_code, stock_code, price, quantity, order_type, buy_flag))
+            return self._parse_order(t1)
+        except Exception as e:
+            logger.error(f"Error in overseas order: {e}")
+            return None
+
+    async def do_buy_order_overseas(self, exchange_code, stock_code, price, quantity, order_type="00", prd_code="01"):
+        return await self.do_order_overseas(exchange_code, stock_code, price, quantity, order_type, prd_code, buy_flag=True)
+
+    async def do_sell_order_overseas(self, exchange_code, stock_code, price, quantity, order_type="00", prd_code="01"):
+        return await self.do_order_overseas(exchange_code, stock_code, price, quantity, order_type, prd_code, buy_flag=False)
+
+    async def do_cancel_revise_order_overseas(self, stock_code, order_no, order_qty, order_price=0, order_branch="NASD", prd_code='01', cncl_dv="02"):
+        t1 = await self._url_fetch(**self._cancel_revise_overseas_request(stock_code, order_no, order_qty, order_price, order_branch, cncl_dv))
+        return self._parse_order(t1)
+
+    async def do_cancel_order_overseas(self, stock_code, order_no, order_qty, order_price=0, order_branch="NASD", prd_code='01', cncl_dv="02"):
+        return await self.do_cancel_revise_order_overseas(stock_code, order_no, order_qty, order_price, order_branch, prd_code, cncl_dv)
+
+    # 해외주식 미체결내역[v1_해외주식-005]
+    async def get_overseas_orders(self, exchange_code="NASD"):
+        t1, rows = await self._collect_pages(self._overseas_orders_request(exchange_code), OVERSEAS_CTX_KEYS, "output")
+        return self._parse_overseas_orders(t1, rows)
+
+    async def iter_overseas_orders(self, exchange_code="NASD", prefetch=False):
+        async for t1 in self._iter_pages(self._overseas_orders_request(exchange_code), OVERSEAS_CTX_KEYS, prefetch):
+            yield self._parse_overseas_orders(t1)
+
+    async def get_all_overseas_orders(self, exchange_codes=None, refresh=False):
+        codes = overseas_order_exchanges(exchange_codes)
+        key = ("overseas_orders", codes)
+        cache = get_open_orders_cache()
+        if refresh:
+            await cache.invalidate_async(key)
+        cached = await cache.get_or_fetch_async(key, lambda: self._fetch_all_overseas_orders(codes))
+        return cached[0] if cached else None
+
+    async def _fetch_all_overseas_orders(self, codes):
+        results = await asyncio.gather(*(self.get_overseas_orders(code) for code in codes),
+                                       return_exceptions=True)
+        return self._merge_overseas_orders(codes, results)
+
+    async def overseas_do_cancel_all_orders(self, skip_codes=[]):
+        orders = await self.get_overseas_orders()
+        if orders is not None:
+            targets = [order for order in orders if order.symbol not in skip_codes]
+            results = await asyncio.gather(*(
+                self.do_cancel_order_overseas(
+                    stock_code=order.symbol,
+                    order_no=order.order_no,
+                    order_qty=order.unfilled_quantity or order.quantity,
+                    order_price=order.price,
+                    order_branch=order.exchange_code
+                ) for order in targets), return_exceptions=True)
+            for order, ar in zip(targets, results):
+                if isinstance(ar, Exception):
+                    logger.error(f"Error canceling order {order.order_no}: {str(ar)}")
+                else:
+                    logger.info(f"Cancel Order {order.order_no}: {ar}")
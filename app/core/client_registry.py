@@ -0,0 +1,196 @@
+import asyncio
+from typing import Optional
+from fastapi import Request
+from app.core.config import get_settings, get_kis_config
+from app.core.utils import KoreaInvestEnv
+from app.core.http_client import aclose_async_http_client
+from app.core.realtime import RealtimeQuoteFeed, set_realtime_feed, parse_watchlist
+from app.core.order_tracker import OrderTracker, notice_trs
+from app.core.ledger import AccountLedger
+from app.services.trading_service import TradingService, AsyncTradingService, apply_buyable
+from app.services.position_service import PositionService
+from app.services.webhook_service import WebhookService
+from app.services.cancel_service import BulkCancelService
+from app.services.webhook_queue import WebhookQueue, WebhookWorkerPool
+from app.services.idempotency import IdempotencyIndex
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ClientRegistry:
+    """프로세스 전역에서 공유하는 브로커 클라이언트 모음
+
+    app.main 의 lifespan 에서 한 번 생성되어 app.state.registry 에 저장되고,
+    각 엔드포인트는 Depends(get_trading_service) 로 같은 인스턴스를 주입받습니다.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or get_settings()
+        self.env = KoreaInvestEnv(get_kis_config(self.settings))
+        self.trading_service = TradingService(self.env)
+        self.async_trading_service = AsyncTradingService(self.env)
+        self.position_service = PositionService(self.trading_service)
+        self.cancel_service = BulkCancelService(self.async_trading_service)
+        self.webhook_service = WebhookService(
+            self.async_trading_service,
+            netting_window_ms=self.settings["WEBHOOK_NETTING_WINDOW_MS"],
+        )
+        self.webhook_workers = None
+        self.idempotency_index = IdempotencyIndex(
+            max_size=self.settings["WEBHOOK_DEDUP_MAX_KEYS"],
+            window_sec=self.settings["WEBHOOK_DEDUP_WINDOW_SEC"],
+            id_ttl_sec=self.settings["WEBHOOK_DEDUP_ID_TTL_SEC"],
+        )
+        self.realtime_feed = None
+        self.order_tracker = None
+        self.ledger = None
+        self._ledger_task = None
+        logger.info("Client registry initialized")
+
+    async def start(self):
+        """이벤트 루프가 필요한 백그라운드 구성요소 시작"""
+        self.env.token_manager.start_refresher()
+        if self.settings["REALTIME_ENABLED"]:
+            ws_url = self.settings["REALTIME_WS_URL"] or (
+                "ws://ops.koreainvestment.com:31000" if self.settings["IS_PAPER_TRADING"]
+                else "ws://ops.koreainvestment.com:21000")
+            if self.settings["ORDER_TRACKER_ENABLED"] and self.settings["HTS_ID"]:
+                self.order_tracker = OrderTracker()
+                if self.settings["LEDGER_ENABLED"]:
+                    # 체결/취소 통보를 받을 수 있을 때만 원장으로 수량을 계산
+                    self.ledger = AccountLedger(
+                        max_age_sec=self.settings["LEDGER_MAX_AGE_SEC"],
+                        fee_rate=self.settings["LEDGER_FEE_RATE"],
+                    )
+                    self.order_tracker.listeners.append(self.ledger.on_order_event)
+                    self.trading_service.ledger = self.ledger
+                    self.async_trading_service.ledger = self.ledger
+            self.realtime_feed = RealtimeQuoteFeed(
+                self.env,
+                ws_url,
+                max_subscriptions=self.settings["REALTIME_MAX_SUBSCRIPTIONS"],
+                max_age_ms=self.settings["REALTIME_MAX_AGE_MS"],
+                watchlist=parse_watchlist(self.settings["REALTIME_WATCHLIST"]),
+                order_tracker=self.order_tracker,
+                hts_id=self.settings["HTS_ID"] or "",
+                notice_trs=notice_trs(self.settings["IS_PAPER_TRADING"]),
+            )
+            await self.realtime_feed.start()
+            set_realtime_feed(self.realtime_feed)
+            if self.order_tracker is not None:
+                await self.seed_order_tracker()
+
+        if self.settings["WEBHOOK_QUEUE_ENABLED"]:
+            self.webhook_workers = WebhookWorkerPool(
+                WebhookQueue(self.settings["WEBHOOK_QUEUE_PATH"]),
+                self.webhook_service,
+                concurrency=self.settings["WEBHOOK_WORKERS"],
+            )
+            await self.webhook_workers.start()
+
+        if self.ledger is not None:
+            self._ledger_task = asyncio.create_task(self._reconcile_ledger_loop())
+
+    async def seed_order_tracker(self):
+        """체결통보 구독 후 현재 미체결 주문을 한 번 조회하여 추적기에 적재"""
+        service = self.async_trading_service
+        domestic, overseas = await asyncio.gather(
+            service.get_orders(),
+            service.get_all_overseas_orders(refresh=True),
+            return_exceptions=True,
+        )
+        for market, result in (("domestic", domestic), ("overseas", overseas)):
+            if isinstance(result, Exception) or result is None:
+                logger.warning(f"Failed to seed {market} orders into order tracker: {result}")
+            elif market == "domestic":
+                self.order_tracker.seed_domestic(result)
+            else:
+                self.order_tracker.seed_overseas(result)
+        logger.info(f"Order tracker seeded: {self.order_tracker.get_stats()}")
+
+    async def reconcile_ledger(self):
+        """잔고와 통화별 매수가능금액을 동시에 조회하여 원장에 다시 적재
+
+        매수가능금액은 주문 때 조회한 적이 있는 통화만 그 종목/가격으로 다시 조회합니다.
+        """
+        service = self.async_trading_service
+        references = self.ledger.references()
+
+        self.ledger.begin_reconcile()
+        try:
+            balance, *buyables = await asyncio.gather(
+                service.get_balance_overseas(),
+                *(service.api.get_buyable_amount_overseas(exchange_code, symbol, price)
+                  for exchange_code, symbol, price in references),
+                return_exceptions=True,
+            )
+            if isinstance(balance, Exception):
+                logger.warning(f"Failed to reconcile ledger positions: {balance}")
+            else:
+                self.ledger.apply_holdings(balance[1])
+            for (exchange_code, symbol, price), buyable in zip(references, buyables):
+                if isinstance(buyable, Exception) or not buyable:
+                    logger.warning(f"Failed to reconcile ledger cash with {exchange_code}:{symbol}: {buyable}")
+                else:
+                    apply_buyable(self.ledger, buyable, exchange_code, symbol, price)
+        finally:
+            self.ledger.end_reconcile()
+
+    async def _reconcile_ledger_loop(self):
+        interval = self.settings["LEDGER_RECONCILE_SEC"]
+        while True:
+            try:
+                await self.reconcile_ledger()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ledger reconcile failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def aclose(self):
+        if self._ledger_task is not None:
+            self._ledger_task.cancel()
+            try:
+                await self._ledger_task
+            except asyncio.CancelledError:
+                pass
+        if self.webhook_workers is not None:
+            await self.webhook_workers.stop()
+            self.webhook_workers.queue.close()
+        self.env.token_manager.stop_refresher()
+        if self.realtime_feed is not None:
+            set_realtime_feed(None)
+            await self.realtime_feed.stop()
+        await aclose_async_http_client()
+        logger.info("Client registry closed")
+
+
+def get_registry(request: Request) -> ClientRegistry:
+    return request.app.state.registry
+
+def get_trading_service(request: Request) -> TradingService:
+    return get_registry(request).trading_service
+
+def get_async_trading_service(request: Request) -> AsyncTradingService:
+    return get_registry(request).async_trading_service
+
+def get_position_service(request: Request) -> PositionService:
+    return get_registry(request).position_service
+
+def get_cancel_service(request: Request) -> BulkCancelService:
+    return get_registry(request).cancel_service
+
+def get_webhook_service(request: Request) -> WebhookService:
+    return get_registry(request).webhook_service
+
+def get_webhook_workers(request: Request) -> Optional[WebhookWorkerPool]:
+    return get_registry(request).webhook_workers
+
+def get_idempotency_index(request: Request) -> IdempotencyIndex:
+    return get_registry(request).idempotency_index
+
+def get_order_tracker(request: Request) -> Optional[OrderTracker]:
+    return get_registry(request).order_tracker
+
+def get_ledger(request: Request) -> Optional[AccountLedger]:
+    return get_registry(request).ledger
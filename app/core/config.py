@@ -1,11 +1,13 @@
 import os
+from functools import lru_cache
 from typing import Dict
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@lru_cache()
 def get_settings() -> Dict:
-    """환경 변수에서 설정 값을 읽어옵니다."""
+    """환경 변수에서 설정 값을 읽어옵니다. (프로세스 당 한 번만 읽고 캐시)"""
     return {
         "API_KEY": os.getenv("API_KEY"),
         "API_SECRET_KEY": os.getenv("API_SECRET_KEY"),
@@ -16,5 +18,80 @@ def get_settings() -> Dict:
         "IS_PAPER_TRADING": os.getenv("IS_PAPER_TRADING", "true").lower() == "true",
         "URL": os.getenv("URL"),
         "WEBHOOK_URL": os.getenv("WEBHOOK_URL"),
-        "MY_AGENT": os.getenv("MY_AGENT")
-    } 
\ No newline at end of file
+        "MY_AGENT": os.getenv("MY_AGENT"),
+        # HTTP 커넥션 풀 설정
+        "HTTP_POOL_SIZE": int(os.getenv("HTTP_POOL_SIZE", "10")),
+        "HTTP_CONNECT_TIMEOUT": float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+        "HTTP_READ_TIMEOUT": float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+        "HTTP_MAX_RETRIES": int(os.getenv("HTTP_MAX_RETRIES", "2")),
+        # 초당 호출 제한 (실전 20건/초, 모의투자 2건/초 기준으로 여유를 둠)
+        "RATE_LIMIT_REAL_PER_SEC": float(os.getenv("RATE_LIMIT_REAL_PER_SEC", "18")),
+        "RATE_LIMIT_PAPER_PER_SEC": float(os.getenv("RATE_LIMIT_PAPER_PER_SEC", "2")),
+        "RATE_LIMIT_ORDER_RESERVE": float(os.getenv("RATE_LIMIT_ORDER_RESERVE", "1")),
+        # 시세 캐시 (0 이면 캐시 없이 동시 조회 병합만 수행)
+        "QUOTE_CACHE_TTL_MS": float(os.getenv("QUOTE_CACHE_TTL_MS", "500")),
+        "QUOTE_CACHE_MAX_SIZE": int(os.getenv("QUOTE_CACHE_MAX_SIZE", "1024")),
+        # 실시간 웹소켓 시세
+        "REALTIME_ENABLED": os.getenv("REALTIME_ENABLED", "false").lower() == "true",
+        "REALTIME_WS_URL": os.getenv("REALTIME_WS_URL"),
+        "REALTIME_MAX_SUBSCRIPTIONS": int(os.getenv("REALTIME_MAX_SUBSCRIPTIONS", "40")),
+        "REALTIME_MAX_AGE_MS": float(os.getenv("REALTIME_MAX_AGE_MS", "1000")),
+        "REALTIME_WATCHLIST": os.getenv("REALTIME_WATCHLIST", ""),
+        # 실시간 체결통보로 주문 상태 추적 (REALTIME_ENABLED, HTS_ID 필요)
+        "ORDER_TRACKER_ENABLED": os.getenv("ORDER_TRACKER_ENABLED", "true").lower() == "true",
+        # 포지션 축소 시 동시에 처리할 종목 수
+        "POSITION_REDUCE_CONCURRENCY": int(os.getenv("POSITION_REDUCE_CONCURRENCY", "4")),
+        # 해외 미체결 통합 조회 대상 거래소 코드 (쉼표 구분, 빈 값이면 주문 가능한 전체 거래소)
+        "OVERSEAS_ORDER_EXCHANGES": os.getenv("OVERSEAS_ORDER_EXCHANGES", ""),
+        "OPEN_ORDERS_CACHE_TTL_MS": float(os.getenv("OPEN_ORDERS_CACHE_TTL_MS", "1000")),
+        # 일괄 취소 시 동시에 보낼 취소 요청 수
+        "BULK_CANCEL_CONCURRENCY": int(os.getenv("BULK_CANCEL_CONCURRENCY", "8")),
+        # 워커/재시작 간 공유할 접근 토큰 파일 경로 (빈 값이면 메모리에만 보관)
+        "TOKEN_STORE_PATH": os.getenv("TOKEN_STORE_PATH", ".cache/kis_token.json"),
+        # 만료 몇 초 전에 토큰을 미리 갱신할지
+        "TOKEN_REFRESH_MARGIN_SEC": int(os.getenv("TOKEN_REFRESH_MARGIN_SEC", "3600")),
+        # 주문 hashkey 처리 방식: skip(사전 호출 생략, 기본) / sync(주문 전 /uapi/hashkey 호출)
+        "ORDER_HASHKEY_MODE": os.getenv("ORDER_HASHKEY_MODE", "skip").lower(),
+        # 웹훅 알림을 큐에 넣고 202 로 즉시 응답 (false 이면 요청 안에서 주문까지 처리)
+        "WEBHOOK_QUEUE_ENABLED": os.getenv("WEBHOOK_QUEUE_ENABLED", "true").lower() == "true",
+        "WEBHOOK_QUEUE_PATH": os.getenv("WEBHOOK_QUEUE_PATH", ".cache/webhook_queue.db"),
+        "WEBHOOK_WORKERS": int(os.getenv("WEBHOOK_WORKERS", "2")),
+        # 중복 알림 판별: 같은 내용은 WINDOW 초, 같은 alert_id 는 ID_TTL 초 동안 한 번만 처리
+        "WEBHOOK_DEDUP_WINDOW_SEC": float(os.getenv("WEBHOOK_DEDUP_WINDOW_SEC", "60")),
+        "WEBHOOK_DEDUP_ID_TTL_SEC": float(os.getenv("WEBHOOK_DEDUP_ID_TTL_SEC", "86400")),
+        "WEBHOOK_DEDUP_MAX_KEYS": int(os.getenv("WEBHOOK_DEDUP_MAX_KEYS", "10000")),
+        # 같은 종목 알림을 모아 상계할 구간(ms), 0 이면 상계하지 않음
+        # 큐를 쓰면 큐 파일을 공유하는 모든 워커의 알림을 함께 상계하고, 큐를 쓰지 않으면 워커별로 상계
+        "WEBHOOK_NETTING_WINDOW_MS": float(os.getenv("WEBHOOK_NETTING_WINDOW_MS", "0")),
+        # 해외주식 주문가능 외화/매도가능 수량을 로컬 원장으로 계산 (주기적으로 API 와 대사)
+        # 체결/취소 통보가 필요하므로 주문 추적기가 동작할 때(REALTIME_ENABLED, ORDER_TRACKER_ENABLED, HTS_ID)만 사용
+        "LEDGER_ENABLED": os.getenv("LEDGER_ENABLED", "true").lower() == "true",
+        "LEDGER_RECONCILE_SEC": float(os.getenv("LEDGER_RECONCILE_SEC", "30")),
+        # 마지막 대사 후 이 시간이 지나면 원장 대신 API 로 계산
+        "LEDGER_MAX_AGE_SEC": float(os.getenv("LEDGER_MAX_AGE_SEC", "90")),
+        # 조회 이후 주문/체결로 바뀐 외화 금액을 매수 수량으로 환산할 때 더할 수수료율
+        "LEDGER_FEE_RATE": float(os.getenv("LEDGER_FEE_RATE", "0.0025")),
+        # 여러 uvicorn 워커가 속도 제한 버킷과 시세/미체결 캐시를 공유할 디렉터리 (빈 값이면 워커별로 따로 보관)
+        # 같은 호스트의 메모리 파일시스템(/dev/shm 등)을 권장
+        "SHARED_STATE_DIR": os.getenv("SHARED_STATE_DIR", ""),
+        # 다른 워커가 같은 키를 조회 중일 때 결과를 기다리는 최대 시간(ms)
+        "SHARED_CACHE_LEASE_MS": float(os.getenv("SHARED_CACHE_LEASE_MS", "2000")),
+        # 웹훅 처리 구간 기록을 JSON Lines 로 내보낼 파일 (빈 값이면 내보내지 않음)
+        "TRACE_EXPORT_PATH": os.getenv("TRACE_EXPORT_PATH", ""),
+    }
+
+def get_kis_config(settings: Dict = None) -> Dict:
+    """KoreaInvestEnv 에 전달할 설정 딕셔너리 생성"""
+    settings = settings or get_settings()
+    return {
+        "api_key": settings["API_KEY"],
+        "api_secret_key": settings["API_SECRET_KEY"],
+        "stock_account_number": settings["STOCK_ACCOUNT_NUMBER"],
+        "stock_account_product_code": settings["STOCK_ACCOUNT_PRODUCT_CODE"],
+        "hts_id": settings["HTS_ID"],
+        "custtype": settings["CUSTTYPE"],
+        "is_paper_trading": settings["IS_PAPER_TRADING"],
+        "my_agent": settings["MY_AGENT"],
+        "url": settings["URL"],
+        "webhook_url": settings["WEBHOOK_URL"]
+    }
@@ -88,4 +88,14 @@ class ExchangeCodeConverter:
         """
         TradingView의 거래소 코드를 내부 ExchangeCode로 변환
         """
-        return cls.TRADINGVIEW_MAPPING.get(tv_exchange.upper())
\ No newline at end of file
+        return cls.TRADINGVIEW_MAPPING.get(tv_exchange.upper())
+
+    @classmethod
+    def from_api_code(cls, code: str, api_type: str = "ORDER") -> Optional[ExchangeCode]:
+        """
+        API 응답의 거래소 코드(예: 잔고의 ovrs_excg_cd "NASD")를 ExchangeCode로 변환
+        """
+        for exchange, api_code in cls.MAPPING.get(api_type, {}).items():
+            if api_code == code.upper():
+                return exchange
+        return cls.from_string(code)
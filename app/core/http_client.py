@@ -0,0 +1,200 @@
+import threading
+import time
+import logging
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class KISHttpClient:
+    """KIS OpenAPI 호출용 keep-alive 커넥션 풀
+
+    requests.Session 하나를 공유하여 TCP/TLS 연결을 재사용합니다.
+    연결 단계 오류(connection reset 등)는 모든 메소드에서 재시도하지만,
+    응답 읽기 오류는 GET 만 재시도합니다. (주문 POST 의 중복 전송 방지)
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 3.05,
+                 read_timeout: float = 10, max_retries: int = 2):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=0,
+            allowed_methods=frozenset(["GET"]),
+            backoff_factor=0.05,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=True,  # 풀 크기를 넘는 연결은 만들지 않고 대기
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._failures = 0
+        self._elapsed = 0.0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._requests += 1
+                self._elapsed += elapsed
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> Dict:
+        """풀 통계 (호스트별 신규 연결 수 / 요청 수 포함)"""
+        pools = {}
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections_created": pool.num_connections,
+                "requests": pool.num_requests,
+                "available_slots": pool.pool.qsize() if pool.pool else 0,
+            }
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "timeout": {"connect": self.timeout[0], "read": self.timeout[1]},
+                "requests": self._requests,
+                "failures": self._failures,
+                "avg_latency_ms": round(self._elapsed / self._requests * 1000, 3) if self._requests else 0.0,
+                "pools": pools,
+            }
+
+    def close(self):
+        self.session.close()
+
+
+_http_client: Optional[KISHttpClient] = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> KISHttpClient:
+    """프로세스 전역 KISHttpClient 반환"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                settings = get_settings()
+                _http_client = KISHttpClient(
+                    pool_size=settings["HTTP_POOL_SIZE"],
+                    connect_timeout=settings["HTTP_CONNECT_TIMEOUT"],
+                    read_timeout=settings["HTTP_READ_TIMEOUT"],
+                    max_retries=settings["HTTP_MAX_RETRIES"],
+                )
+    return _http_client
+
+def close_http_client():
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+class AsyncKISHttpClient:
+    """KIS OpenAPI 호출용 비동기 커넥션 풀 (httpx.AsyncClient)
+
+    이벤트 루프를 막지 않으므로 async 엔드포인트에서 동시 요청이 겹쳐서 처리됩니다.
+    httpx 트랜스포트의 retries 는 연결 단계 오류만 재시도합니다.
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 3.05,
+                 read_timeout: float = 10, max_retries: int = 2):
+        import httpx
+
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=httpx.AsyncHTTPTransport(retries=max_retries, limits=limits),
+        )
+        self._requests = 0
+        self._failures = 0
+        self._elapsed = 0.0
+
+    async def request(self, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self.client.request(method, url, **kwargs)
+        except Exception:
+            self._failures += 1
+            raise
+        finally:
+            self._requests += 1
+            self._elapsed += time.perf_counter() - start
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, data=None, **kwargs):
+        # requests 와 같은 호출 형태(data=json 문자열)를 지원
+        if isinstance(data, str):
+            kwargs["content"] = data
+        elif data is not None:
+            kwargs["data"] = data
+        return await self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> Dict:
+        return {
+            "pool_size": self.pool_size,
+            "timeout": {"connect": self.timeout[0], "read": self.timeout[1]},
+            "requests": self._requests,
+            "failures": self._failures,
+            "avg_latency_ms": round(self._elapsed / self._requests * 1000, 3) if self._requests else 0.0,
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_async_http_client: Optional[AsyncKISHttpClient] = None
+
+def get_async_http_client() -> AsyncKISHttpClient:
+    """프로세스 전역 AsyncKISHttpClient 반환 (이벤트 루프 안에서 사용)"""
+    global _async_http_client
+    if _async_http_client is None:
+        settings = get_settings()
+        _async_http_client = AsyncKISHttpClient(
+            pool_size=settings["HTTP_POOL_SIZE"],
+            connect_timeout=settings["HTTP_CONNECT_TIMEOUT"],
+            read_timeout=settings["HTTP_READ_TIMEOUT"],
+            max_retries=settings["HTTP_MAX_RETRIES"],
+        )
+    return _async_http_client
+
+async def aclose_async_http_client():
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
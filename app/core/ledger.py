@@ -0,0 +1,224 @@
+import math
+import threading
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 주문용 거래소 코드(OVRS_EXCG_CD) -> 결제 통화
+EXCHANGE_CURRENCIES = {
+    "NASD": "USD", "NYSE": "USD", "AMEX": "USD",
+    "SEHK": "HKD", "SHAA": "CNY", "SZAA": "CNY",
+    "TKSE": "JPY", "HASE": "VND", "VNSE": "VND",
+}
+
+
+def exchange_currency(exchange_code: str) -> str:
+    return EXCHANGE_CURRENCIES.get(exchange_code.upper(), "USD")
+
+
+class PendingOrder:
+    """원장에 반영한 내 주문 (취소/거부 시 되돌리기 위해 보관)"""
+    __slots__ = ("order_no", "side", "exchange_code", "symbol", "price", "quantity", "created_at")
+
+    def __init__(self, order_no: str, side: str, exchange_code: str, symbol: str, price: float, quantity: int):
+        self.order_no = order_no
+        self.side = side
+        self.exchange_code = exchange_code
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+        self.created_at = time.time()
+
+
+class AccountLedger:
+    """해외주식 주문가능 외화/매도가능 수량 원장
+
+    매수가능금액(TTTS3007R)/잔고(TTTS3012R) 조회 결과로 채운 뒤,
+    내 주문 접수와 체결통보로 값을 갱신하여 주문 수량 계산에 API 호출이 필요 없게 합니다.
+    최대 매수 수량은 조회 때 받은 최대주문가능수량(수수료, 통합증거금 반영)을 가격 비율로 환산하고,
+    이후 주문/체결로 바뀐 외화 금액만 fee_rate 로 수량에 반영합니다.
+    주기적인 대사(reconcile)로 조회 결과를 다시 적재하며,
+    대사 중에 반영된 주문은 값을 줄이는 방향(현금 차감, 매도가능 차감)만 다시 적용합니다.
+    """
+
+    def __init__(self, max_age_sec: float = 60.0, fee_rate: float = 0.0):
+        self.max_age_sec = max_age_sec
+        self.fee_rate = fee_rate
+        self._cash: Dict[str, float] = {}
+        # 통화별 마지막 조회의 (최대주문가능수량, 조회 가격, 주문가능외화금액)
+        self._buyable: Dict[str, Tuple[int, float, float]] = {}
+        self._positions: Dict[Tuple[str, str], int] = {}
+        self._pending: Dict[str, PendingOrder] = {}
+        # 대사 조회 중에 반영한 차감분 (통화/종목 키, 차감량)
+        self._journal: Optional[List[Tuple[str, object, float]]] = None
+        # 통화별 대사 때 매수가능금액을 조회할 (거래소, 종목, 가격)
+        self._references: Dict[str, Tuple[str, str, float]] = {}
+        self._lock = threading.Lock()
+        self.cash_synced_at: Dict[str, float] = {}
+        self.positions_synced_at = 0.0
+        self.reconciles = 0
+        self.local_hits = 0
+        self.orders = 0
+        self.fills = 0
+
+    # 조회
+
+    def is_fresh(self, synced_at: float) -> bool:
+        return bool(synced_at) and time.time() - synced_at <= self.max_age_sec
+
+    def max_buy_quantity(self, exchange_code: str, price: float) -> Optional[int]:
+        """조회한 최대주문가능수량을 이 가격으로 환산한 뒤 이후 외화 변동분을 반영, 원장이 오래되었으면 None"""
+        currency = exchange_currency(exchange_code)
+        with self._lock:
+            buyable = self._buyable.get(currency)
+            if price <= 0 or buyable is None or not self.is_fresh(self.cash_synced_at.get(currency, 0.0)):
+                return None
+            self.local_hits += 1
+            max_quantity, reference_price, synced_cash = buyable
+            changed = self._cash.get(currency, 0.0) - synced_cash
+        amount = max_quantity * reference_price + changed / (1 + self.fee_rate)
+        return max(int(math.floor(amount / price + 1e-9)), 0)
+
+    def max_sell_quantity(self, exchange_code: str, symbol: str) -> Optional[int]:
+        """매도가능 수량, 원장이 오래되었으면 None"""
+        with self._lock:
+            if not self.is_fresh(self.positions_synced_at):
+                return None
+            self.local_hits += 1
+            return max(self._positions.get((exchange_code.upper(), symbol.upper()), 0), 0)
+
+    def references(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            return list(self._references.values())
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "cash": dict(self._cash),
+                "positions": len(self._positions),
+                "pending_orders": len(self._pending),
+                "cash_age_sec": {c: round(now - t, 1) for c, t in self.cash_synced_at.items()},
+                "positions_age_sec": round(now - self.positions_synced_at, 1) if self.positions_synced_at else None,
+                "reconciles": self.reconciles,
+                "local_hits": self.local_hits,
+                "orders": self.orders,
+                "fills": self.fills,
+            }
+
+    # 조회 결과 적재
+
+    def begin_reconcile(self):
+        """대사 조회 시작 (이후 차감분은 적재 후 다시 적용)"""
+        with self._lock:
+            self._journal = []
+
+    def set_reference(self, exchange_code: str, order_exchange_code: str, symbol: str, price: float):
+        """대사 때 이 통화의 주문가능외화금액을 조회할 종목 지정"""
+        with self._lock:
+            self._references[exchange_currency(order_exchange_code)] = (exchange_code, symbol.upper(), price)
+
+    def apply_buyable(self, buyable: Optional[Dict], order_exchange_code: str, price: float):
+        """get_buyable_amount_overseas() 결과(price 로 조회)의 최대주문가능수량/주문가능외화금액 적재"""
+        if not buyable or price <= 0:
+            return
+        currency = buyable.get("currency") or exchange_currency(order_exchange_code)
+        with self._lock:
+            synced_cash = float(buyable.get("available_cash", 0.0))
+            cash = synced_cash
+            for kind, key, amount in self._journal or ():
+                if kind == "cash" and key == currency:
+                    cash -= amount
+            self._cash[currency] = cash
+            self._buyable[currency] = (int(buyable.get("max_quantity", 0)), price, synced_cash)
+            self.cash_synced_at[currency] = time.time()
+
+    def apply_holdings(self, holdings: Optional[Iterable]):
+        """get_balance_overseas() 결과(OverseasHolding 레코드)의 매도가능수량 적재
+
+        조회 실패와 빈 잔고가 구분되지 않으므로 빈 결과는 적재하지 않고 API 조회로 돌아갑니다.
+        """
+        if not holdings:
+            return
+        positions = {}
+        for holding in holdings:
+            key = ((holding.exchange_code or "").upper(), (holding.symbol or "").upper())
+            positions[key] = positions.get(key, 0) + int(holding.sellable_quantity or 0)
+        with self._lock:
+            for kind, key, amount in self._journal or ():
+                if kind == "position":
+                    positions[key] = positions.get(key, 0) - int(amount)
+            self._positions = positions
+            self.positions_synced_at = time.time()
+
+    def end_reconcile(self):
+        with self._lock:
+            self._journal = None
+            self.reconciles += 1
+            # 대사 결과에 이미 반영되었을 오래된 주문 정보는 정리
+            cutoff = time.time() - self.max_age_sec * 2
+            for order_no in [no for no, p in self._pending.items() if p.created_at < cutoff]:
+                del self._pending[order_no]
+
+    # 주문/체결 반영
+
+    def on_order_placed(self, order_no: str, side: str, exchange_code: str, symbol: str,
+                        price: float, quantity: int):
+        """주문 접수 성공 시 매수는 현금, 매도는 매도가능 수량을 미리 차감"""
+        if quantity <= 0:
+            return
+        order = PendingOrder(order_no, side, exchange_code.upper(), symbol.upper(), price, quantity)
+        with self._lock:
+            self.orders += 1
+            if order_no:
+                self._pending[order_no] = order
+            if side == "buy":
+                self._add_cash(exchange_currency(order.exchange_code), -self._buy_cost(price, quantity))
+            else:
+                self._add_position((order.exchange_code, order.symbol), -quantity)
+
+    def on_order_event(self, event: str, state, quantity: int, price: float):
+        """OrderTracker 체결/취소/거부 통보 반영 (내가 낸 주문만)"""
+        if state.market != "overseas":
+            return
+        with self._lock:
+            order = self._pending.get(state.order_no)
+            if order is None:
+                return
+            if event == "fill":
+                self.fills += 1
+                price = price or order.price
+                if order.side == "buy":
+                    # 현금은 주문 시 차감했으므로 주문가와 체결가 차이만 돌려줌
+                    self._add_cash(exchange_currency(order.exchange_code),
+                                   self._buy_cost(order.price, quantity) - self._buy_cost(price, quantity))
+                    self._add_position((order.exchange_code, order.symbol), quantity)
+                else:
+                    self._add_cash(exchange_currency(order.exchange_code),
+                                   price * quantity * (1 - self.fee_rate))
+            elif event in ("cancel", "reject"):
+                if order.side == "buy":
+                    self._add_cash(exchange_currency(order.exchange_code), self._buy_cost(order.price, quantity))
+                else:
+                    self._add_position((order.exchange_code, order.symbol), quantity)
+            if not state.is_open():
+                self._pending.pop(state.order_no, None)
+
+    # 내부 처리 (잠금 안에서 호출)
+
+    def _buy_cost(self, price: float, quantity: int) -> float:
+        return price * quantity * (1 + self.fee_rate)
+
+    def _add_cash(self, currency: str, amount: float):
+        if currency in self._cash:
+            self._cash[currency] += amount
+        if self._journal is not None and amount < 0:
+            self._journal.append(("cash", currency, -amount))
+
+    def _add_position(self, key: Tuple[str, str], quantity: int):
+        if self.positions_synced_at:
+            self._positions[key] = self._positions.get(key, 0) + quantity
+        if self._journal is not None and quantity < 0:
+            self._journal.append(("position", key, -quantity))
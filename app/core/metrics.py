@@ -0,0 +1,153 @@
+from bisect import bisect_left
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 요청 지연/대기 시간 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """라벨별 누적 카운터"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """라벨별 고정 구간 히스토그램 (관측 한 번에 이분 탐색 + 정수 증가만 수행)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [구간별 건수..., +Inf 건수, 합계]
+        self._series: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {repr(round(series[-1], 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """KIS 호출 계측 (Prometheus 텍스트 형식으로 /metrics 에 노출)
+
+    요청 경로에서는 히스토그램/카운터만 갱신하고, 캐시/속도 제한/토큰 상태 같은 값은
+    render() 시점에 각 구성요소의 get_stats() 를 읽어 만듭니다.
+    uvicorn 워커별로 따로 집계되므로 여러 워커를 쓰면 워커마다 수집해야 합니다.
+    """
+
+    def __init__(self):
+        self.kis_request_seconds = Histogram(
+            "kis_request_duration_seconds", "KIS API request latency by TR id", ("tr_id",))
+        self.kis_responses = Counter(
+            "kis_responses_total", "KIS API responses by TR id, HTTP status, rt_cd and msg_cd",
+            ("tr_id", "http_status", "rt_cd", "msg_cd"))
+        self.kis_request_errors = Counter(
+            "kis_request_errors_total", "KIS API requests that raised before a response", ("tr_id", "error"))
+        self.rate_limit_wait_seconds = Histogram(
+            "kis_rate_limit_wait_seconds", "Time spent waiting for the rate limiter by TR id",
+            ("tr_id",), WAIT_BUCKETS)
+        self.token_events = Counter(
+            "kis_token_events_total", "Access token lifecycle events", ("event",))
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def observe_kis_request(self, tr_id: str, seconds: float, http_status: int, rt_cd: str = "", msg_cd: str = ""):
+        self.kis_request_seconds.observe((tr_id,), seconds)
+        self.kis_responses.inc((tr_id, str(http_status), rt_cd, msg_cd))
+
+    def observe_kis_error(self, tr_id: str, error: Exception):
+        self.kis_request_errors.inc((tr_id, type(error).__name__))
+
+    def observe_rate_limit_wait(self, tr_id: str, seconds: float):
+        self.rate_limit_wait_seconds.observe((tr_id,), seconds)
+
+    def token_event(self, event: str):
+        self.token_events.inc((event,))
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        """render() 때 호출되어 추가 지표 줄을 반환하는 함수 등록"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.kis_request_seconds, self.kis_responses, self.kis_request_errors,
+                       self.rate_limit_wait_seconds, self.token_events):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help_text: str, samples: Dict[Tuple[Tuple[str, str], ...], float],
+                metric_type: str = "gauge") -> List[str]:
+    """render 시점에 읽은 값을 gauge/counter 줄로 변환 (samples: {((라벨, 값), ...): 값})"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples.items():
+        label_names = tuple(label for label, _ in labels)
+        label_values = tuple(label_value for _, label_value in labels)
+        lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+    return lines
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+def get_metrics() -> Metrics:
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
@@ -0,0 +1,60 @@
+from collections import deque
+import threading
+from typing import Dict, Optional
+
+class OrderLatencyStats:
+    """주문 전송 지연시간 집계
+
+    hashkey 모드(skip/sync)별로 최근 주문의 hashkey 호출 시간과 전체 주문 시간을 모아
+    hashkey 사전 호출을 생략했을 때 주문당 얼마나 줄어드는지 비교할 수 있게 합니다.
+    """
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._total_ms: Dict[str, deque] = {}
+        self._hashkey_ms: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, mode: str, total_ms: float, hashkey_ms: float = 0.0):
+        with self._lock:
+            if mode not in self._total_ms:
+                self._total_ms[mode] = deque(maxlen=self.window)
+                self._hashkey_ms[mode] = deque(maxlen=self.window)
+                self._counts[mode] = 0
+            self._total_ms[mode].append(total_ms)
+            self._hashkey_ms[mode].append(hashkey_ms)
+            self._counts[mode] += 1
+
+    @staticmethod
+    def _percentile(values, pct: float) -> float:
+        ordered = sorted(values)
+        index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+        return round(ordered[index], 2)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = {}
+            for mode, totals in self._total_ms.items():
+                if not totals:
+                    continue
+                hashkeys = self._hashkey_ms[mode]
+                stats[mode] = {
+                    "orders": self._counts[mode],
+                    "total_ms_avg": round(sum(totals) / len(totals), 2),
+                    "total_ms_p50": self._percentile(totals, 50),
+                    "total_ms_p95": self._percentile(totals, 95),
+                    "hashkey_ms_avg": round(sum(hashkeys) / len(hashkeys), 2),
+                }
+            # sync 모드에서 측정된 hashkey 호출 시간이 주문당 절감되는 시간
+            if "sync" in stats:
+                stats["hashkey_saving_ms_per_order"] = stats["sync"]["hashkey_ms_avg"]
+            return stats
+
+_order_latency_stats: Optional[OrderLatencyStats] = None
+
+def get_order_latency_stats() -> OrderLatencyStats:
+    global _order_latency_stats
+    if _order_latency_stats is None:
+        _order_latency_stats = OrderLatencyStats()
+    return _order_latency_stats
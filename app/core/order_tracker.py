@@ -0,0 +1,314 @@
+from collections import OrderedDict
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 실시간 체결통보 TR (실전 / 모의)
+DOMESTIC_NOTICE_TRS = ("H0STCNI0", "H0STCNI9")   # 국내주식 실시간체결통보
+OVERSEAS_NOTICE_TRS = ("H0GSCNI0", "H0GSCNI9")   # 해외주식 실시간체결통보
+
+def notice_trs(is_paper: bool) -> tuple:
+    """계좌 종류에 맞는 (국내, 해외) 체결통보 TR"""
+    index = 1 if is_paper else 0
+    return DOMESTIC_NOTICE_TRS[index], OVERSEAS_NOTICE_TRS[index]
+
+# 주문 상태
+ACCEPTED = "accepted"
+PARTIALLY_FILLED = "partially_filled"
+FILLED = "filled"
+CANCELED = "canceled"
+REPLACED = "replaced"
+REJECTED = "rejected"
+
+OPEN_STATUSES = (ACCEPTED, PARTIALLY_FILLED)
+
+# 매도매수구분 (REST sll_buy_dvsn_cd, 실시간 SELN_BYOV_CLS 공통)
+SIDES = {"01": "sell", "02": "buy"}
+
+def _to_int(value) -> int:
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+def _to_float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class OrderState:
+    """주문 한 건의 현재 상태"""
+    __slots__ = ("order_no", "original_order_no", "market", "exchange_code", "symbol", "side",
+                 "quantity", "price", "filled_quantity", "filled_amount", "canceled_quantity",
+                 "status", "order_time", "updated_at")
+
+    def __init__(self, order_no: str, market: str, symbol: str = "", side: str = "",
+                 quantity: int = 0, price: float = 0.0, exchange_code: str = "",
+                 original_order_no: str = "", order_time: str = ""):
+        self.order_no = order_no
+        self.original_order_no = original_order_no
+        self.market = market
+        self.exchange_code = exchange_code
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.price = price
+        self.filled_quantity = 0
+        self.filled_amount = 0.0
+        self.canceled_quantity = 0
+        self.status = ACCEPTED
+        self.order_time = order_time
+        self.updated_at = time.time()
+
+    @property
+    def remaining_quantity(self) -> int:
+        return max(self.quantity - self.filled_quantity - self.canceled_quantity, 0)
+
+    @property
+    def avg_fill_price(self) -> float:
+        return self.filled_amount / self.filled_quantity if self.filled_quantity else 0.0
+
+    def is_open(self) -> bool:
+        return self.status in OPEN_STATUSES
+
+    def to_dict(self) -> Dict:
+        return {
+            "order_no": self.order_no,
+            "original_order_no": self.original_order_no,
+            "market": self.market,
+            "exchange_code": self.exchange_code,
+            "symbol": self.symbol,
+            "side": self.side,
+            "quantity": self.quantity,
+            "price": self.price,
+            "filled_quantity": self.filled_quantity,
+            "avg_fill_price": self.avg_fill_price,
+            "canceled_quantity": self.canceled_quantity,
+            "remaining_quantity": self.remaining_quantity,
+            "status": self.status,
+            "order_time": self.order_time,
+            "updated_at": self.updated_at,
+        }
+
+
+class OrderTracker:
+    """내 주문 상태 추적기
+
+    정정취소가능주문(TTTC8036R)/미체결내역(TTTS3018R) 조회로 한 번 채운 뒤,
+    실시간 체결통보(H0STCNI0/H0GSCNI0)로 상태를 갱신합니다.
+    주문번호와 종목코드로 색인되어 있어 주문 상태/잔량 조회에 API 호출이 필요 없습니다.
+    """
+
+    def __init__(self, max_closed: int = 5000):
+        self.max_closed = max_closed
+        self._orders: Dict[str, OrderState] = {}
+        self._by_symbol: Dict[str, Set[str]] = {}
+        self._closed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.seeded = 0
+        self.notices = 0
+        self.fills = 0
+        # 체결/취소/거부 시 (이벤트, 주문 상태, 수량, 가격) 으로 호출할 함수
+        self.listeners: List[Callable[[str, OrderState, int, float], None]] = []
+
+    # 조회
+
+    def get(self, order_no: str) -> Optional[OrderState]:
+        return self._orders.get(order_no)
+
+    def orders(self, symbol: Optional[str] = None, open_only: bool = False) -> List[OrderState]:
+        with self._lock:
+            if symbol:
+                states = [self._orders[no] for no in self._by_symbol.get(symbol.upper(), ())]
+            else:
+                states = list(self._orders.values())
+        if open_only:
+            states = [s for s in states if s.is_open()]
+        return states
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[OrderState]:
+        return self.orders(symbol, open_only=True)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            open_count = sum(1 for s in self._orders.values() if s.is_open())
+            return {
+                "orders": len(self._orders),
+                "open_orders": open_count,
+                "seeded": self.seeded,
+                "notices": self.notices,
+                "fills": self.fills,
+            }
+
+    # 초기 적재 (조회 API 결과)
+
+    def seed_domestic(self, orders: Iterable):
+        """get_orders() 결과(Order 레코드)로 국내 미체결 주문 적재"""
+        for order in orders or ():
+            state = OrderState(order.order_no, "domestic", symbol=order.symbol,
+                               side=SIDES.get(getattr(order, "side_code", ""), ""),
+                               quantity=_to_int(order.quantity), price=_to_float(order.price),
+                               order_time=order.order_time)
+            state.filled_quantity = max(state.quantity - _to_int(order.cancelable_quantity), 0)
+            self._seed(state)
+
+    def seed_overseas(self, orders: Iterable):
+        """get_overseas_orders() 결과(OverseasOrder 레코드)로 해외 미체결 주문 적재"""
+        for order in orders or ():
+            state = OrderState(order.order_no, "overseas", symbol=order.symbol,
+                               side=SIDES.get(order.side_code, ""),
+                               quantity=_to_int(order.quantity), price=_to_float(order.price),
+                               exchange_code=order.exchange_code,
+                               original_order_no=order.original_order_no,
+                               order_time=order.order_time)
+            state.filled_quantity = max(state.quantity - _to_int(order.unfilled_quantity), 0)
+            self._seed(state)
+
+    def _seed(self, state: OrderState):
+        if state.filled_quantity:
+            state.status = PARTIALLY_FILLED
+        with self._lock:
+            # 체결통보가 먼저 도착한 주문은 통보 기준 상태를 유지
+            if state.order_no in self._orders:
+                return
+            self._add(state)
+            self.seeded += 1
+
+    # 실시간 체결통보
+
+    def on_domestic_notice(self, f: List[str]):
+        # CUST_ID, ACNT_NO, ODER_NO, OODER_NO, SELN_BYOV_CLS, RCTF_CLS, ODER_KIND, ODER_COND,
+        # STCK_SHRN_ISCD, CNTG_QTY, CNTG_UNPR, STCK_CNTG_HOUR, RFUS_YN, CNTG_YN, ACPT_YN,
+        # BRNC_NO, ODER_QTY, ACNT_NAME, CNTG_ISNM, CRDT_CLS, CRDT_LOAN_DATE, CNTG_ISNM40, ODER_PRC
+        if len(f) < 17:
+            return
+        self._on_notice("domestic", order_no=f[2], original_order_no=f[3], side_code=f[4],
+                        revise_code=f[5], symbol=f[8], quantity=f[9], price=f[10], notice_time=f[11],
+                        rejected=f[12], filled=f[13], order_quantity=f[16],
+                        order_price=f[22] if len(f) > 22 else "")
+
+    def on_overseas_notice(self, f: List[str]):
+        # CUST_ID, ACNT_NO, ODER_NO, OODER_NO, SELN_BYOV_CLS, RCTF_CLS, ODER_KIND2, STCK_SHRN_ISCD,
+        # CNTG_QTY, CNTG_UNPR, STCK_CNTG_HOUR, RFUS_YN, CNTG_YN, ACPT_YN, BRNC_NO, ODER_QTY, ...
+        if len(f) < 16:
+            return
+        self._on_notice("overseas", order_no=f[2], original_order_no=f[3], side_code=f[4],
+                        revise_code=f[5], symbol=f[7], quantity=f[8], price=f[9], notice_time=f[10],
+                        rejected=f[11], filled=f[12], order_quantity=f[15], order_price="")
+
+    def _on_notice(self, market: str, order_no: str, original_order_no: str,
+                   side_code: str, revise_code: str, symbol: str, quantity: str, price: str,
+                   notice_time: str, rejected: str, filled: str, order_quantity: str, order_price: str):
+        event = self._apply_notice(market, order_no, original_order_no, side_code, revise_code, symbol,
+                                   quantity, price, notice_time, rejected, filled, order_quantity, order_price)
+        if event is None:
+            return
+        for listener in self.listeners:
+            try:
+                listener(*event)
+            except Exception as e:
+                logger.error(f"Order tracker listener failed: {e}")
+
+    def _apply_notice(self, market: str, order_no: str, original_order_no: str,
+                      side_code: str, revise_code: str, symbol: str, quantity: str, price: str,
+                      notice_time: str, rejected: str, filled: str, order_quantity: str, order_price: str):
+        """통보를 상태에 반영하고 알릴 이벤트 (이벤트, 상태, 수량, 가격) 반환"""
+        event = None
+        with self._lock:
+            self.notices += 1
+            order_no = order_no.strip()
+            if not order_no:
+                return None
+            state = self._orders.get(order_no)
+
+            if filled == "2":
+                # 체결 통보
+                if state is None:
+                    state = self._add(OrderState(order_no, market, symbol=symbol.strip(),
+                                                 side=SIDES.get(side_code, ""),
+                                                 quantity=_to_int(order_quantity),
+                                                 original_order_no=original_order_no))
+                fill_quantity = _to_int(quantity)
+                state.filled_quantity += fill_quantity
+                state.filled_amount += fill_quantity * _to_float(price)
+                state.quantity = max(state.quantity, state.filled_quantity)
+                state.status = FILLED if state.remaining_quantity == 0 else PARTIALLY_FILLED
+                self.fills += 1
+                event = ("fill", state, fill_quantity, _to_float(price))
+            elif rejected == "1":
+                # 거부 통보
+                if state is None:
+                    state = self._add(OrderState(order_no, market, symbol=symbol.strip(),
+                                                 side=SIDES.get(side_code, ""),
+                                                 quantity=_to_int(order_quantity),
+                                                 original_order_no=original_order_no))
+                event = ("reject", state, state.remaining_quantity, 0.0)
+                state.status = REJECTED
+            elif revise_code == "2":
+                # 취소 접수: 원주문의 잔량을 취소 수량만큼 줄임
+                original = self._orders.get(original_order_no)
+                if original is not None:
+                    canceled = min(_to_int(order_quantity) or original.remaining_quantity,
+                                   original.remaining_quantity)
+                    original.canceled_quantity += canceled
+                    if original.remaining_quantity == 0:
+                        original.status = CANCELED
+                    original.updated_at = time.time()
+                    self._close(original)
+                    event = ("cancel", original, canceled, 0.0)
+                return event
+            elif revise_code == "1":
+                # 정정 접수: 원주문을 대체하는 새 주문번호 생성
+                original = self._orders.get(original_order_no)
+                if original is not None:
+                    original.status = REPLACED
+                    original.updated_at = time.time()
+                    self._close(original)
+                if state is None:
+                    state = self._add(OrderState(
+                        order_no, market, symbol=symbol.strip() or (original.symbol if original else ""),
+                        side=original.side if original else SIDES.get(side_code, ""),
+                        quantity=_to_int(order_quantity),
+                        price=_to_float(order_price or price),
+                        exchange_code=original.exchange_code if original else "",
+                        original_order_no=original_order_no))
+            else:
+                # 주문 접수
+                if state is None:
+                    state = self._add(OrderState(order_no, market, symbol=symbol.strip(),
+                                                 side=SIDES.get(side_code, ""),
+                                                 quantity=_to_int(order_quantity),
+                                                 price=_to_float(order_price or price),
+                                                 order_time=notice_time))
+            state.updated_at = time.time()
+            self._close(state)
+        return event
+
+    # 내부 처리 (잠금 안에서 호출)
+
+    def _add(self, state: OrderState) -> OrderState:
+        self._orders[state.order_no] = state
+        self._by_symbol.setdefault(state.symbol.upper(), set()).add(state.order_no)
+        return state
+
+    def _close(self, state: OrderState):
+        """종료된 주문은 max_closed 건까지만 보관"""
+        if state.is_open() or state.order_no in self._closed:
+            return
+        self._closed[state.order_no] = None
+        while len(self._closed) > self.max_closed:
+            order_no = self._closed.popitem(last=False)[0]
+            old = self._orders.get(order_no)
+            if old is None or old.is_open():
+                continue
+            del self._orders[order_no]
+            symbol_orders = self._by_symbol.get(old.symbol.upper())
+            if symbol_orders is not None:
+                symbol_orders.discard(order_no)
+                if not symbol_orders:
+                    del self._by_symbol[old.symbol.upper()]
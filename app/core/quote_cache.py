@@ -0,0 +1,254 @@
+import asyncio
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core.config import get_settings
+from app.core.shared_state import SharedCache, get_shared_cache
+
+logger = logging.getLogger(__name__)
+
+class _InFlight:
+    """진행 중인 동기 조회 (같은 키의 후속 호출자가 결과를 기다림)"""
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class QuoteCache:
+    """짧은 TTL 의 시세 캐시 (LRU 제거 + 동일 키 동시 조회 병합)
+
+    - 키는 (조회 종류, 거래소, 종목) 형태를 사용합니다.
+    - 유효한 결과(빈 값이 아닌 경우)만 저장합니다.
+    - 같은 키를 동시에 조회하면 첫 호출만 KIS 를 호출하고 나머지는 그 결과를 공유합니다.
+      (동기/비동기 호출은 각각 따로 병합)
+    - shared(SharedCache) 가 주어지면 프로세스 캐시에 없을 때 워커 간 공유 캐시를 확인하고,
+      다른 워커가 같은 키를 조회 중이면 lease_ms 까지 그 결과를 기다립니다.
+    """
+
+    POLL_INTERVAL = 0.005
+
+    def __init__(self, ttl_ms: float = 500, max_size: int = 1024, shared: Optional[SharedCache] = None,
+                 namespace: str = "quote", lease_ms: float = 2000):
+        self.ttl = ttl_ms / 1000.0
+        self.max_size = max_size
+        self.shared = shared if self.ttl > 0 else None
+        self.namespace = namespace
+        self.lease = lease_ms / 1000.0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._inflight_async: Dict[Hashable, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key!r}"
+
+    def _fetch_shared(self, key: Hashable, fetch: Callable[[], Any]):
+        """공유 캐시 확인 → 임대를 얻으면 직접 조회해 기록, 아니면 다른 워커의 결과를 기다림"""
+        shared_key = self._shared_key(key)
+        deadline = time.monotonic() + self.lease
+        while True:
+            value = self.shared.get(shared_key)
+            if value is not None:
+                self.shared_hits += 1
+                return value
+            owner = self.shared.claim(shared_key, self.lease)
+            if owner is not None or time.monotonic() >= deadline:
+                result = None
+                try:
+                    result = fetch()
+                    return result
+                finally:
+                    self.shared.put(shared_key, result, self.ttl, owner)
+            time.sleep(self.POLL_INTERVAL)
+
+    async def _fetch_shared_async(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        # SQLite 호출은 다른 워커의 쓰기를 기다릴 수 있으므로 이벤트 루프 밖에서 처리
+        shared_key = self._shared_key(key)
+        deadline = time.monotonic() + self.lease
+        while True:
+            value = await asyncio.to_thread(self.shared.get, shared_key)
+            if value is not None:
+                self.shared_hits += 1
+                return value
+            owner = await asyncio.to_thread(self.shared.claim, shared_key, self.lease)
+            if owner is not None or time.monotonic() >= deadline:
+                result = None
+                try:
+                    result = await fetch()
+                    return result
+                finally:
+                    await asyncio.to_thread(self.shared.put, shared_key, result, self.ttl, owner)
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    def _lookup(self, key: Hashable):
+        # self._lock 을 잡은 상태에서 호출
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any):
+        # self._lock 을 잡은 상태에서 호출
+        if not value or self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable):
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]):
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            return call.result
+
+        result = None
+        try:
+            result = self._fetch_shared(key, fetch) if self.shared is not None else fetch()
+            return result
+        finally:
+            with self._lock:
+                self._store(key, result)
+                self._inflight.pop(key, None)
+            call.result = result
+            call.event.set()
+
+    async def get_or_fetch_async(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            future = self._inflight_async.get(key)
+            leader = future is None
+            if leader:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight_async[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        result = None
+        try:
+            if self.shared is not None:
+                result = await self._fetch_shared_async(key, fetch)
+            else:
+                result = await fetch()
+            return result
+        finally:
+            with self._lock:
+                self._store(key, result)
+                self._inflight_async.pop(key, None)
+            if not future.done():
+                future.set_result(result)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(self._shared_key(key))
+
+    async def invalidate_async(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.delete, self._shared_key(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear(f"{self.namespace}:")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "ttl_ms": self.ttl * 1000,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "shared": self.shared is not None,
+                "shared_hits": self.shared_hits,
+                "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+
+_quote_cache: Optional[QuoteCache] = None
+_quote_cache_lock = threading.Lock()
+
+def get_quote_cache() -> QuoteCache:
+    """프로세스 전역 QuoteCache 반환"""
+    global _quote_cache
+    if _quote_cache is None:
+        with _quote_cache_lock:
+            if _quote_cache is None:
+                settings = get_settings()
+                _quote_cache = QuoteCache(
+                    ttl_ms=settings["QUOTE_CACHE_TTL_MS"],
+                    max_size=settings["QUOTE_CACHE_MAX_SIZE"],
+                    shared=get_shared_cache(),
+                    namespace="quote",
+                    lease_ms=settings["SHARED_CACHE_LEASE_MS"],
+                )
+    return _quote_cache
+
+
+_open_orders_cache: Optional[QuoteCache] = None
+
+def get_open_orders_cache() -> QuoteCache:
+    """거래소 통합 미체결 주문 캐시 (OPEN_ORDERS_CACHE_TTL_MS)"""
+    global _open_orders_cache
+    if _open_orders_cache is None:
+        with _quote_cache_lock:
+            if _open_orders_cache is None:
+                settings = get_settings()
+                _open_orders_cache = QuoteCache(
+                    ttl_ms=settings["OPEN_ORDERS_CACHE_TTL_MS"], max_size=16,
+                    shared=get_shared_cache(), namespace="open_orders",
+                    lease_ms=settings["SHARED_CACHE_LEASE_MS"])
+    return _open_orders_cache
@@ -0,0 +1,257 @@
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+import itertools
+import os
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.metrics import get_metrics
+from app.core.shared_state import SharedBucket, app_key_id, shared_state_dir
+
+logger = logging.getLogger(__name__)
+
+# 초당 거래건수 초과 오류 코드
+THROTTLE_ERROR_CODE = "EGW00201"
+
+def is_order_tr(tr_id: str) -> bool:
+    """주문/정정/취소 TR 여부 (KIS 주문 계열 TR 은 'U' 로 끝남)"""
+    return bool(tr_id) and tr_id.endswith("U")
+
+
+class RateLimiter:
+    """KIS 초당 호출 제한을 위한 토큰 버킷
+
+    - 호출자는 acquire()/acquire_async() 로 토큰을 얻을 때까지 기다린 뒤 요청합니다.
+    - 주문 TR 은 도착 즉시 토큰을 차감하고 (부족하면 그만큼 기다림),
+      시세 조회 TR 은 도착 순서대로 줄을 서서 보내는 시점에 토큰을 가져갑니다.
+      조회는 order_reserve 만큼의 토큰을 남겨 두어야 하므로, 나중에 도착한 주문도
+      이미 줄 서 있는 조회보다 먼저 나갑니다.
+    - EGW00201 이 관측되면 허용 속도를 절반으로 줄이고 (최소 min_rate),
+      recovery_interval 동안 조용하면 base_rate 의 10% 씩 다시 올립니다.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: Optional[float] = None, order_reserve: float = 1.0,
+                 min_rate: Optional[float] = None, recovery_interval: float = 5.0):
+        self.base_rate = float(rate_per_sec)
+        self.rate = self.base_rate
+        self.burst = float(burst) if burst else self.base_rate
+        self.order_reserve = order_reserve
+        self.min_rate = min_rate or max(self.base_rate * 0.25, 0.5)
+        self.recovery_interval = recovery_interval
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._last_adjusted = self._updated
+
+        # 토큰을 기다리는 시세 조회 순번 (프로세스 안에서 도착 순서대로 처리)
+        self._quote_queue = deque()
+        self._tickets = itertools.count()
+
+        self._reservations = 0
+        self._delayed = 0
+        self._wait_total = 0.0
+        self._throttled = 0
+
+    def _refill(self, now: float):
+        # 스로틀 이후 일정 시간 조용하면 속도를 조금씩 회복 (AIMD)
+        if self.rate < self.base_rate and now - self._last_adjusted >= self.recovery_interval:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+            self._last_adjusted = now
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _synced(self):
+        """버킷 상태를 읽고 쓰는 구간의 잠금"""
+        return self._lock
+
+    def _enqueue(self, tr_id: str) -> Optional[int]:
+        """시세 조회면 대기 순번을 발급 (주문은 줄을 서지 않음)"""
+        if is_order_tr(tr_id):
+            return None
+        with self._lock:
+            ticket = next(self._tickets)
+            self._quote_queue.append(ticket)
+        return ticket
+
+    def _dequeue(self, ticket: Optional[int]):
+        """토큰을 얻지 못하고 끝난 (취소/예외) 조회의 순번 반납"""
+        if ticket is None:
+            return
+        with self._lock:
+            try:
+                self._quote_queue.remove(ticket)
+            except ValueError:
+                pass
+
+    def _take(self, tr_id: str, ticket: Optional[int]) -> Tuple[float, bool]:
+        """(기다릴 시간, 토큰 확보 여부) 반환
+
+        주문은 바로 토큰을 차감하고 부족분만큼의 대기 시간을 받습니다.
+        조회는 줄 맨 앞이고 주문용 여유분을 남길 수 있을 때만 토큰을 가져가며,
+        아니면 순번에 맞춰 다시 시도할 시간을 받습니다.
+        """
+        with self._synced():
+            self._refill(time.monotonic())
+            if ticket is None:
+                wait = max(0.0, (1.0 - self._tokens) / self.rate)
+                self._tokens -= 1.0
+                return wait, True
+            position = self._quote_queue.index(ticket)
+            # 버킷 크기보다 큰 여유분은 채워질 수 없으므로 버킷 크기까지만 요구
+            threshold = min(1.0 + self.order_reserve, self.burst)
+            if position == 0 and self._tokens >= threshold:
+                self._tokens -= 1.0
+                self._quote_queue.popleft()
+                return 0.0, True
+            return max((threshold + position - self._tokens) / self.rate, 0.001), False
+
+    async def _take_async(self, tr_id: str, ticket: Optional[int]) -> Tuple[float, bool]:
+        return self._take(tr_id, ticket)
+
+    def _record(self, tr_id: str, wait: float):
+        with self._lock:
+            self._reservations += 1
+            if wait > 0:
+                self._delayed += 1
+                self._wait_total += wait
+        get_metrics().observe_rate_limit_wait(tr_id, wait)
+
+    def acquire(self, tr_id: str = "") -> float:
+        """토큰을 얻을 때까지 기다리고 총 대기 시간(초)을 반환"""
+        ticket = self._enqueue(tr_id)
+        total = 0.0
+        acquired = False
+        try:
+            while True:
+                wait, acquired = self._take(tr_id, ticket)
+                if wait > 0:
+                    time.sleep(wait)
+                    total += wait
+                if acquired:
+                    break
+        finally:
+            if not acquired:
+                self._dequeue(ticket)
+        self._record(tr_id, total)
+        return total
+
+    async def acquire_async(self, tr_id: str = "") -> float:
+        ticket = self._enqueue(tr_id)
+        total = 0.0
+        acquired = False
+        try:
+            while True:
+                wait, acquired = await self._take_async(tr_id, ticket)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    total += wait
+                if acquired:
+                    break
+        finally:
+            if not acquired:
+                self._dequeue(ticket)
+        self._record(tr_id, total)
+        return total
+
+    def on_throttled(self, tr_id: str = ""):
+        """EGW00201 수신 시 호출 - 허용 속도를 줄이고 버킷을 비움"""
+        with self._synced():
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_adjusted = now
+            self._throttled += 1
+            logger.warning(f"Rate limited by KIS (tr_id={tr_id}), slowing down to {self.rate:.2f}/s")
+
+    async def on_throttled_async(self, tr_id: str = ""):
+        self.on_throttled(tr_id)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "base_rate": self.base_rate,
+                "current_rate": round(self.rate, 3),
+                "tokens": round(self._tokens, 3),
+                "reservations": self._reservations,
+                "delayed": self._delayed,
+                "total_wait_ms": round(self._wait_total * 1000, 3),
+                "throttled": self._throttled,
+                "shared": False,
+            }
+
+
+class SharedRateLimiter(RateLimiter):
+    """같은 호스트의 여러 프로세스(uvicorn 워커)가 하나의 토큰 버킷을 쓰는 RateLimiter
+
+    버킷 상태(현재 속도, 토큰 수, 갱신 시각)는 SharedBucket 파일에 두고,
+    토큰을 가져가거나 on_throttled() 를 처리할 때마다 flock 을 잡고 읽어 계산한 뒤 다시 씁니다.
+    한 워커가 EGW00201 을 받아 속도를 줄이면 다른 워커도 바로 줄어든 속도를 따릅니다.
+    예약/대기 건수 같은 통계는 워커별로 집계됩니다.
+    """
+
+    def __init__(self, path: str, rate_per_sec: float, **kwargs):
+        super().__init__(rate_per_sec, **kwargs)
+        self.path = path
+        self._bucket = SharedBucket(path)
+
+    @contextmanager
+    def _synced(self):
+        with self._lock, self._bucket.locked():
+            state = self._bucket.read()
+            # 설정이 바뀌었거나 재부팅으로 시각이 되돌아간 경우에는 새 버킷으로 시작
+            if state is not None and state[0] == self.base_rate and state[3] <= time.monotonic():
+                _, self.rate, self._tokens, self._updated, self._last_adjusted = state
+            else:
+                self.rate, self._tokens = self.base_rate, self.burst
+                self._updated = self._last_adjusted = time.monotonic()
+            yield
+            self._bucket.write(self.base_rate, self.rate, self._tokens, self._updated, self._last_adjusted)
+
+    # flock 은 다른 워커가 잡고 있으면 기다려야 하므로 이벤트 루프 밖에서 처리
+
+    async def _take_async(self, tr_id: str, ticket: Optional[int]) -> Tuple[float, bool]:
+        return await asyncio.to_thread(self._take, tr_id, ticket)
+
+    async def on_throttled_async(self, tr_id: str = ""):
+        await asyncio.to_thread(self.on_throttled, tr_id)
+
+    def get_stats(self) -> Dict:
+        # 통계는 flock 없이 마지막으로 기록된 버킷 상태를 읽기만 함 (다른 워커가 쓰는 중이면 값이 어긋날 수 있음)
+        stats = super().get_stats()
+        state = self._bucket.read()
+        if state is not None and state[0] == self.base_rate:
+            _, rate, tokens, updated, _ = state
+            tokens = min(self.burst, tokens + max(time.monotonic() - updated, 0.0) * rate)
+            stats.update(current_rate=round(rate, 3), tokens=round(tokens, 3))
+        return dict(stats, shared=True, path=self.path)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 전역 RateLimiter 반환 (실전/모의투자 별도 한도, SHARED_STATE_DIR 가 있으면 워커 간 공유)"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                settings = get_settings()
+                if settings["IS_PAPER_TRADING"]:
+                    rate = settings["RATE_LIMIT_PAPER_PER_SEC"]
+                else:
+                    rate = settings["RATE_LIMIT_REAL_PER_SEC"]
+                directory = shared_state_dir()
+                if directory:
+                    mode = "paper" if settings["IS_PAPER_TRADING"] else "real"
+                    path = os.path.join(directory, f"rate_limit_{mode}_{app_key_id()}.bin")
+                    _rate_limiter = SharedRateLimiter(
+                        path, rate, order_reserve=settings["RATE_LIMIT_ORDER_RESERVE"])
+                else:
+                    _rate_limiter = RateLimiter(rate, order_reserve=settings["RATE_LIMIT_ORDER_RESERVE"])
+    return _rate_limiter
@@ -0,0 +1,418 @@
+import asyncio
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.exchange_codes import ExchangeCodeConverter
+from app.core.order_tracker import DOMESTIC_NOTICE_TRS, OVERSEAS_NOTICE_TRS
+
+logger = logging.getLogger(__name__)
+
+# 실시간 시세 TR
+DOMESTIC_HOGA_TR = "H0STASP0"    # 국내주식 실시간호가
+DOMESTIC_TRADE_TR = "H0STCNT0"   # 국내주식 실시간체결가
+OVERSEAS_HOGA_TR = "HDFSASP0"    # 해외주식 실시간호가
+OVERSEAS_TRADE_TR = "HDFSCNT0"   # 해외주식 실시간지연체결가
+
+MARKET_TRS = {
+    "domestic": (DOMESTIC_HOGA_TR, DOMESTIC_TRADE_TR),
+    "overseas": (OVERSEAS_HOGA_TR, OVERSEAS_TRADE_TR),
+}
+
+# 호가 조회용 거래소 코드별 통화
+HOGA_CURRENCY = {
+    "NAS": "USD", "NYS": "USD", "AMS": "USD",
+    "HKS": "HKD", "SHS": "CNY", "SZS": "CNY",
+    "TSE": "JPY", "HNX": "VND", "HSX": "VND",
+}
+
+def overseas_tr_key(exchange_code: str, stock_code: str) -> Optional[str]:
+    """해외 실시간 TR 키 (D + 호가용 거래소코드 + 종목코드, 예: DNASAAPL)"""
+    exchange = ExchangeCodeConverter.from_string(exchange_code)
+    if not exchange:
+        return None
+    return f"D{ExchangeCodeConverter.get_code(exchange, 'HOGA')}{stock_code.upper()}"
+
+
+def aes_cbc_base64_decrypt(key: str, iv: str, data: str) -> str:
+    """체결통보 복호화 (AES-256-CBC, 키/IV 는 구독 응답으로 전달됨)"""
+    from base64 import b64decode
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import unpad
+
+    cipher = AES.new(key.encode("utf-8"), AES.MODE_CBC, iv.encode("utf-8"))
+    return unpad(cipher.decrypt(b64decode(data)), AES.block_size).decode("utf-8")
+
+
+class OrderBook:
+    """종목별 최우선 호가/체결가"""
+    __slots__ = ("tr_key", "asks", "bids", "ask_volumes", "bid_volumes",
+                 "current_price", "decimal_places", "hoga_time", "updated_at")
+
+    def __init__(self, tr_key: str):
+        self.tr_key = tr_key
+        self.asks: List[str] = []
+        self.bids: List[str] = []
+        self.ask_volumes: List[str] = []
+        self.bid_volumes: List[str] = []
+        self.current_price = ""
+        self.decimal_places = ""
+        self.hoga_time = ""
+        self.updated_at = 0.0
+
+    def age(self) -> float:
+        return time.monotonic() - self.updated_at
+
+
+class RealtimeQuoteFeed:
+    """KIS 웹소켓 실시간 시세 수신기
+
+    - 국내(H0STASP0/H0STCNT0), 해외(HDFSASP0/HDFSCNT0) 호가/체결을 구독해 종목별 OrderBook 을 유지합니다.
+    - 세션당 등록 가능한 실시간 TR 수(max_subscriptions)를 넘으면 가장 오래 조회되지 않은 종목의 구독을 해제합니다.
+    - watch() 는 다른 스레드에서도 호출할 수 있습니다.
+    - order_tracker 가 주어지면 HTS ID 로 체결통보(notice_trs)를 구독해 주문 상태를 갱신합니다.
+    """
+
+    def __init__(self, env, ws_url: str, max_subscriptions: int = 40, max_age_ms: float = 1000,
+                 watchlist: Optional[List[Tuple[str, str]]] = None,
+                 order_tracker=None, hts_id: str = "", notice_trs: Tuple[str, ...] = ()):
+        self.env = env
+        self.ws_url = ws_url
+        self.max_subscriptions = max_subscriptions
+        self.max_age = max_age_ms / 1000.0
+        self.books: Dict[str, OrderBook] = {}
+
+        # (market, tr_key) -> None, 최근 조회 순서 유지 (LRU)
+        self._watched: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._subscribed = set()
+        self._initial_watchlist = watchlist or []
+
+        # 체결통보 구독 (tr_id -> (key, iv) 는 구독 응답에서 받음)
+        self.order_tracker = order_tracker
+        self.hts_id = hts_id
+        self.notice_trs = tuple(notice_trs) if order_tracker is not None and hts_id else ()
+        self._cipher_keys: Dict[str, Tuple[str, str]] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._commands: Optional[asyncio.Queue] = None
+        self._ws = None
+        self._approval_key: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+        self.messages = 0
+        self.notices = 0
+        self.reconnects = 0
+        self.evictions = 0
+
+    # 외부 인터페이스
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._commands = asyncio.Queue()
+        for market, exchange_code, stock_code in self._initial_watchlist:
+            self.watch(market, exchange_code, stock_code)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Realtime quote feed started: {self.ws_url}")
+
+    async def stop(self):
+        self._stopped = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Realtime quote feed stopped")
+
+    def watch(self, market: str, exchange_code: str, stock_code: str):
+        """종목을 관심 목록 맨 앞으로 올리고, 필요하면 구독을 요청"""
+        tr_key = stock_code if market == "domestic" else overseas_tr_key(exchange_code, stock_code)
+        if not tr_key or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._commands.put_nowait, (market, tr_key))
+
+    def get_overseas_hoga(self, exchange_code: str, stock_code: str) -> Optional[Dict]:
+        """get_hoga_info_overseas 와 같은 형태의 호가 (신선하지 않으면 None)"""
+        tr_key = overseas_tr_key(exchange_code, stock_code)
+        book = self.books.get(tr_key) if tr_key else None
+        if book is None or not book.asks or not book.current_price or book.age() > self.max_age:
+            return None
+        try:
+            return {
+                'currency': HOGA_CURRENCY.get(tr_key[1:4], ''),
+                'decimal_places': int(book.decimal_places or 0),
+                'current_price': float(book.current_price),
+                'ask_price': float(book.asks[0]),
+                'bid_price': float(book.bids[0]),
+                'ask_volume': int(book.ask_volumes[0] or 0),
+                'bid_volume': int(book.bid_volumes[0] or 0),
+            }
+        except (ValueError, IndexError):
+            return None
+
+    def get_domestic_hoga(self, stock_code: str) -> Optional[Dict]:
+        """get_hoga_info(output1) 와 같은 키를 가진 호가 (신선하지 않으면 None)"""
+        book = self.books.get(stock_code)
+        if book is None or not book.asks or book.age() > self.max_age:
+            return None
+        hoga = {"aspr_acpt_hour": book.hoga_time}
+        for i in range(len(book.asks)):
+            hoga[f"askp{i + 1}"] = book.asks[i]
+            hoga[f"bidp{i + 1}"] = book.bids[i]
+            hoga[f"askp_rsqn{i + 1}"] = book.ask_volumes[i]
+            hoga[f"bidp_rsqn{i + 1}"] = book.bid_volumes[i]
+        return hoga
+
+    def get_stats(self) -> Dict:
+        return {
+            "connected": self._ws is not None,
+            "watched": len(self._watched),
+            "subscriptions": len(self._subscribed),
+            "books": len(self.books),
+            "messages": self.messages,
+            "notices": self.notices,
+            "reconnects": self.reconnects,
+            "evictions": self.evictions,
+        }
+
+    # 내부 처리
+
+    async def _run(self):
+        import websockets
+
+        backoff = 1.0
+        while not self._stopped:
+            try:
+                if self._approval_key is None:
+                    # 접속키 발급은 동기 HTTP 호출이므로 이벤트 루프 밖에서 한 번만 수행
+                    self._approval_key = await asyncio.to_thread(
+                        lambda: self.env.websocket_approval_key)
+                async with websockets.connect(self.ws_url, ping_interval=None) as ws:
+                    self._ws = ws
+                    self._subscribed.clear()
+                    backoff = 1.0
+                    for tr_id in self.notice_trs:
+                        await self._send(tr_id, self.hts_id, "1")
+                        self._subscribed.add((tr_id, self.hts_id))
+                    for market, tr_key in list(self._watched.keys()):
+                        await self._subscribe(market, tr_key)
+                    await self._serve(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Realtime feed connection error: {e}")
+            finally:
+                self._ws = None
+            if self._stopped:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _serve(self, ws):
+        """수신/구독 명령 루프를 함께 실행하다가 어느 한쪽이 끝나면 다른 쪽도 정리
+
+        서버가 정상 종료(ConnectionClosedOK)하면 수신 루프가 그냥 끝나므로 이 경우도 끊김으로 보고 재접속합니다.
+        """
+        recv_task = asyncio.ensure_future(self._recv_loop(ws))
+        command_task = asyncio.ensure_future(self._command_loop())
+        try:
+            done, _ = await asyncio.wait({recv_task, command_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (recv_task, command_task):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(recv_task, command_task, return_exceptions=True)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        raise ConnectionError("Realtime websocket closed by server")
+
+    async def _command_loop(self):
+        while True:
+            market, tr_key = await self._commands.get()
+            key = (market, tr_key)
+            if key in self._watched:
+                self._watched.move_to_end(key)
+                continue
+            self._watched[key] = None
+            # 종목당 호가/체결 2개 TR 을 사용하므로 한도 내에서 가장 오래된 종목부터 해제
+            while len(self._watched) * 2 + len(self.notice_trs) > self.max_subscriptions:
+                old_market, old_key = self._watched.popitem(last=False)[0]
+                await self._unsubscribe(old_market, old_key)
+                self.books.pop(old_key, None)
+                self.evictions += 1
+            await self._subscribe(market, tr_key)
+
+    async def _send(self, tr_id: str, tr_key: str, tr_type: str):
+        message = {
+            "header": {
+                "approval_key": self._approval_key,
+                "custtype": self.env.custtype or "P",
+                "tr_type": tr_type,  # 1: 등록, 2: 해제
+                "content-type": "utf-8",
+            },
+            "body": {"input": {"tr_id": tr_id, "tr_key": tr_key}},
+        }
+        await self._ws.send(json.dumps(message))
+
+    async def _subscribe(self, market: str, tr_key: str):
+        if self._ws is None:
+            return
+        for tr_id in MARKET_TRS[market]:
+            await self._send(tr_id, tr_key, "1")
+            self._subscribed.add((tr_id, tr_key))
+
+    async def _unsubscribe(self, market: str, tr_key: str):
+        if self._ws is None:
+            return
+        for tr_id in MARKET_TRS[market]:
+            await self._send(tr_id, tr_key, "2")
+            self._subscribed.discard((tr_id, tr_key))
+
+    async def _recv_loop(self, ws):
+        async for raw in ws:
+            self.messages += 1
+            if raw[0] in ("0", "1"):
+                self._handle_data(raw)
+            else:
+                await self._handle_control(ws, raw)
+
+    async def _handle_control(self, ws, raw: str):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        tr_id = message.get("header", {}).get("tr_id")
+        if tr_id == "PINGPONG":
+            await ws.send(raw)
+            return
+        body = message.get("body", {})
+        if body.get("rt_cd") not in (None, "0"):
+            logger.warning(f"Realtime subscribe failed: {tr_id} {body.get('msg_cd')} {body.get('msg1')}")
+            return
+        # 체결통보는 암호화되어 전달되므로 구독 응답의 키/IV 보관
+        output = body.get("output") or {}
+        if tr_id in self.notice_trs and output.get("key"):
+            self._cipher_keys[tr_id] = (output["key"], output["iv"])
+
+    def _handle_data(self, raw: str):
+        # 형식: 암호화여부|TR_ID|데이터건수|필드^필드^... (여러 건이면 이어서 전달)
+        parts = raw.split("|", 3)
+        if len(parts) < 4:
+            return
+        tr_id, payload = parts[1], parts[3]
+        if tr_id in self.notice_trs:
+            self._handle_notice(tr_id, parts[0], payload)
+            return
+        count = int(parts[2]) if parts[2].isdigit() else 1
+        fields = payload.split("^")
+        size = len(fields) // max(count, 1)
+        latest = fields[size * (count - 1):size * count]  # 같은 메시지 안에서는 마지막 건이 최신
+        if tr_id == OVERSEAS_HOGA_TR:
+            self._on_overseas_hoga(latest)
+        elif tr_id == OVERSEAS_TRADE_TR:
+            self._on_overseas_trade(latest)
+        elif tr_id == DOMESTIC_HOGA_TR:
+            self._on_domestic_hoga(latest)
+        elif tr_id == DOMESTIC_TRADE_TR:
+            self._on_domestic_trade(latest)
+
+    def _handle_notice(self, tr_id: str, encrypted: str, payload: str):
+        if encrypted == "1":
+            cipher_key = self._cipher_keys.get(tr_id)
+            if cipher_key is None:
+                logger.warning(f"Execution notice received before cipher key: {tr_id}")
+                return
+            try:
+                payload = aes_cbc_base64_decrypt(cipher_key[0], cipher_key[1], payload)
+            except Exception as e:
+                logger.error(f"Failed to decrypt execution notice: {e}")
+                return
+        self.notices += 1
+        fields = payload.split("^")
+        if tr_id in DOMESTIC_NOTICE_TRS:
+            self.order_tracker.on_domestic_notice(fields)
+        elif tr_id in OVERSEAS_NOTICE_TRS:
+            self.order_tracker.on_overseas_notice(fields)
+
+    def _book(self, market: str, tr_key: str) -> Optional[OrderBook]:
+        book = self.books.get(tr_key)
+        if book is None:
+            # 구독 해제 직후 도착한 데이터로 책이 다시 생기지 않도록 관심 종목만 생성
+            if (market, tr_key) not in self._watched:
+                return None
+            book = self.books[tr_key] = OrderBook(tr_key)
+        return book
+
+    def _on_overseas_hoga(self, f: List[str]):
+        # RSYM, SYMB, ZDIV, XYMD, XHMS, KYMD, KHMS, BVOL, AVOL, BDVL, ADVL, PBID1, PASK1, VBID1, VASK1, ...
+        if len(f) < 15:
+            return
+        book = self._book("overseas", f[0])
+        if book is None:
+            return
+        book.decimal_places = f[2]
+        book.hoga_time = f[4]
+        book.bids, book.asks = [f[11]], [f[12]]
+        book.bid_volumes, book.ask_volumes = [f[13]], [f[14]]
+        book.updated_at = time.monotonic()
+
+    def _on_overseas_trade(self, f: List[str]):
+        # RSYM, SYMB, ZDIV, TYMD, XYMD, XHMS, KYMD, KHMS, OPEN, HIGH, LOW, LAST, ...
+        if len(f) < 12:
+            return
+        # 신선도(updated_at)는 호가 수신 기준으로만 판단
+        book = self._book("overseas", f[0])
+        if book is None:
+            return
+        book.decimal_places = f[2]
+        book.current_price = f[11]
+
+    def _on_domestic_hoga(self, f: List[str]):
+        # MKSC_SHRN_ISCD, BSOP_HOUR, HOUR_CLS_CODE, ASKP1~10, BIDP1~10, ASKP_RSQN1~10, BIDP_RSQN1~10, ...
+        if len(f) < 43:
+            return
+        book = self._book("domestic", f[0])
+        if book is None:
+            return
+        book.hoga_time = f[1]
+        book.asks = f[3:13]
+        book.bids = f[13:23]
+        book.ask_volumes = f[23:33]
+        book.bid_volumes = f[33:43]
+        book.updated_at = time.monotonic()
+
+    def _on_domestic_trade(self, f: List[str]):
+        # MKSC_SHRN_ISCD, STCK_CNTG_HOUR, STCK_PRPR, ...
+        if len(f) < 3:
+            return
+        book = self._book("domestic", f[0])
+        if book is None:
+            return
+        book.current_price = f[2]
+
+
+_realtime_feed: Optional[RealtimeQuoteFeed] = None
+
+def get_realtime_feed() -> Optional[RealtimeQuoteFeed]:
+    """실행 중인 RealtimeQuoteFeed (REALTIME_ENABLED 가 아니면 None)"""
+    return _realtime_feed
+
+def set_realtime_feed(feed: Optional[RealtimeQuoteFeed]):
+    global _realtime_feed
+    _realtime_feed = feed
+
+def parse_watchlist(value: str) -> List[Tuple[str, str, str]]:
+    """'NASDAQ:AAPL,KRX:005930' 형태의 관심 종목 설정 파싱"""
+    watchlist = []
+    for item in filter(None, (x.strip() for x in (value or "").split(","))):
+        exchange_code, _, stock_code = item.partition(":")
+        if not stock_code:
+            continue
+        market = "domestic" if exchange_code.upper() == "KRX" else "overseas"
+        watchlist.append((market, exchange_code.upper(), stock_code))
+    return watchlist
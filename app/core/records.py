@@ -0,0 +1,177 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+def to_number(value):
+    """숫자 문자열을 int/float 로 변환 (pd.to_numeric(errors='coerce') 와 같은 용도)"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+
+def to_str(value):
+    return "" if value is None else value
+
+
+class Record:
+    """KIS 응답 목록의 한 건
+
+    COLUMNS = ((속성명, API 필드명, 출력 컬럼명, 변환 함수), ...)
+    """
+    __slots__ = ()
+    COLUMNS = ()
+
+    @classmethod
+    def from_api(cls, row: Dict) -> "Record":
+        record = cls.__new__(cls)
+        for attr, field, _, convert in cls.COLUMNS:
+            setattr(record, attr, convert(row.get(field)))
+        return record
+
+    def to_dict(self) -> Dict:
+        """기존 DataFrame.to_dict(orient='records') 와 같은 한글 컬럼명 딕셔너리"""
+        return {label: getattr(self, attr) for attr, _, label, _ in self.COLUMNS}
+
+    def __repr__(self):
+        fields = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr, _, _, _ in self.COLUMNS)
+        return f"{type(self).__name__}({fields})"
+
+
+class Holding(Record):
+    """국내주식 잔고"""
+    __slots__ = ("symbol", "name", "quantity", "orderable_quantity", "sellable_quantity", "avg_price",
+                 "profit_rate", "current_price", "change", "change_rate", "eval_amount", "profit_loss")
+    COLUMNS = (
+        ("symbol", "pdno", "종목코드", to_str),
+        ("name", "prdt_name", "종목명", to_str),
+        ("quantity", "hldg_qty", "보유수량", to_number),
+        ("orderable_quantity", "ord_psbl_qty", "주문가능수량", to_number),
+        ("sellable_quantity", "slpsb_qty", "매도가능수량", to_number),
+        ("avg_price", "pchs_unpr", "매입단가", to_number),
+        ("profit_rate", "pftrt", "수익률", to_number),
+        ("current_price", "prpr", "현재가", to_number),
+        ("change", "bfdy_cprs_icdc", "전일대비증감", to_number),
+        ("change_rate", "fltt_rt", "전일대비 등락률", to_number),
+        ("eval_amount", "tot_evlu_amt", "총평가금액", to_number),
+        ("profit_loss", "evlu_pfls_smtl_amt", "평가손익합계금액", to_number),
+    )
+
+
+class OverseasHolding(Record):
+    """해외주식 잔고"""
+    __slots__ = ("symbol", "exchange_code", "name", "quantity", "sellable_quantity", "avg_price",
+                 "profit_rate", "current_price", "profit_loss")
+    COLUMNS = (
+        ("symbol", "ovrs_pdno", "종목코드", to_str),
+        ("exchange_code", "ovrs_excg_cd", "해외거래소코드", to_str),
+        ("name", "ovrs_item_name", "종목명", to_str),
+        ("quantity", "ovrs_cblc_qty", "보유수량", to_number),
+        ("sellable_quantity", "ord_psbl_qty", "매도가능수량", to_number),
+        ("avg_price", "pchs_avg_pric", "매입단가", to_number),
+        ("profit_rate", "evlu_pfls_rt", "수익률", to_number),
+        ("current_price", "now_pric2", "현재가", to_number),
+        ("profit_loss", "frcr_evlu_pfls_amt", "평가손익", to_number),
+    )
+
+
+class Order(Record):
+    """국내주식 정정취소가능주문"""
+    __slots__ = ("order_no", "symbol", "quantity", "price", "order_time", "branch", "cancelable_quantity",
+                 "side_code")
+    COLUMNS = (
+        ("order_no", "odno", "주문번호", to_str),
+        ("symbol", "pdno", "종목코드", to_str),
+        ("quantity", "ord_qty", "주문수량", to_number),
+        ("price", "ord_unpr", "주문단가", to_number),
+        ("order_time", "ord_tmd", "주문일시", to_str),
+        ("branch", "ord_gno_brno", "주문구분", to_str),
+        ("cancelable_quantity", "psbl_qty", "주문가능수량", to_number),
+        ("side_code", "sll_buy_dvsn_cd", "매도매수구분코드", to_str),
+    )
+
+
+class OverseasOrder(Record):
+    """해외주식 미체결내역"""
+    __slots__ = ("order_no", "symbol", "quantity", "price", "order_time", "exchange_code",
+                 "original_order_no", "unfilled_quantity", "side_code", "side_name")
+    COLUMNS = (
+        ("order_no", "odno", "주문번호", to_str),
+        ("symbol", "pdno", "종목코드", to_str),
+        ("quantity", "ft_ord_qty", "주문수량", to_number),
+        ("price", "ft_ord_unpr3", "주문단가", to_number),
+        ("order_time", "ord_tmd", "주문일시", to_str),
+        ("exchange_code", "ovrs_excg_cd", "해외거래소코드", to_str),
+        ("original_order_no", "orgn_odno", "원주문번호", to_str),
+        ("unfilled_quantity", "nccs_qty", "주문가능수량", to_number),
+        ("side_code", "sll_buy_dvsn_cd", "매도매수구분코드", to_str),
+        ("side_name", "sll_buy_dvsn_cd_name", "매도매수구분코드명", to_str),
+    )
+
+
+class FluctuationRank(Record):
+    """등락률 순위"""
+    __slots__ = ("symbol", "name", "change_rate", "up_days", "high_ratio")
+    COLUMNS = (
+        ("symbol", "stck_shrn_iscd", "주식 단축 종목코드", to_str),
+        ("name", "hts_kor_isnm", "HTS 한글 종목명", to_str),
+        ("change_rate", "prdy_ctrt", "전일 대비율", to_str),
+        ("up_days", "cnnt_ascn_dynu", "연속 상승 일수", to_str),
+        ("high_ratio", "hgpr_vrss_prpr_rate", "최고가 대비 현재가 비율", to_str),
+    )
+
+
+class RecordSet(list):
+    """Record 목록 + 종목코드(symbol) 인덱스
+
+    pandas 없이 동작하며, DataFrame 이 필요한 경우에만 to_dataframe() 으로 변환합니다.
+    인덱스는 처음 조회할 때 만들어지므로 생성 후에는 목록을 변경하지 않습니다.
+    """
+    __slots__ = ("record_type", "_index")
+
+    def __init__(self, records: Iterable[Record] = (), record_type: Optional[Type[Record]] = None):
+        super().__init__(records)
+        self.record_type = record_type
+        self._index = None
+
+    @classmethod
+    def from_api(cls, rows: Optional[List[Dict]], record_type: Type[Record]) -> "RecordSet":
+        return cls(map(record_type.from_api, rows or []), record_type)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def symbol_index(self) -> Dict[str, List[Record]]:
+        if self._index is None:
+            index = {}
+            for record in self:
+                index.setdefault(record.symbol, []).append(record)
+            self._index = index
+        return self._index
+
+    def by_symbol(self, symbol: str) -> List[Record]:
+        return self.symbol_index.get(symbol, [])
+
+    def find(self, symbol: str, exchange_code: Optional[str] = None) -> Optional[Record]:
+        """종목코드(와 거래소코드)가 일치하는 첫 번째 레코드"""
+        for record in self.by_symbol(symbol):
+            if exchange_code is None or getattr(record, "exchange_code", None) == exchange_code:
+                return record
+        return None
+
+    def to_records(self) -> List[Dict]:
+        return [record.to_dict() for record in self]
+
+    def to_dataframe(self):
+        """pandas DataFrame 으로 변환 (pandas 는 이때 import)"""
+        import pandas as pd
+
+        columns = [label for _, _, label, _ in self.record_type.COLUMNS] if self.record_type else None
+        return pd.DataFrame(self.to_records(), columns=columns)
@@ -5,9 +5,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def setup_scheduler():
+def setup_scheduler(position_service: PositionService = None):
     scheduler = BackgroundScheduler()
-    position_service = PositionService()
+    position_service = position_service or PositionService()
 
     def reduce_positions_job():
         try:
@@ -0,0 +1,194 @@
+from contextlib import contextmanager
+import hashlib
+import mmap
+import os
+import pickle
+import random
+import sqlite3
+import struct
+import threading
+import time
+import logging
+from typing import Any, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl 미지원 환경에서는 공유 상태를 쓰지 않음
+    fcntl = None
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def shared_state_dir() -> str:
+    """SHARED_STATE_DIR (비어 있거나 fcntl 을 쓸 수 없으면 빈 문자열 = 워커별 상태)"""
+    path = get_settings()["SHARED_STATE_DIR"]
+    if not path or fcntl is None:
+        return ""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def app_key_id() -> str:
+    """같은 디렉터리를 여러 appkey 가 쓰더라도 한도를 따로 두기 위한 식별자"""
+    return hashlib.sha256((get_settings()["API_KEY"] or "").encode()).hexdigest()[:12]
+
+
+class SharedBucket:
+    """여러 프로세스가 공유하는 토큰 버킷 상태 (mmap 파일 + flock)
+
+    (기준 속도, 현재 속도, 토큰 수, 마지막 갱신 시각, 마지막 속도 조정 시각) 을 고정 길이로 저장합니다.
+    시각은 time.monotonic() 값으로, 같은 호스트의 프로세스끼리는 비교할 수 있습니다.
+    """
+    FORMAT = struct.Struct("<4sddddd")
+    MAGIC = b"KRL1"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < self.FORMAT.size:
+            os.ftruncate(self._fd, self.FORMAT.size)
+        self._map = mmap.mmap(self._fd, self.FORMAT.size)
+
+    @contextmanager
+    def locked(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def read(self) -> Optional[Tuple[float, float, float, float, float]]:
+        """잠금 안에서 호출, 아직 기록된 적이 없으면 None"""
+        magic, *state = self.FORMAT.unpack_from(self._map, 0)
+        return tuple(state) if magic == self.MAGIC else None
+
+    def write(self, base_rate: float, rate: float, tokens: float, updated: float, last_adjusted: float):
+        """잠금 안에서 호출"""
+        self.FORMAT.pack_into(self._map, 0, self.MAGIC, base_rate, rate, tokens, updated, last_adjusted)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+class SharedCache:
+    """여러 프로세스가 공유하는 짧은 TTL 캐시 (SQLite WAL)
+
+    값은 pickle 로 저장하며, 같은 키를 여러 워커가 동시에 조회할 때는
+    claim() 으로 임대(lease)를 얻은 한 워커만 KIS 를 호출하고 나머지는 결과가 기록되기를 기다립니다.
+    캐시이므로 SQLite 오류는 기록만 하고 조회 실패(캐시 없음)로 처리합니다.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=1.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )""")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )""")
+        self._puts = 0
+        self.errors = 0
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def get(self, key: str) -> Any:
+        try:
+            row = self._execute("SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                                (key, time.time())).fetchone()
+            return pickle.loads(row[0]) if row else None
+        except (sqlite3.Error, pickle.UnpicklingError) as e:
+            self._on_error("get", e)
+            return None
+
+    def claim(self, key: str, lease_sec: float) -> Optional[int]:
+        """조회 임대를 얻으면 소유자 번호, 다른 워커가 조회 중이면 None (오류 시에도 직접 조회하도록 번호 반환)"""
+        owner = random.getrandbits(62)
+        now = time.time()
+        try:
+            cur = self._execute(
+                """INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                   WHERE leases.expires_at < ?""",
+                (key, owner, now + lease_sec, now))
+            return owner if cur.rowcount == 1 else None
+        except sqlite3.Error as e:
+            self._on_error("claim", e)
+            return owner
+
+    def put(self, key: str, value: Any, ttl: float, owner: Optional[int] = None):
+        """값 기록 (value 가 비어 있으면 기록하지 않음) 후 임대 반납"""
+        now = time.time()
+        try:
+            blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if value and ttl > 0 else None
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if blob is not None:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                            (key, blob, now + ttl))
+                    if owner is not None:
+                        self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+                    self._puts += 1
+                    if self._puts % self.PRUNE_EVERY == 0:
+                        self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+                        self._conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+            self._on_error("put", e)
+
+    def delete(self, key: str):
+        try:
+            self._execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self._on_error("delete", e)
+
+    def clear(self, prefix: str):
+        try:
+            self._execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except sqlite3.Error as e:
+            self._on_error("clear", e)
+
+    def _on_error(self, op: str, error: Exception):
+        self.errors += 1
+        logger.warning(f"Shared cache {op} failed: {error}")
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_loaded = False
+_shared_cache_lock = threading.Lock()
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """SHARED_STATE_DIR 가 설정된 경우에만 워커 간 공유 캐시 반환"""
+    global _shared_cache, _shared_cache_loaded
+    if not _shared_cache_loaded:
+        with _shared_cache_lock:
+            if not _shared_cache_loaded:
+                directory = shared_state_dir()
+                if directory:
+                    try:
+                        _shared_cache = SharedCache(os.path.join(directory, f"cache_{app_key_id()}.db"))
+                    except (OSError, sqlite3.Error) as e:
+                        logger.warning(f"Shared cache disabled: {e}")
+                _shared_cache_loaded = True
+    return _shared_cache
@@ -1,12 +1,21 @@
 from datetime import datetime, timedelta
 import json
-import requests
 import logging
+import threading
+import time
 from typing import Optional
 
+from app.core.config import get_settings
+from app.core.http_client import get_http_client
+from app.core.token_store import get_token_store
+from app.core.metrics import get_metrics
+
 logger = logging.getLogger(__name__)
 
 class TokenManager:
+    # 백그라운드 갱신 실패 시 재시도 간격(초)
+    REFRESH_RETRY_SEC = 30
+
     _instance: Optional['TokenManager'] = None
     _initialized: bool = False
     
@@ -21,6 +30,12 @@ class TokenManager:
             self.api_secret = api_secret
             self.token = None
             self.expires_at = None
+            self.refresh_margin = timedelta(seconds=get_settings()["TOKEN_REFRESH_MARGIN_SEC"])
+            self._lock = threading.Lock()
+            # (authorization 헤더 값, 갱신 시각, 만료 시각) - 요청 경로는 잠금 없이 이 튜플만 읽음
+            self._current = (None, 0.0, 0.0)
+            self._refresher: Optional[threading.Thread] = None
+            self._stop_event = threading.Event()
             
             if api_key and api_secret:  # credentials가 제공된 경우에만 토큰 발급
                 self._issue_new_token()
@@ -34,39 +49,140 @@ class TokenManager:
             self._issue_new_token()
             TokenManager._initialized = True
 
+    def _is_valid(self) -> bool:
+        """갱신 여유시간(refresh_margin) 전까지를 유효한 토큰으로 간주"""
+        return bool(self.token and self.expires_at and
+                    self.expires_at - self.refresh_margin > datetime.now())
+
+    def _publish(self):
+        """새 토큰을 authorization 헤더 값으로 한 번에 교체"""
+        expires_ts = self.expires_at.timestamp()
+        refresh_ts = expires_ts - self.refresh_margin.total_seconds()
+        self._current = (f"Bearer {self.token}", refresh_ts, expires_ts)
+
+    def _load_from_store(self, store) -> bool:
+        """저장소의 토큰이 유효하면 가져옴"""
+        stored = store.load(self.api_key)
+        if not stored:
+            return False
+        token, expires_at = stored
+        if expires_at - self.refresh_margin <= datetime.now():
+            return False
+        self.token, self.expires_at = token, expires_at
+        self._publish()
+        get_metrics().token_event("reused_stored")
+        return True
+
     def _issue_new_token(self):
-        """새로운 토큰 발급"""
+        """유효한 토큰이 없을 때만 새로운 토큰 발급"""
         if not self.api_key or not self.api_secret:
             raise ValueError("API credentials not set")
-            
-        if not self.token or not self.expires_at or \
-           self.expires_at - timedelta(hours=1) <= datetime.now():
-            
-            url = "https://openapi.koreainvestment.com:9443/oauth2/tokenP"
-            headers = {"content-type": "application/json"}
-            body = {
-                "grant_type": "client_credentials",
-                "appkey": self.api_key,
-                "appsecret": self.api_secret
-            }
-            
-            try:
-                res = requests.post(url, headers=headers, data=json.dumps(body))
-                res.raise_for_status()
-                
-                token_data = res.json()
-                self.token = token_data.get('access_token')
-                self.expires_at = datetime.now() + timedelta(hours=24)
-                logger.info("Issued new token")
-                
-            except Exception as e:
-                logger.error(f"Error issuing new token: {e}")
-                raise
+
+        if self._is_valid():
+            return
+
+        with self._lock:
+            if self._is_valid():
+                return
+
+            store = get_token_store()
+            if store is None:
+                self._request_token()
+                return
+
+            # 다른 워커나 이전 프로세스가 저장한 토큰 재사용
+            if self._load_from_store(store):
+                logger.info("Reused stored token")
+                return
+
+            with store.lock():
+                # 잠금 대기 중 다른 프로세스가 재발급했을 수 있으므로 다시 확인
+                if self._load_from_store(store):
+                    logger.info("Reused token issued by another process")
+                    return
+                self._request_token()
+                try:
+                    store.save(self.api_key, self.token, self.expires_at)
+                except OSError as e:
+                    logger.warning(f"Failed to save token: {e}")
+
+    def _request_token(self):
+        """/oauth2/tokenP 호출"""
+        base_url = get_settings()["URL"] or "https://openapi.koreainvestment.com:9443"
+        url = f"{base_url}/oauth2/tokenP"
+        headers = {"content-type": "application/json"}
+        body = {
+            "grant_type": "client_credentials",
+            "appkey": self.api_key,
+            "appsecret": self.api_secret
+        }
+
+        try:
+            res = get_http_client().post(url, headers=headers, data=json.dumps(body))
+            res.raise_for_status()
+
+            token_data = res.json()
+            self.token = token_data.get('access_token')
+            expires_in = int(token_data.get('expires_in') or 86400)
+            self.expires_at = datetime.now() + timedelta(seconds=expires_in)
+            self._publish()
+            get_metrics().token_event("issued")
+            logger.info(f"Issued new token (expires at {self.expires_at:%Y-%m-%d %H:%M:%S})")
+
+        except Exception as e:
+            get_metrics().token_event("issue_failed")
+            logger.error(f"Error issuing new token: {e}")
+            raise
 
     def get_token(self) -> str:
-        """유효한 토큰 반환"""
+        """유효한 토큰 반환
+
+        백그라운드 갱신이 동작 중이면 만료 전까지 캐시된 값을 잠금 없이 반환하고,
+        그렇지 않으면 갱신 시각이 지난 경우에만 요청 스레드에서 재발급한다.
+        """
         if not TokenManager._initialized:
             raise ValueError("TokenManager not initialized")
-            
-        self._issue_new_token()  # 필요한 경우에만 새로운 토큰 발급
-        return f"Bearer {self.token}"
\ No newline at end of file
+
+        authorization, refresh_ts, expires_ts = self._current
+        now = time.time()
+        if now < refresh_ts or (now < expires_ts and self.is_refreshing()):
+            return authorization
+
+        self._issue_new_token()
+        return self._current[0]
+
+    def seconds_until_expiry(self) -> float:
+        return max(self._current[2] - time.time(), 0.0)
+
+    def is_refreshing(self) -> bool:
+        return self._refresher is not None and self._refresher.is_alive()
+
+    def start_refresher(self):
+        """만료 전에 토큰을 미리 갱신하는 백그라운드 스레드 시작"""
+        if self.is_refreshing():
+            return
+        self._stop_event.clear()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="kis-token-refresher", daemon=True)
+        self._refresher.start()
+        logger.info("Token refresher started")
+
+    def stop_refresher(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout)
+            self._refresher = None
+        logger.info("Token refresher stopped")
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            delay = max(self._current[1] - time.time(), 0.0)
+            if self._stop_event.wait(delay):
+                break
+            try:
+                self._issue_new_token()
+            except Exception as e:
+                get_metrics().token_event("refresh_failed")
+                logger.error(f"Background token refresh failed: {e}")
+                if self._stop_event.wait(self.REFRESH_RETRY_SEC):
+                    break
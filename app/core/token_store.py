@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl 미지원 환경에서는 프로세스 간 잠금 생략
+    fcntl = None
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class TokenStore:
+    """
+    접근 토큰 파일 저장소
+
+    같은 호스트의 uvicorn 워커들과 재시작된 프로세스가 만료 전까지 하나의 토큰을 공유한다.
+    파일 잠금(flock)으로 토큰 재발급은 한 프로세스만 수행한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key_for(api_key: str) -> str:
+        """appkey 원문 대신 해시를 저장 키로 사용"""
+        return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+    def _read_all(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read token store {self.path}: {e}")
+            return {}
+
+    def load(self, api_key: str) -> Optional[Tuple[str, datetime]]:
+        """저장된 (토큰, 만료시각) 반환, 없으면 None"""
+        entry = self._read_all().get(self.key_for(api_key))
+        if not entry:
+            return None
+        try:
+            return entry["access_token"], datetime.fromisoformat(entry["expires_at"])
+        except (KeyError, ValueError):
+            return None
+
+    def save(self, api_key: str, token: str, expires_at: datetime):
+        """임시 파일에 쓴 뒤 교체하여 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 함"""
+        data = self._read_all()
+        data[self.key_for(api_key)] = {
+            "access_token": token,
+            "expires_at": expires_at.isoformat(),
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def lock(self):
+        """프로세스 간 배타 잠금 (토큰 재발급 구간)"""
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+_token_store: Optional[TokenStore] = None
+
+def get_token_store() -> Optional[TokenStore]:
+    """설정된 토큰 저장소 반환 (TOKEN_STORE_PATH 가 비어 있으면 None)"""
+    global _token_store
+    if _token_store is None:
+        path = get_settings()["TOKEN_STORE_PATH"]
+        if not path:
+            return None
+        _token_store = TokenStore(path)
+    return _token_store
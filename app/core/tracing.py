@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+import logging
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Trace:
+    """알림 한 건의 처리 구간 기록
+
+    구간은 (이름, 시작 오프셋 ms, 소요 ms, 깊이) 로 평평하게 쌓이며,
+    asyncio.gather 로 나뉜 태스크도 같은 Trace 객체에 기록합니다.
+    """
+    __slots__ = ("trace_id", "name", "started", "started_at", "spans", "duration_ms")
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.name = name
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[tuple] = []
+        self.duration_ms: Optional[float] = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self) -> Dict:
+        """응답에 포함할 요약 (구간별 시작/소요 ms)"""
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round(self.duration_ms if self.duration_ms is not None else self.elapsed_ms(), 2),
+            "spans": [{"name": name, "start_ms": round(start, 2), "ms": round(ms, 2), "depth": depth}
+                      for name, start, ms, depth in sorted(self.spans, key=lambda s: s[1])],
+        }
+
+    def to_dict(self) -> Dict:
+        return dict(self.summary(), name=self.name, started_at=self.started_at)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_span_depth: ContextVar[int] = ContextVar("span_depth", default=0)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name: str, trace_id: Optional[str] = None):
+    """새 Trace 를 현재 컨텍스트에 설정하고, 끝나면 TRACE_EXPORT_PATH 로 내보냄"""
+    t = Trace(name, trace_id)
+    token = _current_trace.set(t)
+    depth_token = _span_depth.set(0)
+    try:
+        yield t
+    finally:
+        t.duration_ms = t.elapsed_ms()
+        _span_depth.reset(depth_token)
+        _current_trace.reset(token)
+        exporter = get_trace_exporter()
+        if exporter is not None:
+            exporter.export(t)
+
+
+@contextmanager
+def span(name: str):
+    """현재 Trace 에 구간 기록 (Trace 가 없으면 아무 것도 하지 않음)"""
+    t = _current_trace.get()
+    if t is None:
+        yield
+        return
+    depth = _span_depth.get()
+    depth_token = _span_depth.set(depth + 1)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ended = time.perf_counter()
+        _span_depth.reset(depth_token)
+        t.spans.append((name, (started - t.started) * 1000, (ended - started) * 1000, depth))
+
+
+def record_span(name: str, started: float, ended: Optional[float] = None):
+    """이미 끝난 구간을 perf_counter 시각으로 기록 (Trace 가 없으면 무시)"""
+    t = _current_trace.get()
+    if t is None:
+        return
+    ended = ended if ended is not None else time.perf_counter()
+    t.spans.append((name, (started - t.started) * 1000, (ended - started) * 1000, _span_depth.get()))
+
+
+def traced(name: str):
+    """함수 실행 구간을 기록하는 데코레이터 (동기/비동기 함수 모두 지원)"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TraceExporter:
+    """끝난 Trace 를 JSON Lines 파일에 한 줄씩 추가"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, t: Trace):
+        line = json.dumps(t.to_dict(), ensure_ascii=False)
+        try:
+            with self._lock:
+                self._file.write(line + "\n")
+                self._file.flush()
+                self.exported += 1
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to export trace {t.trace_id}: {e}")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+_trace_exporter: Optional[TraceExporter] = None
+_trace_exporter_loaded = False
+_trace_exporter_lock = threading.Lock()
+
+def get_trace_exporter() -> Optional[TraceExporter]:
+    """TRACE_EXPORT_PATH 가 설정된 경우에만 TraceExporter 반환"""
+    global _trace_exporter, _trace_exporter_loaded
+    if not _trace_exporter_loaded:
+        with _trace_exporter_lock:
+            if not _trace_exporter_loaded:
+                path = get_settings()["TRACE_EXPORT_PATH"]
+                if path:
+                    try:
+                        _trace_exporter = TraceExporter(path)
+                    except OSError as e:
+                        logger.warning(f"Trace export disabled: {e}")
+                _trace_exporter_loaded = True
+    return _trace_exporter
@@ -1,16 +1,59 @@
-from collections import namedtuple
 import copy
 import json
+import threading
 import time
-import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
+from app.core.config import get_settings
 from app.core.exchange_codes import ExchangeCodeConverter
 from app.core.token_manager import TokenManager
+from app.core.http_client import get_http_client
+from app.core.rate_limiter import get_rate_limiter, THROTTLE_ERROR_CODE
+from app.core.quote_cache import get_quote_cache, get_open_orders_cache
+from app.core.order_latency import get_order_latency_stats
+from app.core.metrics import get_metrics
+from app.core.tracing import record_span
+from app.core.realtime import get_realtime_feed
+from app.core.records import RecordSet, Holding, OverseasHolding, Order, OverseasOrder, FluctuationRank
 
 logger = logging.getLogger(__name__)
 
+# 연속 조회 키 (국내: 100자리, 해외: 200자리)
+BALANCE_CTX_KEYS = ("CTX_AREA_FK100", "CTX_AREA_NK100")
+OVERSEAS_CTX_KEYS = ("CTX_AREA_FK200", "CTX_AREA_NK200")
+MAX_PAGES = 100
+
+def overseas_order_exchanges(exchange_codes=None):
+    """해외 미체결 통합 조회 대상 거래소 코드
+
+    지정하지 않으면 OVERSEAS_ORDER_EXCHANGES 설정, 설정도 비어 있으면 MAPPING["ORDER"] 전체를 사용합니다.
+    """
+    if not exchange_codes:
+        configured = get_settings()["OVERSEAS_ORDER_EXCHANGES"]
+        exchange_codes = [x for x in configured.split(",") if x.strip()] if configured else \
+            list(ExchangeCodeConverter.MAPPING["ORDER"].values())
+    codes = []
+    for code in exchange_codes:
+        exchange = ExchangeCodeConverter.from_string(code.strip())
+        code = ExchangeCodeConverter.get_code(exchange, "ORDER") if exchange else code.strip().upper()
+        if code not in codes:
+            codes.append(code)
+    return tuple(codes)
+
+# 안전한 형변환을 위한 helper 함수들
+def safe_float(value, default=0.0):
+    try:
+        return float(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+def safe_int(value, default=0):
+    try:
+        return int(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
 class KoreaInvestEnv:
     def __init__(self, cfg):
         self.cfg = cfg
@@ -35,16 +78,30 @@ class KoreaInvestEnv:
         }
 
         self.stock_account_number = cfg['stock_account_number']
-        self.websocket_approval_key = self.get_websocket_approval_key()
+
+        # 웹소켓 접속키는 실제로 필요할 때 발급 (websocket_approval_key 참조)
+        self._websocket_approval_key = None
+        self._approval_key_lock = threading.Lock()
         
         # 설정 업데이트
-        self.cfg['websocket_approval_key'] = self.websocket_approval_key
         self.cfg['account_num'] = self.stock_account_number
         self.cfg['using_url'] = self.using_url
 
+    @property
+    def websocket_approval_key(self):
+        """웹소켓 접속키 (최초 접근 시 한 번만 발급)"""
+        if self._websocket_approval_key is None:
+            with self._approval_key_lock:
+                if self._websocket_approval_key is None:
+                    self._websocket_approval_key = self.get_websocket_approval_key()
+                    self.cfg['websocket_approval_key'] = self._websocket_approval_key
+        return self._websocket_approval_key
+
     def get_base_headers(self):
-        self.base_headers["authorization"] = self.token_manager.get_token()
-        return copy.deepcopy(self.base_headers)
+        # 값이 모두 문자열이므로 얕은 복사로 충분
+        headers = dict(self.base_headers)
+        headers["authorization"] = self.token_manager.get_token()
+        return headers
     
     def get_full_config(self):
         return copy.deepcopy(self.cfg)
@@ -57,7 +114,7 @@ class KoreaInvestEnv:
             "secretkey": self.api_secret_key
         }
         url = f"{self.using_url}/oauth2/Approval"
-        res = requests.post(url, headers=headers, data=json.dumps(body))
+        res = get_http_client().post(url, headers=headers, data=json.dumps(body))
         approval_key = res.json()['approval_key']
         return approval_key
     
@@ -68,7 +125,7 @@ class KoreaInvestEnv:
             "appsecret": self.api_secret_key
         }
         url = f"{self.using_url}/oauth2/tokenP"
-        res = requests.post(url, headers=self.base_headers, data=json.dumps(p))
+        res = get_http_client().post(url, headers=self.base_headers, data=json.dumps(p))
         res.raise_for_status()
         my_token = res.json()['access_token']
         return f"Bearer {my_token}"
@@ -79,19 +136,27 @@ class KoreaInvestEnv:
     def get_api_secret_key(self):
         return self.cfg['api_secret_key']
 class KoreaInvestAPI:
+    """KIS OpenAPI 동기 클라이언트
+
+    각 TR 은 요청 생성(_xxx_request)과 응답 해석(_parse_xxx)으로 나뉘어 있어
+    AsyncKoreaInvestAPI 가 같은 로직을 비동기 전송으로 재사용합니다.
+    """
+
     def __init__(self, cfg, base_headers):
         self.base_headers = base_headers
         self.custtype = cfg['custtype']
-        self.websocket_approval_key = cfg['websocket_approval_key']
+        self.websocket_approval_key = cfg.get('websocket_approval_key')
         self.account_num = cfg['account_num']
         self.stock_account_product_code = cfg['stock_account_product_code']
         self.hts_id = cfg['hts_id']
         self.using_url = cfg['using_url']
+        self.token_manager = TokenManager()
+        self.hashkey_mode = get_settings()["ORDER_HASHKEY_MODE"]
 
     def set_order_hash_key(self, headers, params):
         url = f"{self.using_url}/uapi/hashkey"
 
-        res = requests.post(url, headers=headers, data=json.dumps(params))
+        res = get_http_client().post(url, headers=headers, data=json.dumps(params))
         rescode = res.status_code
         if rescode == 200:
             headers['hashkey'] = res.json()['HASH']
@@ -99,47 +164,160 @@ class KoreaInvestAPI:
             logger.error(f"Error in set_order_hash_key: {rescode}")
             return None
 
-    def _url_fetch(self, url, tr_id, params, is_post=False, use_hash=False):
+    def _build_headers(self, tr_id):
+        # 인스턴스가 여러 요청에서 공유되므로 헤더는 요청마다 복사하고 토큰은 최신 값으로 갱신
+        headers = dict(self.base_headers)
+        headers["authorization"] = self.token_manager.get_token()
+        headers["tr_id"] = tr_id
+        headers["custtype"] = self.custtype
+        return headers
+
+    def _to_api_response(self, res):
+        if res.status_code != 200:
+            logger.error(f"API request failed: {res.status_code}, {res.text}")
+            return None
+        else:
+            ar = APIResponse(res)
+            return ar
+
+    def _is_throttled(self, res):
+        """초당 거래건수 초과(EGW00201) 응답 여부"""
+        # 게이트웨이 거절은 보통 500 으로 오지만 200 + rt_cd=1 로 오는 경우도 있어 본문으로 판별
+        return THROTTLE_ERROR_CODE in res.text
+
+    def _record_response(self, tr_id, sent, res, api_response=None):
+        """응답 지연시간과 HTTP 상태/rt_cd/msg_cd 기록"""
+        if api_response is not None:
+            rt_cd, msg_cd = api_response.get_error_code() or "", api_response.get_json().get("msg_cd") or ""
+        elif self._is_throttled(res):
+            rt_cd, msg_cd = "1", THROTTLE_ERROR_CODE
+        else:
+            rt_cd, msg_cd = "", ""
+        get_metrics().observe_kis_request(tr_id, time.perf_counter() - sent, res.status_code, rt_cd, msg_cd)
+
+    def _url_fetch(self, url, tr_id, params, is_post=False, use_hash=False, tr_cont=""):
         try:
             url = f"{self.using_url}{url}"
-            headers = self.base_headers
-            headers["tr_id"] = tr_id
-            headers["custtype"] = self.custtype
-
-            if is_post:
-                if use_hash:
-                    self.set_order_hash_key(headers, params)
-                res = requests.post(url, headers=headers, data=json.dumps(params))
-            else:
-                res = requests.get(url, headers=headers, params=params)
-
-            if res.status_code != 200:
-                logger.error(f"API request failed: {res.status_code}, {res.text}")
-                return None
-            else:
-                ar = APIResponse(res)
-                return ar
+            headers = self._build_headers(tr_id)
+            if tr_cont:
+                headers["tr_cont"] = tr_cont  # 연속 조회 ("N": 다음 페이지)
+            limiter = get_rate_limiter()
+
+            # 주문 TR: hashkey 는 선택 항목이므로 ORDER_HASHKEY_MODE=sync 일 때만 사전 호출
+            is_order = is_post and use_hash
+            started = time.perf_counter()
+            hashkey_ms = 0.0
+            if is_order and self.hashkey_mode == "sync":
+                limiter.acquire(tr_id)
+                self.set_order_hash_key(headers, params)
+                hashkey_ms = (time.perf_counter() - started) * 1000
+                record_span("kis.hashkey", started)
+
+            # 스로틀로 거절된 요청은 처리되지 않으므로 속도를 낮춘 뒤 한 번 재시도
+            for attempt in range(2):
+                waiting = time.perf_counter()
+                if limiter.acquire(tr_id):
+                    record_span("rate_limit_wait", waiting)
+                sent = time.perf_counter()
+                if is_post:
+                    res = get_http_client().post(url, headers=headers, data=json.dumps(params))
+                else:
+                    res = get_http_client().get(url, headers=headers, params=params)
+                record_span(f"kis.{tr_id}", sent)
+                if attempt == 1 or not self._is_throttled(res):
+                    break
+                self._record_response(tr_id, sent, res)
+                limiter.on_throttled(tr_id)
+
+            if is_order:
+                get_order_latency_stats().record(
+                    self.hashkey_mode, (time.perf_counter() - started) * 1000, hashkey_ms)
+            api_response = self._to_api_response(res)
+            self._record_response(tr_id, sent, res, api_response)
+            return api_response
         except Exception as e:
+            get_metrics().observe_kis_error(tr_id, e)
             logger.error(f"API request failed: {e}")
             return None
         
 
+    # 연속 조회 (CTX_AREA_FK/NK + tr_cont 헤더)
+
+    def _next_page_request(self, request, res, ctx_keys):
+        """다음 페이지 요청 (마지막 페이지이거나 실패한 경우 None)"""
+        if res is None or not res.is_ok():
+            return None
+        # 응답 헤더 tr_cont 가 F/M 이면 다음 데이터가 있음
+        if getattr(res.get_header(), "tr_cont", "") not in ("F", "M"):
+            return None
+        body = res.get_body()
+        params = dict(request["params"])
+        for key in ctx_keys:
+            params[key] = (getattr(body, key.lower(), "") or "").strip()
+        if not any(params[key] for key in ctx_keys):
+            return None
+        return dict(request, params=params, tr_cont="N")
+
+    def _iter_pages(self, request, ctx_keys, prefetch=False):
+        """연속 조회 응답을 페이지 순서대로 반환
+
+        prefetch=True 이면 현재 페이지를 호출자에게 넘기기 전에 다음 페이지 요청을 미리 보냅니다.
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") if prefetch else None
+        try:
+            res = self._url_fetch(**request)
+            for _ in range(MAX_PAGES):
+                next_request = self._next_page_request(request, res, ctx_keys)
+                future = executor.submit(self._url_fetch, **next_request) if executor and next_request else None
+                yield res
+                if next_request is None:
+                    return
+                res = future.result() if future else self._url_fetch(**next_request)
+                request = next_request
+            logger.warning(f"Stopped paging {request['tr_id']} after {MAX_PAGES} pages")
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+    def _collect_pages(self, request, ctx_keys, list_field):
+        """모든 페이지의 목록(list_field)을 합쳐서 (마지막 응답, 전체 목록) 반환
+
+        어느 페이지든 실패하면 (실패한 응답 또는 None, []) 을 반환합니다.
+        """
+        last, rows = None, []
+        page = 0
+        for res in self._iter_pages(request, ctx_keys):
+            page += 1
+            if res is None or not res.is_ok():
+                # 중간 페이지가 실패하면 일부만 모인 목록을 전체로 오인하지 않도록 실패 응답만 반환
+                if page > 1:
+                    logger.error(f"Paging {request['tr_id']} failed at page {page}, discarding {len(rows)} rows")
+                return res, []
+            last = res
+            rows.extend(getattr(res.get_body(), list_field, None) or [])
+        return last, rows
+
     def get_account_info(self):
-        url = f"{self.cfg['using_url']}/uapi/account/GetAccountInfo"
-        res = requests.post(url, headers=self.base_headers)
+        url = f"{self.using_url}/uapi/account/GetAccountInfo"
+        res = get_http_client().post(url, headers=self.base_headers)
         return res.json()
     
     def get_current_price(self, stock_code):
-        url = "/uapi/domestic-stock/v1/quotations/inquire-price"
-        tr_id = "FHKST01010100"
-        
+        return get_quote_cache().get_or_fetch(
+            ("price", "KRX", stock_code), lambda: self._fetch_current_price(stock_code))
+
+    def _fetch_current_price(self, stock_code):
+        res = self._url_fetch(**self._current_price_request(stock_code))
+        return self._parse_current_price(res)
+
+    def _current_price_request(self, stock_code):
         params = {
             "FID_COND_MRKT_DIV_CODE": "J",
             "FID_INPUT_ISCD": stock_code,
         }
-        
-        res = self._url_fetch(url, tr_id, params)
-        
+        return dict(url="/uapi/domestic-stock/v1/quotations/inquire-price", tr_id="FHKST01010100", params=params)
+
+    def _parse_current_price(self, res):
         if res is not None and res.is_ok():
             return res.get_body().output
         elif res is None:
@@ -148,17 +326,40 @@ class KoreaInvestAPI:
             res.print_error()
             return dict()
     
+    def _live_hoga(self, stock_code):
+        """실시간 시세가 켜져 있으면 관심 종목으로 등록하고 신선한 호가를 반환"""
+        feed = get_realtime_feed()
+        if feed is None:
+            return None
+        feed.watch("domestic", "KRX", stock_code)
+        return feed.get_domestic_hoga(stock_code)
+
+    def _live_hoga_overseas(self, exchange_code, stock_code):
+        feed = get_realtime_feed()
+        if feed is None:
+            return None
+        feed.watch("overseas", exchange_code, stock_code)
+        return feed.get_overseas_hoga(exchange_code, stock_code)
+
     def get_hoga_info(self, stock_code):
-        url = "/uapi/domestic-stock/v1/quotations/inquire-asking-price-exp-ccn"
-        tr_id = "FHKST01010200"
-        
+        live = self._live_hoga(stock_code)
+        if live:
+            return live
+        return get_quote_cache().get_or_fetch(
+            ("hoga", "KRX", stock_code), lambda: self._fetch_hoga_info(stock_code))
+
+    def _fetch_hoga_info(self, stock_code):
+        res = self._url_fetch(**self._hoga_info_request(stock_code))
+        return self._parse_hoga_info(res)
+
+    def _hoga_info_request(self, stock_code):
         params = {
             "FID_COND_MRKT_DIV_CODE": "J",
             "FID_INPUT_ISCD": stock_code,
         }
-        
-        res = self._url_fetch(url, tr_id, params)
-        
+        return dict(url="/uapi/domestic-stock/v1/quotations/inquire-asking-price-exp-ccn", tr_id="FHKST01010200", params=params)
+
+    def _parse_hoga_info(self, res):
         if res is not None and res.is_ok():
             return res.get_body().output1
         elif res is None:
@@ -168,9 +369,15 @@ class KoreaInvestAPI:
             return dict()
     
     def get_account_balance(self, stock_code):
-        url = "/uapi/domestic-stock/v1/trading/inquire-balance"
-        tr_id = "TTTC8434R"
-        
+        res, rows = self._collect_pages(self._account_balance_request(), BALANCE_CTX_KEYS, "output1")
+        return self._parse_account_balance(res, rows)
+
+    def iter_account_balance(self, prefetch=False):
+        """국내주식 잔고를 페이지 단위로 반환 (페이지마다 (총평가금액, DataFrame))"""
+        for res in self._iter_pages(self._account_balance_request(), BALANCE_CTX_KEYS, prefetch):
+            yield self._parse_account_balance(res)
+
+    def _account_balance_request(self):
         params = {
             "CANO": self.account_num,
             "ACNT_PRDT_CD": self.stock_account_product_code,
@@ -184,45 +391,36 @@ class KoreaInvestAPI:
             "CTX_AREA_FK100": "",
             "CTX_AREA_NK100": "",
         }
+        return dict(url="/uapi/domestic-stock/v1/trading/inquire-balance", tr_id="TTTC8434R", params=params)
 
-        res = self._url_fetch(url, tr_id, params)
-        output_columns = ["종목코드", "종목명", "보유수량", "주문가능수량", "매도가능수량", "매입단가", "수익률", "현재가", "전일대비증감", "전일대비 등락률", "총평가금액", "평가손익합계금액"]
-
+    def _parse_account_balance(self, res, rows=None):
         if res is None:
-            return 0, pd.DataFrame(columns=output_columns)
+            return 0, RecordSet(record_type=Holding)
         
         try:
-            output1 = res.get_body().output1
+            output1 = res.get_body().output1 if rows is None else rows
         except Exception as e:
             logger.error(f"Error in get_account_balance: {e}")
-            return 0, pd.DataFrame(columns=output_columns)
+            return 0, RecordSet(record_type=Holding)
         
-        if res is not None and res.is_ok() and output1:
-            df = pd.DataFrame(output1)
-            target_columns = ["pdno", "prdt_name", "hldg_qty", "ord_psbl_qty", "slpsb_qty", "pchs_unpr", "pftrt", "prpr", "bfdy_cprs_icdc", "fltt_rt", "tot_evlu_amt", "evlu_pfls_smtl_amt"]
-            df = df[target_columns]
-            df[target_columns[2:]] = df[target_columns[2:]].apply(pd.to_numeric, errors='coerce') # 종목 코드, 종목명 제외하고 형변환
-            column_name_map = dict(zip(target_columns, output_columns))
-            df.rename(columns=column_name_map, inplace=True)
-            print("df1: ", df)
-            df = df[df['보유수량'] != 0]
-            print("df2: ", df)
+        if res.is_ok() and output1:
+            holdings = RecordSet(
+                (h for h in map(Holding.from_api, output1) if h.quantity != 0), Holding)
             r2 = res.get_body().output2
-            print("r2: ", r2)
-            return int(r2[0]['tot_evlu_amt']), df
+            return int(r2[0]['tot_evlu_amt']), holdings
         else:
-            print("res is not None and res.is_ok() and output1 is None or Empty")
             logger.info(f"Error in get_account_balance: {res.get_error_code()}")
             tot_evlu_amt = 0
             if res.is_ok():
                 r2 = res.get_body().output2
                 tot_evlu_amt = int(r2[0]['tot_evlu_amt'])
-            return tot_evlu_amt, pd.DataFrame(columns=output_columns)
+            return tot_evlu_amt, RecordSet(record_type=Holding)
     
     def get_fluctuation_rank(self):
-        url = "/uapi/domestic-stock/v1/ranking/fluctuation"
-        tr_id = "FHPST01700000"
-        
+        res = self._url_fetch(**self._fluctuation_rank_request())
+        return self._parse_fluctuation_rank(res)
+
+    def _fluctuation_rank_request(self):
         params = {
             "fid_rsfl_rate2": "100",    
             "fid_cond_mrkt_div_code": "J",
@@ -240,27 +438,22 @@ class KoreaInvestAPI:
             "fid_div_cls_code": "0",
             "fid_rsfl_rate1": "",
         }
-        
-        res = self._url_fetch(url, tr_id, params)
+        return dict(url="/uapi/domestic-stock/v1/ranking/fluctuation", tr_id="FHPST01700000", params=params)
 
+    def _parse_fluctuation_rank(self, res):
         if res is not None and res.is_ok():
-            df = pd.DataFrame(res.get_body().output)
-            target_columns = ["stck_shrn_iscd", "hts_kor_isnm", "prdy_ctrt", "cnnt_ascn_dynu", "hgpr_vrss_prpr_rate"]
-            output_columns = ["주식 단축 종목코드", "HTS 한글 종목명", "전일 대비율", "연속 상승 일수", "최고가 대비 현재가 비율"]
-            df = df[target_columns]
-            # df[target_columns[1:]] = df[target_columns[1:]].apply(pd.to_numeric, errors='coerce')
-            column_rename_map = dict(zip(target_columns, output_columns))
-            df.rename(columns=column_rename_map, inplace=True)
-            return df
+            return RecordSet.from_api(res.get_body().output, FluctuationRank)
         elif res is None:
-            return dict()
+            return RecordSet(record_type=FluctuationRank)
         else:
             res.print_error()
-            return dict()
+            return RecordSet(record_type=FluctuationRank)
         
     def do_order(self, stock_code, order_qty=1, order_price=0, is_buy=True, order_type="01", prd_code="01"):
-        url = '/uapi/domestic-stock/v1/trading/order-cash'
+        t1 = self._url_fetch(**self._order_request(stock_code, order_qty, order_price, is_buy, order_type))
+        return self._parse_order(t1)
 
+    def _order_request(self, stock_code, order_qty, order_price, is_buy, order_type):
         if is_buy:
             tr_id = "TTTC0802U" # 매수 주문
         else:
@@ -277,9 +470,10 @@ class KoreaInvestAPI:
             "SLL_TYPE": "01",
             "ALGO_NO": "",
         }
+        return dict(url='/uapi/domestic-stock/v1/trading/order-cash', tr_id=tr_id, params=params, is_post=True, use_hash=True)
 
-        t1 = self._url_fetch(url, tr_id, params, is_post=True, use_hash=True)
-
+    def _parse_order(self, t1):
+        """주문/정정/취소 응답 공통 처리"""
         if t1 is not None and t1.is_ok():
             return t1
         elif t1 is None:
@@ -297,9 +491,10 @@ class KoreaInvestAPI:
         return t1
     
     def _do_cancel_revise(self, order_no, order_qty, order_price, order_branch, prd_code, order_dv, cncl_dv, qty_all_yn):
-        url = "/uapi/domestic-stock/v1/trading/order-rvsecncl"
-        tr_id = "TTTC0803U"
+        t1 = self._url_fetch(**self._cancel_revise_request(order_no, order_qty, order_price, order_branch, order_dv, cncl_dv, qty_all_yn))
+        return self._parse_order(t1)
 
+    def _cancel_revise_request(self, order_no, order_qty, order_price, order_branch, order_dv, cncl_dv, qty_all_yn):
         params = {
             "CANO": self.account_num,
             "ACNT_PRDT_CD": self.stock_account_product_code,
@@ -311,16 +506,7 @@ class KoreaInvestAPI:
             "ORD_UNPR": str(order_price),
             "QTY_ALL_ORD_YN": qty_all_yn,
         }
-
-        t1 = self._url_fetch(url, tr_id, params, is_post=True)
-
-        if t1 is not None and t1.is_ok():
-            return t1
-        elif t1 is None:
-            return None
-        else:
-            t1.print_error()
-            return None
+        return dict(url="/uapi/domestic-stock/v1/trading/order-rvsecncl", tr_id="TTTC0803U", params=params, is_post=True)
 
     def do_cancel_order(self, order_no, order_qty, order_price="01", order_branch="06010", prd_code="01", order_dv="00", cncl_dv="02", qty_all_yn="Y"):
         return self._do_cancel_revise(order_no, order_qty, order_price, order_branch, prd_code, order_dv, cncl_dv, qty_all_yn)
@@ -329,9 +515,15 @@ class KoreaInvestAPI:
         return self._do_cancel_revise(order_no, order_qty, order_price, order_branch, prd_code, order_dv, cncl_dv, qty_all_yn)
     
     def get_orders(self):
-        url = "/uapi/domestic-stock/v1/trading/inquire-psbl-rvsecncl"
-        tr_id = "TTTC8036R"
+        t1, rows = self._collect_pages(self._orders_request(), BALANCE_CTX_KEYS, "output")
+        return self._parse_orders(t1, rows)
 
+    def iter_orders(self, prefetch=False):
+        """국내주식 정정취소가능주문을 페이지 단위로 반환"""
+        for t1 in self._iter_pages(self._orders_request(), BALANCE_CTX_KEYS, prefetch):
+            yield self._parse_orders(t1)
+
+    def _orders_request(self):
         params = {
             "CANO": self.account_num,
             "ACNT_PRDT_CD": self.stock_account_product_code,
@@ -340,179 +532,176 @@ class KoreaInvestAPI:
             "INQR_DVSN_1": "0", # 조회순서 0: 조회순, 1: 주문순, 2: 종목순
             "INQR_DVSN_2": "0", # 전체 0: 전체, 1: 매도, 2: 매수
         }
+        return dict(url="/uapi/domestic-stock/v1/trading/inquire-psbl-rvsecncl", tr_id="TTTC8036R", params=params)
 
-        t1 = self._url_fetch(url, tr_id, params)
-
-        if t1 is not None and t1.is_ok() and t1.get_body().output:
-            tdf = pd.DataFrame(t1.get_body().output)
-            tdf.set_index("odno", inplace=True)
-            cf1 = ['pdno', 'ord_qty', 'ord_unpr', 'ord_tmd', 'ord_gno_brno', 'ord_odno', 'psbl_qty']
-            cf2 = ['종목코드', '주문수량', '주문단가', '주문일시', '주문구분', '주문번호', '주문가능수량']
-            tdf = tdf[cf1]
-            ren_dict = dict(zip(cf1, cf2))
-            tdf.rename(columns=ren_dict, inplace=True)
-            return tdf
+    def _parse_orders(self, t1, rows=None):
+        if t1 is not None and t1.is_ok():
+            return RecordSet.from_api(t1.get_body().output if rows is None else rows, Order)
         else:
-            t1.print_error()
+            if t1 is not None:
+                t1.print_error()
             return None
     
     def do_cancel_all_orders(self, skip_codes=[]):
-        tdf = self.get_orders()
-        if tdf is not None:
-            od_list = tdf.index.to_list()
-            qty_list = tdf['주문가능수량'].to_list()
-            price_list = tdf['주문단가'].to_list()
-            branch_list = tdf['주문구분'].to_list()
-            codes_list = tdf['종목코드'].to_list()
-            cnt = 0
-            for x in od_list:
-                if codes_list[cnt] in skip_codes:
+        orders = self.get_orders()
+        if orders is not None:
+            for order in orders:
+                if order.symbol in skip_codes:
                     continue
-                ar = self.do_cancel_order(x, qty_list[cnt], price_list[cnt], branch_list[cnt])
-                cnt += 1
+                ar = self.do_cancel_order(order.order_no, order.cancelable_quantity, order.price, order.branch)
                 logger.info(f"Cancel Order: {ar}")
-                time.sleep(0.02)
 
     # 해외 주식
 
     def get_hoga_info_overseas(self, exchange_code: str, stock_code: str):
         """해외주식 호가 정보 조회"""
+        live = self._live_hoga_overseas(exchange_code, stock_code)
+        if live:
+            return live
+        return get_quote_cache().get_or_fetch(
+            ("hoga_overseas", exchange_code.upper(), stock_code.upper()),
+            lambda: self._fetch_hoga_info_overseas(exchange_code, stock_code))
+
+    def _fetch_hoga_info_overseas(self, exchange_code: str, stock_code: str):
         try:
-            url = "/uapi/overseas-price/v1/quotations/inquire-asking-price"
-            tr_id = "HHDFS76200100"  # 실시간 체결가/호가 조회
+            t1 = self._url_fetch(**self._hoga_info_overseas_request(exchange_code, stock_code))
+            return self._parse_hoga_info_overseas(t1)
+        except Exception as e:
+            logger.error(f"Error getting overseas hoga: {str(e)}")
+            logger.exception("Detailed error:")  # 상세 에러 스택트레이스 출력
+            return None
 
+    def _hoga_info_overseas_request(self, exchange_code: str, stock_code: str):
+        url = "/uapi/overseas-price/v1/quotations/inquire-asking-price"
+        tr_id = "HHDFS76200100"  # 실시간 체결가/호가 조회
 
-            exchange = ExchangeCodeConverter.from_string(exchange_code)
-            if not exchange:
-                raise ValueError(f"Invalid exchange code: {exchange}")
-            
-            hoga_exchange_code = ExchangeCodeConverter.get_code(exchange, "HOGA")
+        exchange = ExchangeCodeConverter.from_string(exchange_code)
+        if not exchange:
+            raise ValueError(f"Invalid exchange code: {exchange}")
+        
+        hoga_exchange_code = ExchangeCodeConverter.get_code(exchange, "HOGA")
 
-            logger.info(f"hoga_exchange_code: {hoga_exchange_code}")
+        logger.info(f"hoga_exchange_code: {hoga_exchange_code}")
 
-            params = {
-                "AUTH": "",
-                "EXCD": hoga_exchange_code,
-                "SYMB": stock_code.upper(),
-            }
+        params = {
+            "AUTH": "",
+            "EXCD": hoga_exchange_code,
+            "SYMB": stock_code.upper(),
+        }
+
+        logger.info(f"Requesting overseas hoga with params: {params}")
+        return dict(url=url, tr_id=tr_id, params=params)
 
-            logger.info(f"Requesting overseas hoga with params: {params}")
+    def _parse_hoga_info_overseas(self, t1):
+        if t1 is not None and t1.is_ok():
+            response_body = t1.get_body()
+            output1 = response_body.output1
+            output2 = response_body.output2
             
-            t1 = self._url_fetch(url, tr_id, params)
+            # 필요한 정보만 추출하여 반환
+            hoga_info = {
+                'currency': output1.get('curr', ''),
+                'decimal_places': safe_int(output1.get('zdiv', 0)),
+                'current_price': safe_float(output1.get('last', 0)),
+                'ask_price': safe_float(output2.get('pask1', 0)),
+                'bid_price': safe_float(output2.get('pbid1', 0)),
+                'ask_volume': safe_int(output2.get('vask1', 0)),
+                'bid_volume': safe_int(output2.get('vbid1', 0))
+            }
             
-            if t1 is not None and t1.is_ok():
-                response_body = t1.get_body()
-                output1 = response_body.output1
-                output2 = response_body.output2
-                
-                # 안전한 형변환을 위한 helper 함수들
-                def safe_float(value, default=0.0):
-                    try:
-                        return float(value) if value else default
-                    except (ValueError, TypeError):
-                        return default
-
-                def safe_int(value, default=0):
-                    try:
-                        return int(value) if value else default
-                    except (ValueError, TypeError):
-                        return default
-                
-                # 필요한 정보만 추출하여 반환
-                hoga_info = {
-                    'currency': output1.get('curr', ''),
-                    'decimal_places': safe_int(output1.get('zdiv', 0)),
-                    'current_price': safe_float(output1.get('last', 0)),
-                    'ask_price': safe_float(output2.get('pask1', 0)),
-                    'bid_price': safe_float(output2.get('pbid1', 0)),
-                    'ask_volume': safe_int(output2.get('vask1', 0)),
-                    'bid_volume': safe_int(output2.get('vbid1', 0))
-                }
-                
-                logger.info(f"Parsed hoga info: {hoga_info}")
-                return hoga_info
-            elif t1 is None:
-                return None
-            else:
-                t1.print_error()
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting overseas hoga: {str(e)}")
-            logger.exception("Detailed error:")  # 상세 에러 스택트레이스 출력
+            logger.info(f"Parsed hoga info: {hoga_info}")
+            return hoga_info
+        elif t1 is None:
+            return None
+        else:
+            t1.print_error()
             return None
         
     def get_buyable_amount_overseas(self, exchange_code: str, stock_code: str, price: float):
         try:
-            exchange = ExchangeCodeConverter.from_string(exchange_code)
-            if not exchange:
-                raise ValueError(f"Invalid exchange code: {exchange_code}")
-            
-            buyable_exchange_code = ExchangeCodeConverter.get_code(exchange, "BUYABLE")
-            logger.info(f"buyable_exchange_code: {buyable_exchange_code}")
-            
-            url = "/uapi/overseas-stock/v1/trading/inquire-psamount"
-            tr_id = "TTTS3007R"
+            t1 = self._url_fetch(**self._buyable_amount_overseas_request(exchange_code, stock_code, price))
+            return self._parse_buyable_amount_overseas(t1)
+        except Exception as e:
+            logger.error(f"Error getting overseas buyable amount: {e}")
+            return None
+
+    def _buyable_amount_overseas_request(self, exchange_code: str, stock_code: str, price: float):
+        exchange = ExchangeCodeConverter.from_string(exchange_code)
+        if not exchange:
+            raise ValueError(f"Invalid exchange code: {exchange_code}")
+        
+        buyable_exchange_code = ExchangeCodeConverter.get_code(exchange, "BUYABLE")
+        logger.info(f"buyable_exchange_code: {buyable_exchange_code}")
+        
+        params = {
+            "CANO": self.account_num,
+            "ACNT_PRDT_CD": self.stock_account_product_code,
+            "OVRS_EXCG_CD": buyable_exchange_code,  # 여기서 AMEX 사용
+            "ITEM_CD": stock_code.upper(),
+            "OVRS_ORD_UNPR": str(price)
+        }
+        return dict(url="/uapi/overseas-stock/v1/trading/inquire-psamount", tr_id="TTTS3007R", params=params)
+
+    def _parse_buyable_amount_overseas(self, t1):
+        if t1 is not None and t1.is_ok():
+            output = t1.get_body().output
+            logger.info(f"Overseas buyable amount: {output}")
             
-            params = {
-                "CANO": self.account_num,
-                "ACNT_PRDT_CD": self.stock_account_product_code,
-                "OVRS_EXCG_CD": buyable_exchange_code,  # 여기서 AMEX 사용
-                "ITEM_CD": stock_code.upper(),
-                "OVRS_ORD_UNPR": str(price)
+            # 필요한 정보만 추출하여 반환
+            buyable_info = {
+                'currency': output.get('tr_crcy_cd', ''),  # 거래통화코드
+                'exchange_rate': float(output.get('exrt', 0)),  # 환율
+                'max_quantity': int(output.get('max_ord_psbl_qty', 0)),  # 최대주문가능수량
+                'available_cash': float(output.get('ord_psbl_frcr_amt', 0)),  # 주문가능외화금액
+                'total_max_quantity': int(output.get('ovrs_max_ord_psbl_qty', 0)),  # 해외최대주문가능수량 (통합)
+                'total_available_amount': float(output.get('frcr_ord_psbl_amt1', 0)),  # 외화주문가능금액 (통합)
             }
-
-            t1 = self._url_fetch(url, tr_id, params)
             
-            if t1 is not None and t1.is_ok():
-                output = t1.get_body().output
-                logger.info(f"Overseas buyable amount: {output}")
-                
-                # 필요한 정보만 추출하여 반환
-                buyable_info = {
-                    'currency': output.get('tr_crcy_cd', ''),  # 거래통화코드
-                    'exchange_rate': float(output.get('exrt', 0)),  # 환율
-                    'max_quantity': int(output.get('max_ord_psbl_qty', 0)),  # 최대주문가능수량
-                    'available_cash': float(output.get('ord_psbl_frcr_amt', 0)),  # 주문가능외화금액
-                    'total_max_quantity': int(output.get('ovrs_max_ord_psbl_qty', 0)),  # 해외최대주문가능수량 (통합)
-                    'total_available_amount': float(output.get('frcr_ord_psbl_amt1', 0)),  # 외화주문가능금액 (통합)
-                }
-                
-                return buyable_info
-            elif t1 is None:
-                return None
-            else:
-                t1.print_error()
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting overseas buyable amount: {e}")
+            return buyable_info
+        elif t1 is None:
+            return None
+        else:
+            t1.print_error()
             return None
 
     def get_current_price_overseas(self, exchange_code, stock_code):
-        url = "/uapi/overseas-price/v1/quotations/price"
-        tr_id = "HHDFS00000300"
+        return get_quote_cache().get_or_fetch(
+            ("price_overseas", exchange_code.upper(), stock_code.upper()),
+            lambda: self._fetch_current_price_overseas(exchange_code, stock_code))
+
+    def _fetch_current_price_overseas(self, exchange_code, stock_code):
+        t1 = self._url_fetch(**self._current_price_overseas_request(exchange_code, stock_code))
+        return self._parse_current_price_overseas(t1)
 
+    def _current_price_overseas_request(self, exchange_code, stock_code):
         params = {
             "AUTH": "",
             "EXCD": exchange_code,
             "SYMB": stock_code,
         }
+        return dict(url="/uapi/overseas-price/v1/quotations/price", tr_id="HHDFS00000300", params=params)
 
-        t1 = self._url_fetch(url, tr_id, params)
+    def _parse_current_price_overseas(self, t1):
         logger.info(f"Current price: {t1}")
 
         if t1 is not None and t1.is_ok():
             return t1.get_body().output
         else:
-            t1.print_error()
+            if t1 is not None:
+                t1.print_error()
             return None
 
     def get_account_balance_overseas(self):
         """해외주식 잔고 조회"""
-        url = "/uapi/overseas-stock/v1/trading/inquire-balance"
-        tr_id = "TTTS3012R"
-        
+        res, rows = self._collect_pages(self._account_balance_overseas_request(), OVERSEAS_CTX_KEYS, "output1")
+        return self._parse_account_balance_overseas(res, rows)
+
+    def iter_account_balance_overseas(self, prefetch=False):
+        """해외주식 잔고를 페이지 단위로 반환 (페이지마다 (평가손익, DataFrame))"""
+        for res in self._iter_pages(self._account_balance_overseas_request(), OVERSEAS_CTX_KEYS, prefetch):
+            yield self._parse_account_balance_overseas(res)
+
+    def _account_balance_overseas_request(self):
         params = {
             "CANO": self.account_num,
             "ACNT_PRDT_CD": self.stock_account_product_code,
@@ -521,72 +710,59 @@ class KoreaInvestAPI:
             "CTX_AREA_FK200": "",
             "CTX_AREA_NK200": ""
         }
+        return dict(url="/uapi/overseas-stock/v1/trading/inquire-balance", tr_id="TTTS3012R", params=params)
 
-        res = self._url_fetch(url, tr_id, params)
-        output_columns = ["종목코드", "해외거래소코드", "종목명", "보유수량", "매도가능수량", "매입단가", "수익률", "현재가", "평가손익"]
-
+    def _parse_account_balance_overseas(self, res, rows=None):
         if res is None:
-            return 0, pd.DataFrame(columns=output_columns)
+            return 0, RecordSet(record_type=OverseasHolding)
         
         try:
-            output1 = res.get_body().output1
+            output1 = res.get_body().output1 if rows is None else rows
         except Exception as e:
             logger.error(f"Error in get_account_balance_overseas: {e}")
-            return 0, pd.DataFrame(columns=output_columns)
+            return 0, RecordSet(record_type=OverseasHolding)
         
-        if res is not None and res.is_ok() and output1:
-            df = pd.DataFrame(output1)
-            target_columns = ["ovrs_pdno", "ovrs_excg_cd", "ovrs_item_name", "ovrs_cblc_qty", "ord_psbl_qty", "pchs_avg_pric", "evlu_pfls_rt", "now_pric2", "frcr_evlu_pfls_amt"]
-            df = df[target_columns]
-            df[target_columns[3:]] = df[target_columns[3:]].apply(pd.to_numeric, errors='coerce')
-            column_name_map = dict(zip(target_columns, output_columns))
-            df.rename(columns=column_name_map, inplace=True)
+        if res.is_ok() and output1:
+            holdings = RecordSet.from_api(output1, OverseasHolding)
             r2 = res.get_body().output2
             total_profit_loss = float(r2['tot_evlu_pfls_amt']) if r2 else 0
-            return total_profit_loss, df
+            return total_profit_loss, holdings
         else:
-            logger.error(f"Error in get_account_balance_overseas: {res.get_error_code() if res else 'No response'}")
-            return 0, pd.DataFrame(columns=output_columns)
+            logger.error(f"Error in get_account_balance_overseas: {res.get_error_code()}")
+            return 0, RecordSet(record_type=OverseasHolding)
         
     def do_order_overseas(self, exchange_code, stock_code, price, quantity, order_type="00", prd_code="01", buy_flag=True):
         try:
-            # Convert exchange code
-            exchange = ExchangeCodeConverter.from_string(exchange_code)
-            if not exchange:
-                raise ValueError(f"Invalid exchange code: {exchange_code}")
-            
-            order_exchange_code = ExchangeCodeConverter.get_code(exchange, "ORDER")
-            
-            url = "/uapi/overseas-stock/v1/trading/order"
-            tr_id = "TTTT1002U" if buy_flag else "TTTT1006U"
-
-            params = {
-                "CANO": self.account_num,
-                "ACNT_PRDT_CD": self.stock_account_product_code,
-                "OVRS_EXCG_CD": order_exchange_code,  # Use converted exchange code
-                "PDNO": stock_code,
-                "ORD_QTY": str(quantity),
-                "OVRS_ORD_UNPR": str(price),
-                "ORD_SVR_DVSN_CD": "0",
-                "ORD_DVSN": order_type,
-            }
-
-            logger.info(f"Requesting overseas order with params: {params}")
-
-            t1 = self._url_fetch(url, tr_id, params, is_post=True, use_hash=True)
-
-            if t1 is not None and t1.is_ok():
-                return t1
-            elif t1 is None:
-                return None
-            else:
-                t1.print_error()
-                return None
-                
+            t1 = self._url_fetch(**self._order_overseas_request(exchange_code, stock_code, price, quantity, order_type, buy_flag))
+            return self._parse_order(t1)
         except Exception as e:
             logger.error(f"Error in overseas order: {e}")
             return None
+
+    def _order_overseas_request(self, exchange_code, stock_code, price, quantity, order_type, buy_flag):
+        # Convert exchange code
+        exchange = ExchangeCodeConverter.from_string(exchange_code)
+        if not exchange:
+            raise ValueError(f"Invalid exchange code: {exchange_code}")
         
+        order_exchange_code = ExchangeCodeConverter.get_code(exchange, "ORDER")
+        
+        url = "/uapi/overseas-stock/v1/trading/order"
+        tr_id = "TTTT1002U" if buy_flag else "TTTT1006U"
+
+        params = {
+            "CANO": self.account_num,
+            "ACNT_PRDT_CD": self.stock_account_product_code,
+            "OVRS_EXCG_CD": order_exchange_code,  # Use converted exchange code
+            "PDNO": stock_code,
+            "ORD_QTY": str(quantity),
+            "OVRS_ORD_UNPR": str(price),
+            "ORD_SVR_DVSN_CD": "0",
+            "ORD_DVSN": order_type,
+        }
+
+        logger.info(f"Requesting overseas order with params: {params}")
+        return dict(url=url, tr_id=tr_id, params=params, is_post=True, use_hash=True)
         
     def do_buy_order_overseas(self, exchange_code, stock_code, price, quantity, order_type="00", prd_code="01"):
         t1 = self.do_order_overseas(exchange_code, stock_code, price, quantity, order_type, prd_code, buy_flag=True)
@@ -597,9 +773,10 @@ class KoreaInvestAPI:
         return t1
     
     def do_cancel_revise_order_overseas(self, stock_code, order_no, order_qty, order_price=0, order_branch="NASD", prd_code='01', cncl_dv="02"):
-        url = "/uapi/overseas-stock/v1/trading/order-rvsecncl"
-        tr_id = "TTTT1004U"
+        t1 = self._url_fetch(**self._cancel_revise_overseas_request(stock_code, order_no, order_qty, order_price, order_branch, cncl_dv))
+        return self._parse_order(t1)
 
+    def _cancel_revise_overseas_request(self, stock_code, order_no, order_qty, order_price, order_branch, cncl_dv):
         params = {
             "CANO": self.account_num,
             "ACNT_PRDT_CD": self.stock_account_product_code,
@@ -611,16 +788,7 @@ class KoreaInvestAPI:
             "ORD_QTY": str(order_qty),
             "OVRS_ORD_UNPR": str(order_price),
         }
-
-        t1 = self._url_fetch(url, tr_id, params, is_post=True, use_hash=True)
-
-        if t1 is not None and t1.is_ok():
-            return t1
-        elif t1 is None:
-            return None
-        else:
-            t1.print_error()
-            return None
+        return dict(url="/uapi/overseas-stock/v1/trading/order-rvsecncl", tr_id="TTTT1004U", params=params, is_post=True, use_hash=True)
 
     def do_cancel_order_overseas(self, stock_code, order_no, order_qty, order_price=0, order_branch="NASD", prd_code='01', cncl_dv="02"):
         t1 = self.do_cancel_revise_order_overseas(stock_code, order_no, order_qty, order_price, order_branch, prd_code, cncl_dv)
@@ -628,9 +796,52 @@ class KoreaInvestAPI:
     
     # 해외주식 미체결내역[v1_해외주식-005]
     def get_overseas_orders(self, exchange_code="NASD"):
-        url = "/uapi/overseas-stock/v1/trading/inquire-nccs"
-        tr_id = "TTTS3018R"
+        t1, rows = self._collect_pages(self._overseas_orders_request(exchange_code), OVERSEAS_CTX_KEYS, "output")
+        return self._parse_overseas_orders(t1, rows)
+
+    def iter_overseas_orders(self, exchange_code="NASD", prefetch=False):
+        """해외주식 미체결내역을 페이지 단위로 반환"""
+        for t1 in self._iter_pages(self._overseas_orders_request(exchange_code), OVERSEAS_CTX_KEYS, prefetch):
+            yield self._parse_overseas_orders(t1)
+
+    def get_all_overseas_orders(self, exchange_codes=None, refresh=False):
+        """여러 거래소의 해외 미체결내역을 동시에 조회하여 하나의 RecordSet 으로 반환 (짧게 캐시)"""
+        codes = overseas_order_exchanges(exchange_codes)
+        key = ("overseas_orders", codes)
+        cache = get_open_orders_cache()
+        if refresh:
+            cache.invalidate(key)
+        cached = cache.get_or_fetch(key, lambda: self._fetch_all_overseas_orders(codes))
+        return cached[0] if cached else None
+
+    def _fetch_all_overseas_orders(self, codes):
+        with ThreadPoolExecutor(max_workers=len(codes)) as executor:
+            results = list(executor.map(self.get_overseas_orders, codes))
+        return self._merge_overseas_orders(codes, results)
+
+    def _merge_overseas_orders(self, codes, results):
+        """거래소별 결과를 주문번호 기준으로 중복 제거하여 병합 (모두 실패하면 None)
+
+        NASD 조회는 미국 전체를 반환하므로 NYSE/AMEX 결과와 겹칠 수 있습니다.
+        """
+        merged, seen, failed = [], set(), []
+        for code, orders in zip(codes, results):
+            if orders is None or isinstance(orders, Exception):
+                failed.append(code)
+                continue
+            for order in orders:
+                if order.order_no in seen:
+                    continue
+                seen.add(order.order_no)
+                merged.append(order)
+        if failed:
+            logger.warning(f"Failed to load overseas orders for {failed}")
+            if len(failed) == len(codes):
+                return None
+        # 빈 결과도 캐시되도록 튜플로 감쌈
+        return (RecordSet(merged, OverseasOrder),)
 
+    def _overseas_orders_request(self, exchange_code):
         params = {
             "CANO": self.account_num,
             "ACNT_PRDT_CD": self.stock_account_product_code,
@@ -639,57 +850,64 @@ class KoreaInvestAPI:
             "CTX_AREA_FK200": "",
             "CTX_AREA_NK200": "",
         }
+        return dict(url="/uapi/overseas-stock/v1/trading/inquire-nccs", tr_id="TTTS3018R", params=params)
 
-        t1 = self._url_fetch(url, tr_id, params)
-        if t1 is not None and t1.is_ok() and t1.get_body().output:
-            tdf = pd.DataFrame(t1.get_body().output)
-            tdf.set_index("odno", inplace=True)
-            cf1 = ['pdno', 'ft_ord_qty', 'ft_ord_unpr3', 'ord_tmd', 'ovrs_excg_cd', 'orgn_odno', 'nccs_qty', 'sll_buy_dvsn_cd', 'sll_buy_dvsn_cd_name']
-            cf2 = ['종목코드', '주문수량', '주문단가', '주문일시', '해외거래소코드', '원주문번호', '주문가능수량', '매도매수구분코드', '매도매수구분코드명']
-            tdf = tdf[cf1]
-            ren_dict = dict(zip(cf1, cf2))
-            tdf.rename(columns=ren_dict, inplace=True)
-            return tdf
+    def _parse_overseas_orders(self, t1, rows=None):
+        if t1 is not None and t1.is_ok():
+            return RecordSet.from_api(t1.get_body().output if rows is None else rows, OverseasOrder)
         else:
-            t1.print_error()
+            if t1 is not None:
+                t1.print_error()
             return None
         
     def overseas_do_cancel_all_orders(self, skip_codes=[]):
-        tdf = self.get_overseas_orders()
-        if tdf is not None:
-            od_list = tdf.index.to_list()
-            qty_list = tdf['주문수량'].to_list()
-            price_list = tdf['주문단가'].to_list()
-            exchange_list = tdf['해외거래소코드'].to_list()
-            codes_list = tdf['종목코드'].to_list()
-            
-            for i, order_no in enumerate(od_list):
-                if codes_list[i] in skip_codes:
+        orders = self.get_overseas_orders()
+        if orders is not None:
+            for order in orders:
+                if order.symbol in skip_codes:
                     continue
                 try:
                     ar = self.do_cancel_order_overseas(
-                        stock_code=codes_list[i],
-                        order_no=order_no,
-                        order_qty=qty_list[i],
-                        order_price=price_list[i],
-                        order_brance=exchange_list[i]
+                        stock_code=order.symbol,
+                        order_no=order.order_no,
+                        order_qty=order.unfilled_quantity or order.quantity,
+                        order_price=order.price,
+                        order_branch=order.exchange_code
                     )
                     logger.info(f"Cancel Order: {ar}")
-                    time.sleep(0.02)
                 except Exception as e:
-                    logger.error(f"Error canceling order {order_no}: {str(e)}")
+                    logger.error(f"Error canceling order {order.order_no}: {str(e)}")
 
-    
+
+class ResponseFields:
+    """응답 헤더/본문 필드를 속성으로 접근 (dict 를 복사하지 않고 그대로 __dict__ 로 사용)"""
+
+    def __init__(self, data):
+        self.__dict__ = data
+
+    @property
+    def _fields(self):
+        return tuple(self.__dict__.keys())
+
+    def _asdict(self):
+        return self.__dict__
+
+    def __repr__(self):
+        return f"ResponseFields({self.__dict__!r})"
 
 
 class APIResponse:
+    """KIS 응답 래퍼 (본문은 한 번만 파싱, 헤더는 처음 접근할 때 추출)"""
+    __slots__ = ("res_code", "resp", "_json", "_body", "_header", "error_code", "error_msg")
+
     def __init__(self, response):
         self.res_code = response.status_code
         self.resp = response
-        self._header = self._set_header()
-        self._body = self._set_body()
-        self.error_code = self._body.rt_cd
-        self.error_msg = self._body.msg1
+        self._json = response.json()
+        self._body = ResponseFields(self._json)
+        self._header = None
+        self.error_code = self._json.get('rt_cd')
+        self.error_msg = self._json.get('msg1')
 
     def get_result_code(self):
         return self.res_code
@@ -697,16 +915,14 @@ class APIResponse:
     def _set_header(self):
         fld = dict()
         for x in self.resp.headers.keys():
-            if x.islower():
+            # httpx 는 모든 헤더를 소문자로 돌려주므로 식별자로 쓸 수 있는 KIS 헤더만 사용
+            if x.islower() and x.isidentifier():
                 fld[x] = self.resp.headers.get(x)
-        _th_ = namedtuple('header', fld.keys())
-        return _th_(**fld)
-    
-    def _set_body(self):
-        _tb_ = namedtuple('body', self.resp.json().keys())
-        return _tb_(**self.resp.json())
+        return ResponseFields(fld)
     
     def get_header(self):
+        if self._header is None:
+            self._header = self._set_header()
         return self._header
     
     def get_body(self):
@@ -716,13 +932,7 @@ class APIResponse:
         return self.resp
 
     def is_ok(self):
-        try:
-            if (self.get_body().rt_cd == '0'):
-                return True
-            else:
-                return False
-        except:
-            return False
+        return self.error_code == '0'
     
     def get_error_code(self):
         return self.error_code
@@ -731,7 +941,7 @@ class APIResponse:
         return self.error_msg
     
     def get_json(self):
-        return self.resp.json()
+        return self._json
     
     def get_status_code(self):
         return self.resp.status_code
@@ -739,7 +949,7 @@ class APIResponse:
     def print_all(self):
         logger.info("<Header>")
         for x in self.get_header()._fields:
-            logger.info(f"{x}: {getattr(self._header, x)}")
+            logger.info(f"{x}: {getattr(self.get_header(), x)}")
         logger.info("<Body>")
         for x in self.get_body()._fields:
             logger.info(f"{x}: {getattr(self._body, x)}")
@@ -1,9 +1,20 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from app.core.config import get_settings
 from app.api.v1.trading import router as trading_router
 from app.api.v1.webhook import router as webhook_router
+from app.api.v1.position import router as position_router
 from app.core.scheduler import setup_scheduler
+from app.core.client_registry import ClientRegistry
+from app.core.http_client import get_http_client, get_async_http_client, close_http_client
+from app.core.rate_limiter import get_rate_limiter
+from app.core.quote_cache import get_quote_cache, get_open_orders_cache
+from app.core.order_latency import get_order_latency_stats
+from app.core.realtime import get_realtime_feed
+from app.core.metrics import get_metrics, gauge_lines
+from app.core.token_manager import TokenManager
 import logging
 
 # 로깅 설정
@@ -15,9 +26,15 @@ logging.basicConfig(
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    setup_scheduler()
+    registry = ClientRegistry(get_settings())
+    app.state.registry = registry
+    await registry.start()
+    scheduler = setup_scheduler(registry.position_service)
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    scheduler.shutdown(wait=False)
+    await registry.aclose()
+    close_http_client()
 
 app = FastAPI(
     title="Trading System",
@@ -26,8 +43,62 @@ app = FastAPI(
 
 app.include_router(trading_router, prefix="/api/v1/trading", tags=["trading"])
 app.include_router(webhook_router, prefix="/api/v1/webhook", tags=["webhook"])
+app.include_router(position_router, prefix="/api/v1/position", tags=["position"])
 
 @app.get("/")
 async def root():
     return {"message": "Trading System API"}
 
+def collect_component_metrics():
+    """캐시 적중률, 속도 제한, 토큰 만료까지 남은 시간 (/metrics 요청 시점에 읽음)"""
+    caches = {"quote": get_quote_cache().get_stats(), "open_orders": get_open_orders_cache().get_stats()}
+    limiter = get_rate_limiter().get_stats()
+    lines = []
+    for name, key, metric_type in (("kis_cache_hits_total", "hits", "counter"),
+                                   ("kis_cache_misses_total", "misses", "counter"),
+                                   ("kis_cache_coalesced_total", "coalesced", "counter"),
+                                   ("kis_cache_hit_ratio", "hit_ratio", "gauge"),
+                                   ("kis_cache_entries", "size", "gauge")):
+        lines += gauge_lines(name, f"Quote/order cache {key}",
+                             {(("cache", cache),): stats[key] for cache, stats in caches.items()}, metric_type)
+    lines += gauge_lines("kis_rate_limit_current_rate", "Current allowed KIS calls per second",
+                         {(): limiter["current_rate"]})
+    lines += gauge_lines("kis_rate_limit_throttled_total", "EGW00201 responses seen by the rate limiter",
+                         {(): limiter["throttled"]}, "counter")
+    lines += gauge_lines("kis_token_expires_in_seconds", "Seconds until the current access token expires",
+                         {(): round(TokenManager().seconds_until_expiry(), 1)})
+    return lines
+
+get_metrics().add_collector(collect_component_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 텍스트 형식 지표"""
+    # 수집기가 공유 버킷 파일을 읽으므로 이벤트 루프 밖에서 만듦
+    body = await asyncio.to_thread(get_metrics().render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def stats(request: Request):
+    """내부 성능 통계 (HTTP 커넥션 풀 등)"""
+    webhook_workers = request.app.state.registry.webhook_workers
+    netter = request.app.state.registry.webhook_service.netter
+    order_tracker = request.app.state.registry.order_tracker
+    ledger = request.app.state.registry.ledger
+    # 공유 버킷 파일과 큐 SQLite 조회는 이벤트 루프 밖에서 처리
+    rate_limiter = await asyncio.to_thread(get_rate_limiter().get_stats)
+    webhook_queue = await asyncio.to_thread(webhook_workers.queue.get_stats) if webhook_workers else None
+    return {
+        "http_pool": get_http_client().get_stats(),
+        "async_http_pool": get_async_http_client().get_stats(),
+        "rate_limiter": rate_limiter,
+        "quote_cache": get_quote_cache().get_stats(),
+        "open_orders_cache": get_open_orders_cache().get_stats(),
+        "order_latency": get_order_latency_stats().get_stats(),
+        "realtime_feed": get_realtime_feed().get_stats() if get_realtime_feed() else None,
+        "webhook_queue": webhook_queue,
+        "webhook_dedup": request.app.state.registry.idempotency_index.get_stats(),
+        "webhook_netting": netter.get_stats() if netter else None,
+        "order_tracker": order_tracker.get_stats() if order_tracker else None,
+        "ledger": ledger.get_stats() if ledger else None
+    }
@@ -9,4 +9,5 @@ class TradingViewAlert(BaseModel):
     price: float
     order_type: str = "01"  # 기본값은 지정가
     market: Optional[str] = None
-    exchange: str  # TradingView의 exchange 값
\ No newline at end of file
+    exchange: str  # TradingView의 exchange 값
+    alert_id: Optional[str] = None  # 클라이언트 지정 알림 ID (중복 알림 판별용)
\ No newline at end of file
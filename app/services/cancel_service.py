@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import time
+from typing import Iterable, List, Optional
+from app.services.trading_service import AsyncTradingService, to_order_exchange_code
+from app.core.config import get_settings
+from app.core.order_tracker import SIDES
+import logging
+
+logger = logging.getLogger(__name__)
+
+KST = timezone(timedelta(hours=9))
+
+def order_age_seconds(order_time: str, now: Optional[datetime] = None) -> Optional[float]:
+    """주문시각(HHMMSS, 한국시간 당일 기준)으로부터 지난 시간(초), 알 수 없으면 None"""
+    if not order_time or len(order_time) < 6 or not order_time[:6].isdigit():
+        return None
+    now = now or datetime.now(KST)
+    ordered = now.replace(hour=int(order_time[0:2]), minute=int(order_time[2:4]),
+                          second=int(order_time[4:6]), microsecond=0)
+    if ordered > now:
+        # 자정을 넘긴 해외 주문
+        ordered -= timedelta(days=1)
+    return (now - ordered).total_seconds()
+
+
+class BulkCancelService:
+    """국내/해외 미체결 주문 일괄 취소
+
+    취소 대상 조회와 취소 요청을 모두 동시에 보내며, 호출 속도는 RateLimiter 가 주문 TR 우선으로 조절합니다.
+    종목, 매수/매도, 거래소, 주문 경과시간으로 대상을 거를 수 있고 주문별 결과와 소요시간을 반환합니다.
+    """
+
+    def __init__(self, trading_service: Optional[AsyncTradingService] = None, concurrency: Optional[int] = None):
+        self.trading_service = trading_service or AsyncTradingService()
+        self.concurrency = concurrency or get_settings()["BULK_CANCEL_CONCURRENCY"]
+
+    async def cancel_orders(
+        self,
+        markets: Iterable[str] = ("domestic", "overseas"),
+        symbols: Optional[Iterable[str]] = None,
+        side: Optional[str] = None,
+        exchanges: Optional[Iterable[str]] = None,
+        min_age_sec: Optional[float] = None,
+        dry_run: bool = False,
+    ) -> dict:
+        started = time.perf_counter()
+        markets = set(markets)
+        symbols = {s.upper() for s in symbols} if symbols else None
+        exchanges = tuple(dict.fromkeys(to_order_exchange_code(e) for e in exchanges)) if exchanges else None
+
+        targets = await self._collect_targets(markets, exchanges)
+        lookup_ms = (time.perf_counter() - started) * 1000
+
+        now = datetime.now(KST)
+        selected = []
+        for target in targets:
+            if symbols and target["symbol"].upper() not in symbols:
+                continue
+            if side and target["side"] != side:
+                continue
+            if exchanges and target["market"] == "overseas" and target["exchange_code"] not in exchanges:
+                continue
+            if min_age_sec is not None:
+                age = order_age_seconds(target["order_time"], now)
+                if age is None or age < min_age_sec:
+                    continue
+            selected.append(target)
+
+        if dry_run:
+            results = [dict(t, status="dry_run") for t in selected]
+        else:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            results = await asyncio.gather(*(self._cancel_one(t, semaphore) for t in selected))
+
+        canceled = sum(1 for r in results if r["status"] == "canceled")
+        if dry_run or canceled == len(results):
+            status = "success"
+        elif canceled == 0:
+            # 취소 대상이 있었는데 하나도 취소하지 못한 경우
+            status = "failed"
+        else:
+            status = "partial"
+        summary = {
+            "status": status,
+            "dry_run": dry_run,
+            "found": len(targets),
+            "selected": len(selected),
+            "canceled": canceled,
+            "failed": sum(1 for r in results if r["status"] == "failed"),
+            "lookup_ms": round(lookup_ms, 2),
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results,
+        }
+        logger.info(f"Bulk cancel: selected={summary['selected']}, canceled={canceled}, "
+                    f"failed={summary['failed']}, total_ms={summary['total_ms']}")
+        return summary
+
+    async def _collect_targets(self, markets, exchanges) -> List[dict]:
+        service = self.trading_service
+        calls = []
+        if "domestic" in markets:
+            calls.append(("domestic", service.get_orders()))
+        if "overseas" in markets:
+            # 취소 대상은 캐시를 거치지 않고 새로 조회
+            calls.append(("overseas", service.get_all_overseas_orders(exchanges, refresh=True)))
+
+        responses = await asyncio.gather(*(call for _, call in calls), return_exceptions=True)
+
+        targets = []
+        for (market, _), orders in zip(calls, responses):
+            if isinstance(orders, Exception) or orders is None:
+                logger.error(f"Failed to load {market} orders for bulk cancel: {orders}")
+                continue
+            for order in orders:
+                if market == "domestic":
+                    targets.append({
+                        "market": market, "order_no": order.order_no, "symbol": order.symbol,
+                        "exchange_code": "", "side": SIDES.get(order.side_code, ""),
+                        "quantity": order.cancelable_quantity, "price": order.price,
+                        "branch": order.branch, "order_time": order.order_time,
+                    })
+                else:
+                    targets.append({
+                        "market": market, "order_no": order.order_no, "symbol": order.symbol,
+                        "exchange_code": order.exchange_code, "side": SIDES.get(order.side_code, ""),
+                        "quantity": order.unfilled_quantity or order.quantity, "price": order.price,
+                        "branch": "", "order_time": order.order_time,
+                    })
+        return targets
+
+    async def _cancel_one(self, target: dict, semaphore: asyncio.Semaphore) -> dict:
+        async with semaphore:
+            started = time.perf_counter()
+            api = self.trading_service.api
+            try:
+                if target["market"] == "domestic":
+                    result = await api.do_cancel_order(
+                        target["order_no"], target["quantity"], target["price"], target["branch"])
+                else:
+                    result = await api.do_cancel_order_overseas(
+                        stock_code=target["symbol"],
+                        order_no=target["order_no"],
+                        order_qty=target["quantity"],
+                        order_price=target["price"],
+                        order_branch=target["exchange_code"],
+                    )
+                # 실패 응답은 _parse_order 에서 오류 로그를 남기고 None 으로 반환됨
+                if result is not None:
+                    status, message = "canceled", result.get_body().msg1
+                else:
+                    status, message = "failed", "Cancel request failed"
+            except Exception as e:
+                logger.error(f"Error canceling order {target['order_no']}: {e}")
+                status, message = "failed", str(e)
+            return dict(target, status=status, message=message,
+                        elapsed_ms=round((time.perf_counter() - started) * 1000, 2))
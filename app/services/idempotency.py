@@ -0,0 +1,61 @@
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Optional, Tuple
+from app.models.webhook import TradingViewAlert
+
+class IdempotencyIndex:
+    """중복 알림 판별용 메모리 인덱스 (크기 제한 LRU + 키별 만료)
+
+    영구 기록은 WebhookQueue 의 webhook_dedup 테이블에 남고, 이 인덱스는 최근 키를
+    SQLite 조회 없이 바로 찾기 위한 앞단입니다.
+    """
+
+    def __init__(self, max_size: int = 10000, window_sec: float = 60.0, id_ttl_sec: float = 86400.0):
+        self.max_size = max_size
+        self.window_sec = window_sec
+        self.id_ttl_sec = id_ttl_sec
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, alert: TradingViewAlert) -> Tuple[str, float]:
+        """알림의 중복 판별 키와 유지 시간(초)
+
+        클라이언트가 alert_id 를 보내면 그 값을, 없으면 알림 내용의 해시를 키로 사용합니다.
+        내용이 같은 알림은 window_sec 안에서만 재전송으로 보고, 그 이후에는 새 신호로 처리합니다.
+        """
+        if alert.alert_id:
+            return f"id:{alert.alert_id}", self.id_ttl_sec
+        content = json.dumps(alert.model_dump(exclude={"alert_id"}), sort_keys=True)
+        return f"sha256:{hashlib.sha256(content.encode()).hexdigest()}", self.window_sec
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, ttl_sec: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl_sec)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -1,19 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 from app.services.trading_service import TradingService
+from app.core.config import get_settings
+from app.core.exchange_codes import ExchangeCodeConverter
 import logging
 import math
+import time
 
 logger = logging.getLogger(__name__)
 
 class PositionService:
-    def __init__(self):
-        self.trading_service = TradingService()
+    def __init__(self, trading_service: Optional[TradingService] = None):
+        self.trading_service = trading_service or TradingService()
+        self.max_workers = get_settings()["POSITION_REDUCE_CONCURRENCY"]
 
-    def reduce_all_positions(self, reduction_ratio: float = 0.5):
+    def reduce_all_positions_by_half(self, dry_run: bool = False):
+        return self.reduce_all_positions(0.5, dry_run=dry_run)
+
+    def build_reduction_plan(self, holdings, reduction_ratio: float = 0.5):
+        """보유 종목별 매도 계획 (매도할 수량은 올림)"""
+        plan = []
+        for position in holdings:
+            current_quantity = int(position.quantity or 0)
+            quantity_to_sell = math.ceil(current_quantity * reduction_ratio)
+            if quantity_to_sell == 0:
+                continue
+            # 잔고의 거래소 코드(NASD 등)를 호가/주문에 쓰는 거래소 이름(NASDAQ 등)으로 변환
+            exchange = ExchangeCodeConverter.from_api_code(position.exchange_code)
+            plan.append({
+                "exchange_code": exchange.name if exchange else position.exchange_code,
+                "stock_code": position.symbol,
+                "current_quantity": current_quantity,
+                "sell_quantity": quantity_to_sell,
+            })
+        return plan
+
+    def reduce_all_positions(self, reduction_ratio: float = 0.5, dry_run: bool = False):
         """모든 해외 주식 포지션을 지정된 비율만큼 줄입니다.
         
         Args:
             reduction_ratio (float): 줄일 비율 (0.5는 50% 매도, 1.0은 전량 매도)
+            dry_run (bool): True 이면 주문 없이 매도 계획만 반환
         """
+        started = time.perf_counter()
         try:
             # 현재 보유 중인 포지션 조회
             _, holdings = self.trading_service.get_balance_overseas()
@@ -22,59 +51,23 @@ class PositionService:
                 logger.info("No positions to reduce")
                 return {"status": "success", "message": "No positions to reduce"}
 
-            results = []
-            
-            for _, position in holdings.iterrows():
-                try:
-                    exchange_code = position['해외거래소코드']
-                    stock_code = position['종목코드']
-                    current_quantity = int(position['보유수량'])
-                    
-                    # 매도할 수량 계산 (올림)
-                    quantity_to_sell = math.ceil(current_quantity * reduction_ratio)
-                    
-                    if quantity_to_sell == 0:
-                        continue
-
-                    # 호가 정보 조회
-                    hoga_info = self.trading_service.get_hoga_info_overseas(
-                        exchange_code, 
-                        stock_code
-                    )
-                    
-                    if not hoga_info:
-                        logger.error(f"Failed to get hoga info for {stock_code}")
-                        continue
-
-                    # 시장가 매도 주문 실행
-                    result = self.trading_service.place_sell_order_overseas(
-                        exchange_code=exchange_code,
-                        stock_code=stock_code,
-                        price=hoga_info['bid_price'],
-                        quantity=quantity_to_sell
-                    )
+            plan = self.build_reduction_plan(holdings, reduction_ratio)
+            if dry_run:
+                return {
+                    "status": "success",
+                    "dry_run": True,
+                    "plan": plan,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+                }
 
-                    order_info = {
-                        "exchange_code": exchange_code,
-                        "stock_code": stock_code,
-                        "sell_quantity": quantity_to_sell,
-                        "price": hoga_info['bid_price'],
-                        "status": "success" if result else "failed"
-                    }
-                    results.append(order_info)
-                    
-                except Exception as e:
-                    logger.error(f"Error reducing position for {stock_code}: {str(e)}")
-                    results.append({
-                        "exchange_code": exchange_code,
-                        "stock_code": stock_code,
-                        "status": "failed",
-                        "error": str(e)
-                    })
+            # 종목별 호가 조회 + 매도 주문을 동시에 진행 (호출 속도는 RateLimiter 가 조절)
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="reduce") as executor:
+                results = list(executor.map(self._reduce_position, plan))
 
             return {
                 "status": "success",
-                "orders": results
+                "orders": results,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
             }
 
         except Exception as e:
@@ -82,4 +75,59 @@ class PositionService:
             return {
                 "status": "error",
                 "message": str(e)
-            } 
\ No newline at end of file
+            }
+
+    def _reduce_position(self, leg: Dict):
+        """한 종목 매도 (호가 조회 → 최우선 매수호가로 지정가 매도)"""
+        exchange_code = leg["exchange_code"]
+        stock_code = leg["stock_code"]
+        quantity_to_sell = leg["sell_quantity"]
+        started = time.perf_counter()
+        timing = {}
+        try:
+            # 호가 정보 조회
+            hoga_info = self.trading_service.get_hoga_info_overseas(exchange_code, stock_code)
+            timing["quote_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            
+            if not hoga_info:
+                logger.error(f"Failed to get hoga info for {stock_code}")
+                return {
+                    "exchange_code": exchange_code,
+                    "stock_code": stock_code,
+                    "sell_quantity": quantity_to_sell,
+                    "status": "failed",
+                    "error": "Failed to get hoga information",
+                    "timing": timing
+                }
+
+            # 매도 주문 실행
+            order_started = time.perf_counter()
+            result = self.trading_service.place_sell_order_overseas(
+                exchange_code=exchange_code,
+                stock_code=stock_code,
+                price=hoga_info['bid_price'],
+                quantity=quantity_to_sell
+            )
+            timing["order_ms"] = round((time.perf_counter() - order_started) * 1000, 3)
+            timing["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+            return {
+                "exchange_code": exchange_code,
+                "stock_code": stock_code,
+                "sell_quantity": quantity_to_sell,
+                "price": hoga_info['bid_price'],
+                "status": "success" if result else "failed",
+                "timing": timing
+            }
+            
+        except Exception as e:
+            logger.error(f"Error reducing position for {stock_code}: {str(e)}")
+            timing["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            return {
+                "exchange_code": exchange_code,
+                "stock_code": stock_code,
+                "sell_quantity": quantity_to_sell,
+                "status": "failed",
+                "error": str(e),
+                "timing": timing
+            }
@@ -0,0 +1,98 @@
+import asyncio
+from typing import Dict, List, Tuple
+from app.models.webhook import TradingViewAlert
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _Batch:
+    __slots__ = ("alerts", "future")
+
+    def __init__(self, future: asyncio.Future):
+        self.alerts: List[TradingViewAlert] = []
+        self.future = future
+
+class SignalNetter:
+    """같은 종목에 짧은 간격으로 들어온 매수/매도 알림을 상계하여 한 건의 주문으로 처리
+
+    (거래소, 종목) 별로 첫 알림이 들어온 뒤 window_ms 동안 알림을 모으고,
+    매수 수량 합계에서 매도 수량 합계를 뺀 순수량만 주문합니다. 순수량이 0이면 주문하지 않습니다.
+    submit() 의 묶음은 프로세스 메모리에 있으므로 큐를 쓰지 않는 경우에만 사용하고,
+    큐를 쓰면 WebhookQueue 가 워커 간에 묶은 알림을 net() 으로 상계합니다.
+    """
+
+    def __init__(self, process_alert, window_ms: float):
+        self.process_alert = process_alert
+        self.window = window_ms / 1000
+        self._batches: Dict[Tuple[str, str], _Batch] = {}
+        self._tasks = set()
+        self.alerts = 0
+        self.batches = 0
+        self.orders = 0
+
+    async def submit(self, exchange: str, alert: TradingViewAlert) -> dict:
+        """알림을 묶음에 추가하고 묶음 주문 결과를 반환"""
+        key = (exchange, alert.symbol.upper())
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = _Batch(asyncio.get_running_loop().create_future())
+            self._batches[key] = batch
+            task = asyncio.create_task(self._flush_later(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        batch.alerts.append(alert)
+        self.alerts += 1
+        return await asyncio.shield(batch.future)
+
+    async def net(self, exchange: str, alerts: List[TradingViewAlert]) -> dict:
+        """이미 모인 알림 묶음을 바로 상계하여 주문"""
+        self.alerts += len(alerts)
+        return await self._flush((exchange, alerts[0].symbol.upper()), alerts)
+
+    async def _flush_later(self, key: Tuple[str, str], batch: _Batch):
+        await asyncio.sleep(self.window)
+        # 이후 들어오는 알림은 새 묶음으로
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+        try:
+            result = await self._flush(key, batch.alerts)
+            batch.future.set_result(result)
+        except Exception as e:
+            batch.future.set_exception(e)
+            batch.future.exception()
+
+    async def _flush(self, key: Tuple[str, str], alerts: List[TradingViewAlert]) -> dict:
+        self.batches += 1
+        buy_quantity = sum(a.quantity for a in alerts if a.action == "buy")
+        sell_quantity = sum(a.quantity for a in alerts if a.action == "sell")
+        net_quantity = buy_quantity - sell_quantity
+        netting = {
+            "alerts": len(alerts),
+            "buy_quantity": buy_quantity,
+            "sell_quantity": sell_quantity,
+            "net_quantity": net_quantity,
+        }
+        logger.info(f"Netted {len(alerts)} alerts for {key[0]}:{key[1]}: "
+                    f"buy={buy_quantity}, sell={sell_quantity}, net={net_quantity}")
+
+        if net_quantity == 0:
+            return {"status": "netted", "netting": netting}
+
+        net_alert = alerts[-1].model_copy(update={
+            "action": "buy" if net_quantity > 0 else "sell",
+            "quantity": abs(net_quantity),
+            "alert_id": None,
+        })
+        self.orders += 1
+        result = await self.process_alert(net_alert)
+        return dict(result, netting=netting)
+
+    def get_stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "alerts": self.alerts,
+            "batches": self.batches,
+            "orders": self.orders,
+            "orders_saved": self.alerts - self.orders,
+            "pending_batches": len(self._batches),
+        }
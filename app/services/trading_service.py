@@ -1,26 +1,80 @@
+import asyncio
+from typing import Optional
 from app.core.utils import KoreaInvestEnv, KoreaInvestAPI
-from app.core.config import get_settings
+from app.core.async_utils import AsyncKoreaInvestAPI
+from app.core.config import get_kis_config
+from app.core.exchange_codes import ExchangeCodeConverter
+from app.core.tracing import traced
 import logging
 
 logger = logging.getLogger(__name__)
 
+def to_order_exchange_code(exchange_code: str) -> str:
+    """거래소 이름(NASDAQ 등)을 잔고/주문 응답의 거래소 코드(NASD 등)로 변환"""
+    exchange = ExchangeCodeConverter.from_string(exchange_code)
+    if exchange:
+        return ExchangeCodeConverter.get_code(exchange, "ORDER")
+    return exchange_code.upper()
+
+def record_placed_order(ledger, result, side: str, exchange_code: str, stock_code: str,
+                        price: float, quantity: int):
+    """접수된 해외 주문을 원장에 반영 (원장이 없거나 주문이 실패하면 무시)"""
+    if ledger is None or not result:
+        return
+    output = result.get_body().output or {}
+    ledger.on_order_placed(output.get("ODNO", ""), side, to_order_exchange_code(exchange_code),
+                           stock_code, float(price), int(quantity))
+
+def apply_buyable(ledger, buyable, exchange_code: str, stock_code: str, price: float):
+    """조회한 매수가능금액으로 원장의 주문가능 외화를 갱신하고 이 종목을 대사 기준으로 기억"""
+    if ledger is None or not buyable:
+        return
+    order_exchange_code = to_order_exchange_code(exchange_code)
+    ledger.apply_buyable(buyable, order_exchange_code, price)
+    ledger.set_reference(exchange_code, order_exchange_code, stock_code, price)
+
+class PreTradeContext:
+    """해외주식 주문 한 건에 필요한 호가/매수가능금액/보유 정보
+
+    prepare_overseas_order() 가 주문마다 필요한 것만 한 번씩 조회해 채우고,
+    주문 가격과 수량은 이 객체에서 꺼내 쓰므로 같은 정보를 다시 조회하지 않습니다.
+    """
+    __slots__ = ("exchange_code", "stock_code", "action", "hoga", "buyable", "holding", "quantity")
+
+    def __init__(self, exchange_code: str, stock_code: str, action: str):
+        self.exchange_code = exchange_code
+        self.stock_code = stock_code
+        self.action = action
+        self.hoga = None
+        self.buyable = None
+        self.holding = None
+        self.quantity = 0
+
+    @property
+    def price(self) -> float:
+        """매수는 최우선 매도호가, 매도는 최우선 매수호가"""
+        if not self.hoga:
+            return 0.0
+        return self.hoga['ask_price'] if self.action == "buy" else self.hoga['bid_price']
+
+    @property
+    def max_buy_quantity(self) -> int:
+        return int(self.buyable['max_quantity']) if self.buyable else 0
+
+    @property
+    def max_sell_quantity(self) -> int:
+        return int(self.holding.sellable_quantity or 0) if self.holding is not None else 0
+
 class TradingService:
-    def __init__(self):
-        settings = get_settings()
-        self.config = {
-            "api_key": settings["API_KEY"],
-            "api_secret_key": settings["API_SECRET_KEY"],
-            "stock_account_number": settings["STOCK_ACCOUNT_NUMBER"],
-            "stock_account_product_code": settings["STOCK_ACCOUNT_PRODUCT_CODE"],
-            "hts_id": settings["HTS_ID"],
-            "custtype": settings["CUSTTYPE"],
-            "is_paper_trading": settings["IS_PAPER_TRADING"],
-            "my_agent": settings["MY_AGENT"],
-            "url": settings["URL"],
-            "webhook_url": settings["WEBHOOK_URL"]
-        }
-        self.env = KoreaInvestEnv(self.config)
+    def __init__(self, env: Optional[KoreaInvestEnv] = None):
+        # env 가 주어지면 (ClientRegistry) 공유 인스턴스를 재사용
+        if env is None:
+            env = KoreaInvestEnv(get_kis_config())
+        self.env = env
+        self.config = env.cfg
         self.api = KoreaInvestAPI(self.env.get_full_config(), self.env.get_base_headers())
+        # ClientRegistry 가 LEDGER_ENABLED 일 때 AccountLedger 를 연결
+        self.ledger = None
 
     def get_balance(self):
         return self.api.get_account_balance("")
@@ -28,15 +82,18 @@ class TradingService:
     def get_current_price(self, stock_code: str):
         return self.api.get_current_price(stock_code)
 
+    @traced("trading.get_hoga_info")
     def get_hoga_info(self, stock_code: str):
         return self.api.get_hoga_info(stock_code)
 
     def get_fluctuation_rank(self):
         return self.api.get_fluctuation_rank()
 
+    @traced("trading.place_buy_order")
     def place_buy_order(self, stock_code: str, quantity: int, price: float, order_type: str):
         return self.api.do_buy_order(stock_code, quantity, price, order_type)
 
+    @traced("trading.place_sell_order")
     def place_sell_order(self, stock_code: str, quantity: int, price: float, order_type: str):
         return self.api.do_sell_order(stock_code, quantity, price, order_type)
 
@@ -49,24 +106,54 @@ class TradingService:
     def get_current_price_overseas(self, exchange_code: str, stock_code: str):
         return self.api.get_current_price_overseas(exchange_code, stock_code)
 
+    @traced("trading.get_balance_overseas")
     def get_balance_overseas(self):
         return self.api.get_account_balance_overseas()
 
+    def get_overseas_orders(self, exchange_code: str = "NASD"):
+        return self.api.get_overseas_orders(exchange_code)
+
+    def get_all_overseas_orders(self, exchange_codes=None, refresh: bool = False):
+        return self.api.get_all_overseas_orders(exchange_codes, refresh)
+
+    @traced("trading.place_buy_order_overseas")
     def place_buy_order_overseas(self, exchange_code: str, stock_code: str, price: float, quantity: int, order_type: str = "00"):
-        return self.api.do_buy_order_overseas(exchange_code, stock_code, price, quantity, order_type)
+        result = self.api.do_buy_order_overseas(exchange_code, stock_code, price, quantity, order_type)
+        record_placed_order(self.ledger, result, "buy", exchange_code, stock_code, price, quantity)
+        return result
 
+    @traced("trading.place_sell_order_overseas")
     def place_sell_order_overseas(self, exchange_code: str, stock_code: str, price: float, quantity: int, order_type: str = "00"):
-        return self.api.do_sell_order_overseas(exchange_code, stock_code, price, quantity, order_type) 
+        result = self.api.do_sell_order_overseas(exchange_code, stock_code, price, quantity, order_type)
+        record_placed_order(self.ledger, result, "sell", exchange_code, stock_code, price, quantity)
+        return result
     
+    def local_max_buy_quantity(self, exchange_code: str, price: float) -> Optional[int]:
+        """원장 기준 최대 매수 수량 (원장이 없거나 오래되었으면 None)"""
+        if self.ledger is None:
+            return None
+        return self.ledger.max_buy_quantity(to_order_exchange_code(exchange_code), price)
+
+    def local_max_sell_quantity(self, exchange_code: str, stock_code: str) -> Optional[int]:
+        """원장 기준 매도 가능 수량 (원장이 없거나 오래되었으면 None)"""
+        if self.ledger is None:
+            return None
+        return self.ledger.max_sell_quantity(to_order_exchange_code(exchange_code), stock_code)
+
     # 호가
+    @traced("trading.get_hoga_info_overseas")
     def get_hoga_info_overseas(self, exchange_code: str, stock_code: str):
         return self.api.get_hoga_info_overseas(exchange_code, stock_code)
     
     # 매수가능금액
+    @traced("trading.get_buyable_amount_overseas")
     def get_buyable_amount_overseas(self, exchange_code: str, stock_code: str, price: float):
-        return self.api.get_buyable_amount_overseas(exchange_code, stock_code, price)
+        buyable = self.api.get_buyable_amount_overseas(exchange_code, stock_code, price)
+        apply_buyable(self.ledger, buyable, exchange_code, stock_code, price)
+        return buyable
 
     # 최대 매수 가능 수량 계산
+    @traced("trading.calculate_overseas_max_buy_quantity")
     def calculate_overseas_max_buy_quantity(self, exchange_code: str, stock_code: str) -> int:
         """해외주식 최대 매수 가능 수량 계산"""
         try:
@@ -76,7 +163,13 @@ class TradingService:
                 logger.error("Failed to get overseas hoga info")
                 return 0
                 
-            # 2. 매수가능금액 조회 (최우선 매도호가 기준)
+            # 2. 원장이 최근에 대사되었으면 API 호출 없이 계산
+            max_quantity = self.local_max_buy_quantity(exchange_code, hoga_info['ask_price'])
+            if max_quantity is not None:
+                logger.info(f"Calculated max buy quantity from ledger: {max_quantity}")
+                return max_quantity
+
+            # 3. 매수가능금액 조회 (최우선 매도호가 기준)
             buyable_info = self.get_buyable_amount_overseas(
                 exchange_code, 
                 stock_code, 
@@ -87,7 +180,7 @@ class TradingService:
                 logger.error("Failed to get overseas buyable amount")
                 return 0
                 
-            # 3. 최대 매수 가능 수량 반환 (통합 기준)
+            # 4. 최대 매수 가능 수량 반환 (통합 기준)
             max_quantity = buyable_info['max_quantity']
             logger.info(f"Calculated max buy quantity: {max_quantity}")
             return max_quantity
@@ -96,30 +189,219 @@ class TradingService:
             logger.error(f"Error calculating overseas max buy quantity: {e}")
             return 0
 
+    @traced("trading.get_overseas_holding")
+    def get_overseas_holding(self, exchange_code: str, stock_code: str):
+        """보유 종목 한 건 조회 (잔고를 페이지 단위로 읽다가 찾으면 중단)"""
+        upper_exchange_code = to_order_exchange_code(exchange_code)
+        upper_stock_code = stock_code.upper()
+        for _, holdings in self.api.iter_account_balance_overseas():
+            holding = holdings.find(upper_stock_code, upper_exchange_code)
+            if holding is not None:
+                return holding
+        return None
+
+    @traced("trading.calculate_overseas_max_sell_quantity")
     def calculate_overseas_max_sell_quantity(self, exchange_code: str, stock_code: str) -> int:
         """해외주식 최대 매도 가능 수량 계산"""
         try:
-            # 잔고 조회
-            _, holdings = self.get_balance_overseas()
+            quantity = self.local_max_sell_quantity(exchange_code, stock_code)
+            if quantity is not None:
+                logger.info(f"Calculated max sell quantity from ledger: {quantity}")
+                return quantity
 
-            upper_exchange_code = exchange_code.upper()
-            upper_stock_code = stock_code.upper()
-            
-            # 해당 종목 찾기
-            target_holding = holdings[
-                (holdings['해외거래소코드'] == upper_exchange_code) & 
-                (holdings['종목코드'] == upper_stock_code)
-            ]
-            
-            if target_holding.empty:
-                logger.error(f"No holding found for {upper_exchange_code}:{upper_stock_code}")
+            target_holding = self.get_overseas_holding(exchange_code, stock_code)
+
+            if target_holding is None:
+                logger.error(f"No holding found for {to_order_exchange_code(exchange_code)}:{stock_code.upper()}")
                 return 0
                 
             # 매도가능수량 반환
-            quantity = int(target_holding.iloc[0]['매도가능수량'])
+            quantity = int(target_holding.sellable_quantity or 0)
             logger.info(f"Calculated max sell quantity: {quantity}")
             return quantity
                 
         except Exception as e:
             logger.error(f"Error calculating overseas max sell quantity: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+
+
+class AsyncTradingService:
+    """TradingService 의 비동기 버전 (async 엔드포인트에서 이벤트 루프를 막지 않음)"""
+
+    def __init__(self, env: Optional[KoreaInvestEnv] = None):
+        if env is None:
+            env = KoreaInvestEnv(get_kis_config())
+        self.env = env
+        self.config = env.cfg
+        self.api = AsyncKoreaInvestAPI(self.env.get_full_config(), self.env.get_base_headers())
+        self.ledger = None
+
+    async def get_balance(self):
+        return await self.api.get_account_balance("")
+
+    async def get_current_price(self, stock_code: str):
+        return await self.api.get_current_price(stock_code)
+
+    @traced("trading.get_hoga_info")
+    async def get_hoga_info(self, stock_code: str):
+        return await self.api.get_hoga_info(stock_code)
+
+    async def get_fluctuation_rank(self):
+        return await self.api.get_fluctuation_rank()
+
+    @traced("trading.place_buy_order")
+    async def place_buy_order(self, stock_code: str, quantity: int, price: float, order_type: str):
+        return await self.api.do_buy_order(stock_code, quantity, price, order_type)
+
+    @traced("trading.place_sell_order")
+    async def place_sell_order(self, stock_code: str, quantity: int, price: float, order_type: str):
+        return await self.api.do_sell_order(stock_code, quantity, price, order_type)
+
+    async def get_orders(self):
+        return await self.api.get_orders()
+
+    async def cancel_order(self, order_no: str, quantity: int, price: str):
+        return await self.api.do_cancel_order(order_no, quantity, price)
+
+    async def get_current_price_overseas(self, exchange_code: str, stock_code: str):
+        return await self.api.get_current_price_overseas(exchange_code, stock_code)
+
+    @traced("trading.get_balance_overseas")
+    async def get_balance_overseas(self):
+        return await self.api.get_account_balance_overseas()
+
+    async def get_overseas_orders(self, exchange_code: str = "NASD"):
+        return await self.api.get_overseas_orders(exchange_code)
+
+    async def get_all_overseas_orders(self, exchange_codes=None, refresh: bool = False):
+        return await self.api.get_all_overseas_orders(exchange_codes, refresh)
+
+    @traced("trading.place_buy_order_overseas")
+    async def place_buy_order_overseas(self, exchange_code: str, stock_code: str, price: float, quantity: int, order_type: str = "00"):
+        result = await self.api.do_buy_order_overseas(exchange_code, stock_code, price, quantity, order_type)
+        record_placed_order(self.ledger, result, "buy", exchange_code, stock_code, price, quantity)
+        return result
+
+    @traced("trading.place_sell_order_overseas")
+    async def place_sell_order_overseas(self, exchange_code: str, stock_code: str, price: float, quantity: int, order_type: str = "00"):
+        result = await self.api.do_sell_order_overseas(exchange_code, stock_code, price, quantity, order_type)
+        record_placed_order(self.ledger, result, "sell", exchange_code, stock_code, price, quantity)
+        return result
+
+    def local_max_buy_quantity(self, exchange_code: str, price: float) -> Optional[int]:
+        """원장 기준 최대 매수 수량 (원장이 없거나 오래되었으면 None)"""
+        if self.ledger is None:
+            return None
+        return self.ledger.max_buy_quantity(to_order_exchange_code(exchange_code), price)
+
+    def local_max_sell_quantity(self, exchange_code: str, stock_code: str) -> Optional[int]:
+        """원장 기준 매도 가능 수량 (원장이 없거나 오래되었으면 None)"""
+        if self.ledger is None:
+            return None
+        return self.ledger.max_sell_quantity(to_order_exchange_code(exchange_code), stock_code)
+
+    # 호가
+    @traced("trading.get_hoga_info_overseas")
+    async def get_hoga_info_overseas(self, exchange_code: str, stock_code: str):
+        return await self.api.get_hoga_info_overseas(exchange_code, stock_code)
+
+    # 매수가능금액
+    @traced("trading.get_buyable_amount_overseas")
+    async def get_buyable_amount_overseas(self, exchange_code: str, stock_code: str, price: float):
+        buyable = await self.api.get_buyable_amount_overseas(exchange_code, stock_code, price)
+        apply_buyable(self.ledger, buyable, exchange_code, stock_code, price)
+        return buyable
+
+    @traced("trading.get_overseas_holding")
+    async def get_overseas_holding(self, exchange_code: str, stock_code: str):
+        """보유 종목 한 건 조회 (잔고를 페이지 단위로 읽다가 찾으면 중단)"""
+        upper_exchange_code = to_order_exchange_code(exchange_code)
+        upper_stock_code = stock_code.upper()
+        pages = self.api.iter_account_balance_overseas()
+        try:
+            async for _, holdings in pages:
+                holding = holdings.find(upper_stock_code, upper_exchange_code)
+                if holding is not None:
+                    return holding
+        except Exception as e:
+            logger.error(f"Error getting overseas holding: {e}")
+        finally:
+            await pages.aclose()
+        return None
+
+    @traced("trading.prepare_overseas_order")
+    async def prepare_overseas_order(self, exchange_code: str, stock_code: str, action: str,
+                                     quantity: int = 0) -> PreTradeContext:
+        """주문 전 필요한 정보만 조회하여 PreTradeContext 로 반환 (수량 0 이면 최대 수량 계산)
+
+        매수는 매수가능금액 조회에 호가가 필요하므로 호가 → 매수가능금액 순서로,
+        매도는 호가와 보유 종목을 동시에 조회합니다.
+        원장(self.ledger)이 최근에 대사되었으면 최대 수량은 API 대신 원장으로 계산합니다.
+        """
+        context = PreTradeContext(exchange_code, stock_code.upper(), action)
+        if action == "buy":
+            context.hoga = await self.get_hoga_info_overseas(exchange_code, stock_code)
+            if not context.hoga:
+                logger.error("Failed to get overseas hoga info")
+            elif not quantity:
+                quantity = self.local_max_buy_quantity(exchange_code, context.price)
+                if quantity is None:
+                    context.buyable = await self.get_buyable_amount_overseas(
+                        exchange_code, stock_code, context.hoga['ask_price'])
+                    if not context.buyable:
+                        logger.error("Failed to get overseas buyable amount")
+            context.quantity = quantity or context.max_buy_quantity
+        elif action == "sell":
+            if not quantity:
+                quantity = self.local_max_sell_quantity(exchange_code, stock_code)
+                if quantity == 0:
+                    logger.error(f"No sellable quantity in ledger for {to_order_exchange_code(exchange_code)}:{context.stock_code}")
+            if quantity is not None:
+                context.hoga = await self.get_hoga_info_overseas(exchange_code, stock_code)
+            else:
+                context.hoga, context.holding = await asyncio.gather(
+                    self.get_hoga_info_overseas(exchange_code, stock_code),
+                    self.get_overseas_holding(exchange_code, stock_code),
+                )
+                if context.holding is None:
+                    logger.error(f"No holding found for {to_order_exchange_code(exchange_code)}:{context.stock_code}")
+            context.quantity = quantity or context.max_sell_quantity
+        else:
+            raise ValueError(f"Invalid action: {action}")
+        return context
+
+    # 최대 매수 가능 수량 계산
+    @traced("trading.calculate_overseas_max_buy_quantity")
+    async def calculate_overseas_max_buy_quantity(self, exchange_code: str, stock_code: str) -> int:
+        """해외주식 최대 매수 가능 수량 계산"""
+        try:
+            context = await self.prepare_overseas_order(exchange_code, stock_code, "buy")
+            logger.info(f"Calculated max buy quantity: {context.quantity}")
+            return context.quantity
+
+        except Exception as e:
+            logger.error(f"Error calculating overseas max buy quantity: {e}")
+            return 0
+
+    @traced("trading.calculate_overseas_max_sell_quantity")
+    async def calculate_overseas_max_sell_quantity(self, exchange_code: str, stock_code: str) -> int:
+        """해외주식 최대 매도 가능 수량 계산"""
+        try:
+            quantity = self.local_max_sell_quantity(exchange_code, stock_code)
+            if quantity is not None:
+                logger.info(f"Calculated max sell quantity from ledger: {quantity}")
+                return quantity
+
+            holding = await self.get_overseas_holding(exchange_code, stock_code)
+            if holding is None:
+                logger.error(f"No holding found for {to_order_exchange_code(exchange_code)}:{stock_code.upper()}")
+                return 0
+
+            quantity = int(holding.sellable_quantity or 0)
+            logger.info(f"Calculated max sell quantity: {quantity}")
+            return quantity
+
+        except Exception as e:
+            logger.error(f"Error calculating overseas max sell quantity: {e}")
+            return 0
@@ -0,0 +1,295 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+from app.models.webhook import TradingViewAlert
+from app.core.tracing import trace
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 알림 처리 상태
+QUEUED = "queued"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+INTERRUPTED = "interrupted"  # 처리 도중 프로세스가 종료되어 주문 여부를 알 수 없음
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class WebhookQueue:
+    """SQLite(WAL) 기반 웹훅 알림 큐
+
+    웹훅 요청은 알림을 기록만 하고 바로 응답하며, WebhookWorkerPool 이 큐를 비우면서 주문을 처리합니다.
+    같은 파일을 쓰는 여러 uvicorn 워커가 동시에 꺼내더라도 한 알림은 한 워커만 처리합니다.
+    상계 대상 알림은 net_key(거래소:종목)와 함께 기록하고, 상계 구간이 지난 뒤
+    같은 net_key 의 알림을 한 번에 꺼내므로 어느 워커에 도착한 알림이든 함께 상계됩니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS webhook_alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                net_key TEXT,
+                worker_pid INTEGER,
+                result TEXT,
+                error TEXT,
+                received_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )""")
+        # 이전 버전에서 만든 큐 파일에는 net_key 열이 없음
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(webhook_alerts)")]
+        if "net_key" not in columns:
+            self._conn.execute("ALTER TABLE webhook_alerts ADD COLUMN net_key TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_webhook_alerts_status ON webhook_alerts (status, id)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_webhook_alerts_net_key ON webhook_alerts (net_key, status)")
+        # 중복 알림 판별 키 (IdempotencyIndex 의 영구 기록)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS webhook_dedup (
+                key TEXT PRIMARY KEY,
+                alert_id INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )""")
+
+    def enqueue(self, payload: dict, dedup_key: Optional[str] = None, dedup_ttl: float = 0.0,
+                net_key: Optional[str] = None) -> Tuple[int, bool]:
+        """알림 추가, (alert_id, 중복 여부) 반환
+
+        net_key 가 있으면 같은 net_key 의 알림과 함께 상계 대상으로 꺼냅니다.
+        dedup_key 가 유효기간 안에 이미 기록되어 있으면 새로 넣지 않고 원래 alert_id 를 돌려줍니다.
+        키 확인과 추가를 한 트랜잭션에서 처리하므로 여러 워커에 동시에 도착한 재전송도 한 번만 접수됩니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if dedup_key:
+                    row = self._conn.execute(
+                        "SELECT alert_id FROM webhook_dedup WHERE key = ? AND expires_at > ?",
+                        (dedup_key, now)).fetchone()
+                    if row:
+                        self._conn.execute("COMMIT")
+                        return row[0], True
+                cur = self._conn.execute(
+                    "INSERT INTO webhook_alerts (payload, status, net_key, received_at) VALUES (?, ?, ?, ?)",
+                    (json.dumps(payload), QUEUED, net_key, now))
+                alert_id = cur.lastrowid
+                if dedup_key:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO webhook_dedup (key, alert_id, expires_at) VALUES (?, ?, ?)",
+                        (dedup_key, alert_id, now + dedup_ttl))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return alert_id, False
+
+    def claim(self, net_window: float = 0.0) -> List[Tuple[int, dict]]:
+        """가장 오래된 대기 알림을 처리 중으로 바꾸고 반환 (없으면 빈 목록)
+
+        상계 대상 알림은 접수 후 net_window 초가 지나야 꺼내며, 그 알림부터 net_window 초 안에
+        접수된 같은 net_key 의 알림을 모두 함께 꺼냅니다. 한 트랜잭션에서 처리하므로
+        여러 프로세스가 동시에 꺼내더라도 한 묶음은 한 워커만 가져갑니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """SELECT id, net_key, received_at FROM webhook_alerts
+                       WHERE status = ? AND (net_key IS NULL OR received_at <= ?)
+                       ORDER BY id LIMIT 1""",
+                    (QUEUED, now - net_window)).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return []
+                alert_id, net_key, received_at = row
+                if net_key is None:
+                    rows = self._conn.execute(
+                        """UPDATE webhook_alerts SET status = ?, worker_pid = ?, started_at = ?
+                           WHERE id = ? RETURNING id, payload""",
+                        (PROCESSING, os.getpid(), now, alert_id)).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        """UPDATE webhook_alerts SET status = ?, worker_pid = ?, started_at = ?
+                           WHERE status = ? AND net_key = ? AND received_at < ?
+                           RETURNING id, payload""",
+                        (PROCESSING, os.getpid(), now, QUEUED, net_key, received_at + net_window)).fetchall()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return sorted((row[0], json.loads(row[1])) for row in rows)
+
+    def next_net_due(self, net_window: float) -> Optional[float]:
+        """상계 구간이 끝나 꺼낼 수 있게 되기까지 남은 시간(초), 대기 중인 상계 알림이 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(received_at) FROM webhook_alerts WHERE status = ? AND net_key IS NOT NULL",
+                (QUEUED,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return max(row[0] + net_window - time.time(), 0.0)
+
+    def complete(self, alert_id: int, result: dict):
+        self._finish(alert_id, DONE, result=json.dumps(result, default=str))
+
+    def fail(self, alert_id: int, error: str):
+        """처리 실패 기록, 재전송된 알림은 다시 처리하도록 중복 판별 키도 제거"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE webhook_alerts SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (FAILED, None, error, time.time(), alert_id))
+                self._conn.execute("DELETE FROM webhook_dedup WHERE alert_id = ?", (alert_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _finish(self, alert_id: int, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE webhook_alerts SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), alert_id))
+
+    def recover(self) -> int:
+        """종료된 프로세스가 처리 중이던 알림을 interrupted 로 표시
+
+        주문 전송 여부를 알 수 없으므로 중복 주문을 피하기 위해 자동으로 재처리하지 않습니다.
+        """
+        with self._lock:
+            pids = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT worker_pid FROM webhook_alerts WHERE status = ?", (PROCESSING,))]
+            dead = [pid for pid in pids if not _pid_alive(pid)]
+            recovered = 0
+            for pid in dead:
+                cur = self._conn.execute(
+                    "UPDATE webhook_alerts SET status = ?, finished_at = ? WHERE status = ? AND worker_pid IS ?",
+                    (INTERRUPTED, time.time(), PROCESSING, pid))
+                recovered += cur.rowcount
+            # 만료된 중복 판별 키 정리
+            self._conn.execute("DELETE FROM webhook_dedup WHERE expires_at <= ?", (time.time(),))
+            return recovered
+
+    def get(self, alert_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT id, payload, status, result, error, received_at, started_at, finished_at
+                   FROM webhook_alerts WHERE id = ?""", (alert_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "alert_id": row[0],
+            "alert": json.loads(row[1]),
+            "status": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+            "received_at": row[5],
+            "started_at": row[6],
+            "finished_at": row[7],
+        }
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM webhook_alerts GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class WebhookWorkerPool:
+    """큐에 쌓인 알림을 꺼내 WebhookService 로 처리하는 asyncio 워커들"""
+
+    # 다른 프로세스가 넣은 알림을 확인하는 주기(초)
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, queue: WebhookQueue, webhook_service, concurrency: int = 2):
+        self.queue = queue
+        self.webhook_service = webhook_service
+        self.concurrency = concurrency
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    async def start(self):
+        recovered = await asyncio.to_thread(self.queue.recover)
+        if recovered:
+            logger.warning(f"Marked {recovered} in-flight webhook alerts as interrupted")
+        self._tasks = [asyncio.create_task(self._run(i)) for i in range(self.concurrency)]
+        logger.info(f"Webhook worker pool started ({self.concurrency} workers)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Webhook worker pool stopped")
+
+    def notify(self):
+        """새 알림이 들어왔음을 알림 (같은 프로세스에서 enqueue 한 경우)"""
+        self._wakeup.set()
+
+    async def _run(self, worker_id: int):
+        net_window = self.webhook_service.net_window
+        while True:
+            # 조회 전에 초기화해야 조회와 대기 사이에 들어온 알림 신호를 놓치지 않음
+            self._wakeup.clear()
+            claimed = await asyncio.to_thread(self.queue.claim, net_window)
+            if not claimed:
+                timeout = self.POLL_INTERVAL
+                if net_window:
+                    # 상계 구간이 끝나는 알림이 있으면 그때 바로 꺼냄
+                    due = await asyncio.to_thread(self.queue.next_net_due, net_window)
+                    if due is not None:
+                        timeout = min(timeout, due)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process(claimed, worker_id)
+
+    async def _process(self, claimed: List[Tuple[int, dict]], worker_id: int):
+        alert_ids = [alert_id for alert_id, _ in claimed]
+        try:
+            with trace("webhook.process", trace_id=f"alert-{alert_ids[0]}") as t:
+                alerts = [TradingViewAlert(**payload) for _, payload in claimed]
+                result = await self.webhook_service.process_batch(alerts)
+            result = dict(result, timing=t.summary())
+            for alert_id in alert_ids:
+                await asyncio.to_thread(self.queue.complete, alert_id, result)
+            logger.info(f"Webhook alerts {alert_ids} processed by worker {worker_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing webhook alerts {alert_ids}: {e}")
+            for alert_id in alert_ids:
+                await asyncio.to_thread(self.queue.fail, alert_id, str(e))
@@ -0,0 +1,122 @@
+from typing import List, Optional
+from app.core.constants import OrderType
+from app.core.exchange_codes import ExchangeCodeConverter
+from app.models.webhook import TradingViewAlert
+from app.services.trading_service import AsyncTradingService
+from app.services.signal_netting import SignalNetter
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AlertProcessingError(Exception):
+    """알림을 주문으로 처리하지 못한 경우 (status_code 는 동기 응답에 사용할 HTTP 코드)"""
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+def resolve_exchange(alert: TradingViewAlert) -> str:
+    """TradingView exchange 코드를 내부 거래소 이름으로 변환"""
+    exchange = ExchangeCodeConverter.from_tradingview(alert.exchange)
+    if not exchange:
+        raise ValueError(f"Invalid exchange code from TradingView: {alert.exchange}")
+    return exchange.name
+
+class WebhookService:
+    """TradingView 알림 한 건을 호가 조회 → 수량 계산 → 주문으로 처리"""
+
+    def __init__(self, trading_service: Optional[AsyncTradingService] = None, netting_window_ms: float = 0):
+        self.trading_service = trading_service or AsyncTradingService()
+        # 상계 구간이 0보다 크면 같은 종목 알림을 모아 순수량만 주문
+        self.netter = SignalNetter(self.process_alert, netting_window_ms) if netting_window_ms > 0 else None
+
+    def nets(self, alert: TradingViewAlert) -> bool:
+        """상계 대상 여부 (수량 0 = 최대 수량 주문은 상계할 수 없으므로 바로 처리)"""
+        return self.netter is not None and alert.quantity > 0 and alert.market != "korea"
+
+    @property
+    def net_window(self) -> float:
+        """상계 구간(초), 상계하지 않으면 0"""
+        return self.netter.window if self.netter is not None else 0.0
+
+    def net_key(self, alert: TradingViewAlert) -> Optional[str]:
+        """큐에서 함께 상계할 알림을 묶는 키 (거래소:종목), 상계 대상이 아니면 None"""
+        if not self.nets(alert):
+            return None
+        return f"{resolve_exchange(alert)}:{alert.symbol.upper()}"
+
+    async def submit_alert(self, alert: TradingViewAlert) -> dict:
+        """큐를 쓰지 않는 경우의 알림 처리 진입점 (상계 대상이면 이 프로세스의 상계 구간을 거쳐 주문)"""
+        if self.nets(alert):
+            return await self.netter.submit(resolve_exchange(alert), alert)
+        return await self.process_alert(alert)
+
+    async def process_batch(self, alerts: List[TradingViewAlert]) -> dict:
+        """큐에서 함께 꺼낸 알림 처리 (같은 net_key 의 알림이면 상계하여 한 번만 주문)"""
+        if not self.nets(alerts[0]):
+            return await self.process_alert(alerts[0])
+        return await self.netter.net(resolve_exchange(alerts[0]), alerts)
+
+    async def process_alert(self, alert: TradingViewAlert) -> dict:
+        trading_service = self.trading_service
+        upper_exchange_code = resolve_exchange(alert)
+        upper_symbol = alert.symbol.upper()
+
+        # 주문 파라미터 로깅
+        logger.info(f"Placing order: timeframe={alert.timeframe}, symbol={upper_symbol}, "
+                    f"exchange={upper_exchange_code}, quantity={alert.quantity}")
+
+        # market에 따라 주문 실행
+        if alert.market == "korea":
+            # 기존 국내 주식 로직
+            return {"status": "skipped", "message": "Domestic market alerts are not supported"}
+
+        # 호가/매수가능금액/보유 수량을 필요한 만큼만 한 번에 조회
+        context = await trading_service.prepare_overseas_order(
+            upper_exchange_code, upper_symbol, alert.action, alert.quantity)
+        if not context.hoga:
+            raise AlertProcessingError("Failed to get hoga information", 404)
+
+        quantity, price = context.quantity, context.price
+        if alert.action == "buy":
+            # 수량이 0이면 최대 매수 가능 수량
+            if not quantity:
+                raise AlertProcessingError("Failed to calculate buy quantity")
+            result = await trading_service.place_buy_order_overseas(
+                exchange_code=upper_exchange_code,
+                stock_code=upper_symbol,
+                price=price,
+                quantity=quantity,
+                order_type=OrderType.LIMIT
+            )
+        else:
+            # 수량이 0이면 최대 매도 가능 수량
+            if not quantity:
+                raise AlertProcessingError("No holdings available for sell")
+            result = await trading_service.place_sell_order_overseas(
+                exchange_code=upper_exchange_code,
+                stock_code=upper_symbol,
+                price=price,
+                quantity=quantity,
+                order_type=OrderType.LIMIT
+            )
+
+        if not result:
+            raise AlertProcessingError("Order failed")
+
+        # result 객체에서 필요한 정보만 추출
+        body = result.get_body()
+        order_info = {
+            "rt_cd": body.rt_cd,
+            "msg_cd": body.msg_cd,
+            "msg1": body.msg1,
+            "output": body.output
+        }
+
+        return {
+            "status": "success",
+            "order_info": order_info,
+            "quantity": quantity,
+            "price": price
+        }
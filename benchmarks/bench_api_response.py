@@ -0,0 +1,128 @@
+"""APIResponse 파싱 마이크로 벤치마크
+
+기존 구현(요청마다 namedtuple 클래스 생성 + json 3회 파싱)과 현재 APIResponse 를
+같은 응답으로 비교합니다. 네트워크 없이 실행됩니다.
+
+    python benchmarks/bench_api_response.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import timeit
+import tracemalloc
+from collections import namedtuple
+
+from app.core.utils import APIResponse
+
+
+class FakeResponse:
+    """requests.Response 와 같은 인터페이스 (json() 은 호출될 때마다 파싱)"""
+
+    def __init__(self, text, headers):
+        self.status_code = 200
+        self.text = text
+        self.headers = headers
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class LegacyAPIResponse:
+    """변경 전 APIResponse (비교용)"""
+
+    def __init__(self, response):
+        self.res_code = response.status_code
+        self.resp = response
+        self._header = self._set_header()
+        self._body = self._set_body()
+        self.error_code = self._body.rt_cd
+        self.error_msg = self._body.msg1
+
+    def _set_header(self):
+        fld = dict()
+        for x in self.resp.headers.keys():
+            if x.islower():
+                fld[x] = self.resp.headers.get(x)
+        _th_ = namedtuple('header', fld.keys())
+        return _th_(**fld)
+
+    def _set_body(self):
+        _tb_ = namedtuple('body', self.resp.json().keys())
+        return _tb_(**self.resp.json())
+
+    def get_body(self):
+        return self._body
+
+    def is_ok(self):
+        try:
+            return self.get_body().rt_cd == '0'
+        except Exception:
+            return False
+
+    def get_json(self):
+        return self.resp.json()
+
+
+def make_response(rows=20):
+    body = {
+        "rt_cd": "0",
+        "msg_cd": "KIOK0000",
+        "msg1": "정상처리 되었습니다.",
+        "ctx_area_fk200": "",
+        "ctx_area_nk200": "",
+        "output1": [{
+            "ovrs_pdno": f"SYM{i}", "ovrs_excg_cd": "NASD", "ovrs_item_name": f"ITEM {i}",
+            "ovrs_cblc_qty": "10", "ord_psbl_qty": "10", "pchs_avg_pric": "100.0",
+            "evlu_pfls_rt": "1.5", "now_pric2": "101.5", "frcr_evlu_pfls_amt": "15.0",
+        } for i in range(rows)],
+        "output2": {"tot_evlu_pfls_amt": "300.0"},
+    }
+    headers = {
+        "Content-Type": "application/json; charset=utf-8",
+        "tr_id": "TTTS3012R",
+        "tr_cont": "D",
+        "gt_uid": "0000000000000000000000000",
+    }
+    return FakeResponse(json.dumps(body), headers)
+
+
+def use(cls, response):
+    # 실제 호출 경로와 같이 파싱 → is_ok → 필드 접근 → get_json
+    ar = cls(response)
+    if ar.is_ok():
+        ar.get_body().output1
+        ar.get_body().output2
+    ar.get_json()
+    return ar
+
+
+def measure(cls, response, number):
+    seconds = min(timeit.repeat(lambda: use(cls, response), number=number, repeat=5))
+    tracemalloc.start()
+    for _ in range(1000):
+        use(cls, response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    use(cls, response)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+    return seconds / number * 1e6, allocated, peak
+
+
+def main(number=2000):
+    for rows in (1, 20, 100):
+        response = make_response(rows)
+        legacy_us, legacy_alloc, legacy_peak = measure(LegacyAPIResponse, response, number)
+        new_us, new_alloc, new_peak = measure(APIResponse, response, number)
+        print(f"rows={rows:>3}  legacy {legacy_us:8.2f} us/resp, {legacy_alloc:>7} B alloc | "
+              f"current {new_us:8.2f} us/resp, {new_alloc:>7} B alloc | "
+              f"speedup x{legacy_us / new_us:.1f}, peak {legacy_peak} -> {new_peak} B")
+
+
+if __name__ == "__main__":
+    main()
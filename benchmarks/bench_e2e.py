@@ -0,0 +1,260 @@
+"""엔드투엔드 지연시간/처리량 벤치마크
+
+로컬 KIS 대역 서버(benchmarks/mock_kis.py)와 앱을 각각 uvicorn 으로 띄운 뒤,
+웹훅과 trading 라우트를 정해진 동시성으로 호출하여 p50/p90/p99 지연과 처리량을 출력합니다.
+네트워크 없이 실행되므로 성능 변경 전후를 같은 조건으로 비교할 수 있습니다.
+
+    python benchmarks/bench_e2e.py
+    python benchmarks/bench_e2e.py --scenario webhook --concurrency 1 8 32 --requests 500
+    python benchmarks/bench_e2e.py --latency-ms 50 --throttle-rate 0.05 --json result.json
+    python benchmarks/bench_e2e.py --workers 4 --shared-state --max-tps 20
+
+이미 실행 중인 앱/대역 서버를 쓰려면 --app-url / --mock-url 을 지정합니다.
+웹훅 시나리오는 202 응답까지의 지연과 별도로, 큐에 넣은 알림이 모두 처리될 때까지의 처리량도 측정합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import itertools
+import json
+import socket
+import subprocess
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "GOOGL", "META", "AMD"]
+
+
+def _alert(i):
+    return {
+        "timeframe": "1m",
+        "action": "buy" if i % 2 == 0 else "sell",
+        "symbol": SYMBOLS[i % len(SYMBOLS)],
+        "quantity": 1,
+        "price": 100.5,
+        "exchange": "NASDAQ",
+        # 중복 알림으로 걸러지지 않도록 요청마다 다른 ID
+        "alert_id": f"bench-{uuid.uuid4().hex}",
+    }
+
+
+# 시나리오: 이름 -> (메서드, 경로, 요청 i 에 대한 kwargs)
+SCENARIOS = {
+    "webhook": ("POST", "/api/v1/webhook/tradingview", lambda i: {"json": _alert(i)}),
+    "overseas-hoga": ("GET", "/api/v1/trading/overseas/hoga/NASDAQ/{symbol}", lambda i: {}),
+    "overseas-price": ("GET", "/api/v1/trading/overseas/current-price/NAS/{symbol}", lambda i: {}),
+    "overseas-balance": ("GET", "/api/v1/trading/overseas/balance", lambda i: {}),
+    "overseas-orders": ("GET", "/api/v1/trading/overseas/orders", lambda i: {}),
+    "overseas-buy": ("POST", "/api/v1/trading/overseas/order/buy", lambda i: {"params": {
+        "exchange_code": "NASDAQ", "stock_code": SYMBOLS[i % len(SYMBOLS)], "price": 100.5, "quantity": 1}}),
+    "balance": ("GET", "/api/v1/trading/balance", lambda i: {}),
+    "hoga": ("GET", "/api/v1/trading/hoga/005930", lambda i: {}),
+    "orders": ("GET", "/api/v1/trading/orders", lambda i: {}),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not start: {url}")
+
+
+@contextmanager
+def serve(module, port, env, log_path, workers=1):
+    """uvicorn 으로 module 을 띄우고 종료 시 정리"""
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning", "--workers", str(workers)],
+            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_ready(f"http://127.0.0.1:{port}/docs")
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def app_env(mock_url, workdir, args):
+    env = dict(os.environ)
+    env.update({
+        "URL": mock_url,
+        "API_KEY": "bench-key",
+        "API_SECRET_KEY": "bench-secret",
+        "STOCK_ACCOUNT_NUMBER": "12345678",
+        "HTS_ID": "bench",
+        "CUSTTYPE": "P",
+        "MY_AGENT": "bench",
+        "IS_PAPER_TRADING": "false",
+        "REALTIME_ENABLED": "false",
+        "TOKEN_STORE_PATH": os.path.join(workdir, "token.json"),
+        "WEBHOOK_QUEUE_ENABLED": "false" if args.inline_webhook else "true",
+        "WEBHOOK_QUEUE_PATH": os.path.join(workdir, "webhook_queue.db"),
+        "SHARED_STATE_DIR": os.path.join(workdir, "shared") if args.shared_state else "",
+    })
+    return env
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(name, concurrency, latencies, statuses, elapsed):
+    latencies = sorted(latencies)
+    ok = sum(1 for s in statuses if 200 <= s < 300)
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(statuses),
+        "ok": ok,
+        "errors": len(statuses) - ok,
+        "throughput_rps": round(len(statuses) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p90_ms": round(percentile(latencies, 90), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+async def run_load(client, name, concurrency, requests):
+    method, path, make_kwargs = SCENARIOS[name]
+    counter = itertools.count()
+    latencies, statuses = [], []
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            url = path.format(symbol=SYMBOLS[i % len(SYMBOLS)])
+            started = time.perf_counter()
+            try:
+                res = await client.request(method, url, **make_kwargs(i))
+                status = res.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses.append(status)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(name, concurrency, latencies, statuses, time.perf_counter() - started)
+
+
+async def wait_webhook_drain(client, started, timeout=120.0):
+    """큐에 남은 알림이 없을 때까지 기다린 뒤 (처리 완료까지 걸린 시간, 상태별 건수)"""
+    deadline = time.monotonic() + timeout
+    counts = {}
+    while time.monotonic() < deadline:
+        counts = (await client.get("/stats")).json().get("webhook_queue") or {}
+        if not counts.get("queued") and not counts.get("processing"):
+            break
+        await asyncio.sleep(0.05)
+    return time.perf_counter() - started, counts
+
+
+async def run_scenarios(app_url, mock_url, args):
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 8)
+    results = []
+    async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=60.0) as client, \
+            httpx.AsyncClient(base_url=mock_url, timeout=10.0) as mock:
+        await mock.post("/mock/config", json={
+            "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+            "throttle_rate": args.throttle_rate, "max_tps": args.max_tps})
+        for name in args.scenario:
+            for concurrency in args.concurrency:
+                # 캐시 영향 없이 비교하려면 --warmup 0
+                if args.warmup:
+                    await run_load(client, name, concurrency, args.warmup)
+                    if name == "webhook" and not args.inline_webhook:
+                        await wait_webhook_drain(client, time.perf_counter())
+                await mock.post("/mock/reset")
+                queue_before = (await client.get("/stats")).json().get("webhook_queue") or {}
+                started = time.perf_counter()
+                result = await run_load(client, name, concurrency, args.requests)
+                if name == "webhook" and not args.inline_webhook:
+                    drained, counts = await wait_webhook_drain(client, started)
+                    processed = counts.get("done", 0) - queue_before.get("done", 0)
+                    result["processed"] = processed
+                    result["failed"] = counts.get("failed", 0) - queue_before.get("failed", 0)
+                    result["processed_rps"] = round(processed / drained, 1) if drained else 0.0
+                result["kis_calls"] = sum((await mock.get("/mock/stats")).json()["calls"].values())
+                results.append(result)
+                print_result(result)
+    return results
+
+
+def print_result(r):
+    line = (f"{r['scenario']:<18} c={r['concurrency']:<4} n={r['requests']:<5} ok={r['ok']:<5} "
+            f"rps={r['throughput_rps']:<8} p50={r['p50_ms']:<8} p90={r['p90_ms']:<8} "
+            f"p99={r['p99_ms']:<8} max={r['max_ms']:<8} kis_calls={r['kis_calls']}")
+    if "processed" in r:
+        line += f" processed={r['processed']} failed={r['failed']} processed_rps={r['processed_rps']}"
+    print(line, flush=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", default=["webhook", "overseas-hoga", "overseas-balance", "overseas-buy"],
+                        choices=sorted(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="시나리오/동시성 조합마다 보낼 요청 수")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="대역 서버 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-tps", type=float, default=0.0, help="대역 서버 초당 허용 호출 수 (0: 제한 없음)")
+    parser.add_argument("--workers", type=int, default=1, help="앱 uvicorn 워커 수")
+    parser.add_argument("--shared-state", action="store_true", help="워커 간 속도 제한/캐시 공유 (SHARED_STATE_DIR)")
+    parser.add_argument("--inline-webhook", action="store_true", help="큐 없이 요청 안에서 주문까지 처리")
+    parser.add_argument("--app-url", help="이미 실행 중인 앱 주소 (지정하지 않으면 띄움)")
+    parser.add_argument("--mock-url", help="이미 실행 중인 대역 서버 주소 (지정하지 않으면 띄움)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="bench_e2e_") as workdir, ExitStack() as servers:
+        mock_url = args.mock_url or servers.enter_context(serve(
+            "benchmarks.mock_kis:app", free_port(), dict(os.environ), os.path.join(workdir, "mock.log")))
+        app_url = args.app_url or servers.enter_context(serve(
+            "app.main:app", free_port(), app_env(mock_url, workdir, args), os.path.join(workdir, "app.log"),
+            args.workers))
+        results = asyncio.run(run_scenarios(app_url, mock_url, args))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
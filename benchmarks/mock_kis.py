@@ -0,0 +1,257 @@
+"""로컬 KIS OpenAPI 대역 서버 (벤치마크/수동 테스트용)
+
+이 프로젝트가 호출하는 엔드포인트(tokenP, Approval, hashkey, 시세, 잔고, 주문, 정정취소, 미체결)를
+실제 응답과 같은 필드로 흉내 냅니다. 응답 지연과 오류/스로틀(EGW00201) 발생 비율을 설정할 수 있습니다.
+
+    MOCK_KIS_LATENCY_MS=50 uvicorn benchmarks.mock_kis:app --port 8766
+
+앱은 URL=http://127.0.0.1:8766 으로 실행하면 됩니다.
+실행 중 설정 변경은 POST /mock/config, 호출 통계는 GET /mock/stats 로 확인합니다.
+
+설정 (환경 변수 / POST /mock/config 키)
+    MOCK_KIS_LATENCY_MS  / latency_ms     기본 응답 지연(ms)
+    MOCK_KIS_JITTER_MS   / jitter_ms      지연에 더할 무작위 값의 최대(ms)
+    MOCK_KIS_ERROR_RATE  / error_rate     rt_cd=1 업무 오류 응답 비율 (0~1)
+    MOCK_KIS_THROTTLE_RATE / throttle_rate  HTTP 500 + EGW00201 응답 비율 (0~1)
+    MOCK_KIS_MAX_TPS     / max_tps        초당 허용 호출 수, 초과 시 EGW00201 (0 이면 제한 없음)
+                         / tr_latency_ms  tr_id 별 지연(ms) {"TTTT1002U": 80, ...}
+"""
+import asyncio
+import itertools
+import os
+import random
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+THROTTLE_ERROR = {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+BUSINESS_ERROR = {"rt_cd": "1", "msg_cd": "APBK0919", "msg1": "모의 오류 응답입니다."}
+OK = {"rt_cd": "0", "msg_cd": "KIOK0000", "msg1": "정상처리 되었습니다."}
+ORDER_OK = {"rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다."}
+
+# 조회 응답에 쓸 종목/미체결 수
+HOLDINGS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "GOOGL", "META", "AMD"]
+DOMESTIC_HOLDINGS = ["005930", "000660", "035420"]
+OPEN_ORDERS_PER_EXCHANGE = 4
+PAGE_SIZE = 3
+
+config = {
+    "latency_ms": float(os.getenv("MOCK_KIS_LATENCY_MS", "20")),
+    "jitter_ms": float(os.getenv("MOCK_KIS_JITTER_MS", "5")),
+    "error_rate": float(os.getenv("MOCK_KIS_ERROR_RATE", "0")),
+    "throttle_rate": float(os.getenv("MOCK_KIS_THROTTLE_RATE", "0")),
+    "max_tps": float(os.getenv("MOCK_KIS_MAX_TPS", "0")),
+    "tr_latency_ms": {},
+}
+
+calls = Counter()
+injected = Counter()
+_recent = deque()
+_order_no = itertools.count(1)
+
+app = FastAPI(title="Mock KIS OpenAPI")
+
+
+def _over_tps() -> bool:
+    """최근 1초 호출 수가 max_tps 를 넘었는지"""
+    if config["max_tps"] <= 0:
+        return False
+    now = time.monotonic()
+    while _recent and now - _recent[0] > 1.0:
+        _recent.popleft()
+    if len(_recent) >= config["max_tps"]:
+        return True
+    _recent.append(now)
+    return False
+
+
+async def respond(request: Request, body: dict, headers: dict = None, tradable: bool = True):
+    """지연/오류 주입 후 응답 (tradable=False 인 토큰/hashkey 는 업무 오류 주입 대상 아님)"""
+    tr_id = request.headers.get("tr_id", request.url.path)
+    calls[tr_id] += 1
+
+    latency = config["tr_latency_ms"].get(tr_id, config["latency_ms"])
+    latency += random.uniform(0, config["jitter_ms"])
+    if latency > 0:
+        await asyncio.sleep(latency / 1000)
+
+    if _over_tps() or random.random() < config["throttle_rate"]:
+        injected["throttle"] += 1
+        return JSONResponse(THROTTLE_ERROR, status_code=500)
+    if tradable and random.random() < config["error_rate"]:
+        injected["error"] += 1
+        return JSONResponse(BUSINESS_ERROR)
+    return JSONResponse(body, headers=headers)
+
+
+def _page(request: Request, ctx_key: str, rows: list):
+    """CTX_AREA_FK 로 페이지를 나누고 tr_cont 헤더(M: 다음 있음, D: 마지막)를 붙임"""
+    fk = request.query_params.get(ctx_key, "").strip()
+    page = int(fk) if fk.isdigit() else 0
+    start = page * PAGE_SIZE
+    more = start + PAGE_SIZE < len(rows)
+    ctx = {ctx_key.lower(): str(page + 1) if more else "",
+           ctx_key.lower().replace("fk", "nk"): "next" if more else ""}
+    return rows[start:start + PAGE_SIZE], ctx, {"tr_cont": "M" if more else "D"}
+
+
+def _now_hms() -> str:
+    return datetime.now().strftime("%H%M%S")
+
+
+# 인증
+
+@app.post("/oauth2/tokenP")
+async def token(request: Request):
+    return await respond(request, {
+        "access_token": f"mock-{int(time.time())}",
+        "token_type": "Bearer",
+        "expires_in": 86400,
+    }, tradable=False)
+
+
+@app.post("/oauth2/Approval")
+async def approval(request: Request):
+    return await respond(request, {"approval_key": "mock-approval-key"}, tradable=False)
+
+
+@app.post("/uapi/hashkey")
+async def hashkey(request: Request):
+    return await respond(request, {"HASH": "0" * 64}, tradable=False)
+
+
+# 국내 시세/잔고/주문
+
+@app.get("/uapi/domestic-stock/v1/quotations/inquire-price")
+async def domestic_price(request: Request):
+    return await respond(request, dict(OK, output={
+        "stck_prpr": "70000", "prdy_vrss": "500", "prdy_ctrt": "0.72", "acml_vol": "1000000"}))
+
+
+@app.get("/uapi/domestic-stock/v1/quotations/inquire-asking-price-exp-ccn")
+async def domestic_hoga(request: Request):
+    return await respond(request, dict(OK, output1={
+        "askp1": "70100", "bidp1": "70000", "askp_rsqn1": "120", "bidp_rsqn1": "340"},
+        output2={"stck_prpr": "70000"}))
+
+
+@app.get("/uapi/domestic-stock/v1/ranking/fluctuation")
+async def fluctuation_rank(request: Request):
+    rows = [{"stck_shrn_iscd": f"{i:06d}", "hts_kor_isnm": f"종목{i}", "prdy_ctrt": "5.0",
+             "cnnt_ascn_dynu": "1", "hgpr_vrss_prpr_rate": "-1.0"} for i in range(30)]
+    return await respond(request, dict(OK, output=rows))
+
+
+@app.get("/uapi/domestic-stock/v1/trading/inquire-balance")
+async def domestic_balance(request: Request):
+    rows = [{"pdno": s, "prdt_name": s, "hldg_qty": "10", "ord_psbl_qty": "10", "slpsb_qty": "10",
+             "pchs_unpr": "65000", "pftrt": "7.7", "prpr": "70000", "bfdy_cprs_icdc": "500",
+             "fltt_rt": "0.72", "tot_evlu_amt": "700000", "evlu_pfls_smtl_amt": "50000"}
+            for s in DOMESTIC_HOLDINGS]
+    rows, ctx, headers = _page(request, "CTX_AREA_FK100", rows)
+    return await respond(request, dict(OK, output1=rows, output2=[{"tot_evlu_amt": "2100000"}], **ctx), headers)
+
+
+@app.post("/uapi/domestic-stock/v1/trading/order-cash")
+async def domestic_order(request: Request):
+    return await respond(request, dict(ORDER_OK, output={
+        "KRX_FWDG_ORD_ORGNO": "06010", "ODNO": f"{next(_order_no):010d}", "ORD_TMD": _now_hms()}))
+
+
+@app.post("/uapi/domestic-stock/v1/trading/order-rvsecncl")
+async def domestic_cancel(request: Request):
+    return await respond(request, dict(ORDER_OK, output={
+        "KRX_FWDG_ORD_ORGNO": "06010", "ODNO": f"{next(_order_no):010d}", "ORD_TMD": _now_hms()}))
+
+
+@app.get("/uapi/domestic-stock/v1/trading/inquire-psbl-rvsecncl")
+async def domestic_open_orders(request: Request):
+    rows = [{"odno": f"D{i:09d}", "pdno": s, "ord_qty": "2", "ord_unpr": "70000", "ord_tmd": "090000",
+             "ord_gno_brno": "06010", "psbl_qty": "2", "sll_buy_dvsn_cd": "02"}
+            for i, s in enumerate(DOMESTIC_HOLDINGS)]
+    rows, ctx, headers = _page(request, "CTX_AREA_FK100", rows)
+    return await respond(request, dict(OK, output=rows, **ctx), headers)
+
+
+# 해외 시세/잔고/주문
+
+@app.get("/uapi/overseas-price/v1/quotations/price")
+async def overseas_price(request: Request):
+    return await respond(request, dict(OK, output={
+        "rsym": f"D{request.query_params.get('EXCD', '')}{request.query_params.get('SYMB', '')}",
+        "zdiv": "4", "base": "99.50", "last": "100.50", "diff": "1.00", "rate": "1.01", "tvol": "1000000"}))
+
+
+@app.get("/uapi/overseas-price/v1/quotations/inquire-asking-price")
+async def overseas_hoga(request: Request):
+    return await respond(request, dict(OK, output1={"curr": "USD", "zdiv": "4", "last": "100.50"},
+                                       output2={"pask1": "100.60", "pbid1": "100.40",
+                                                "vask1": "100", "vbid1": "120"}))
+
+
+@app.get("/uapi/overseas-stock/v1/trading/inquire-psamount")
+async def overseas_buyable(request: Request):
+    return await respond(request, dict(OK, output={
+        "tr_crcy_cd": "USD", "exrt": "1350.00", "ord_psbl_frcr_amt": "10000.00",
+        "max_ord_psbl_qty": "99", "ovrs_max_ord_psbl_qty": "99", "frcr_ord_psbl_amt1": "10000.00"}))
+
+
+@app.get("/uapi/overseas-stock/v1/trading/inquire-balance")
+async def overseas_balance(request: Request):
+    rows = [{"ovrs_pdno": s, "ovrs_excg_cd": "NASD", "ovrs_item_name": s, "ovrs_cblc_qty": "10",
+             "ord_psbl_qty": "10", "pchs_avg_pric": "95.00", "evlu_pfls_rt": "5.79", "now_pric2": "100.50",
+             "frcr_evlu_pfls_amt": "55.00"} for s in HOLDINGS]
+    rows, ctx, headers = _page(request, "CTX_AREA_FK200", rows)
+    return await respond(request, dict(OK, output1=rows, output2={"tot_evlu_pfls_amt": "440.00"}, **ctx), headers)
+
+
+@app.post("/uapi/overseas-stock/v1/trading/order")
+async def overseas_order(request: Request):
+    return await respond(request, dict(ORDER_OK, output={
+        "KRX_FWDG_ORD_ORGNO": "01790", "ODNO": f"{next(_order_no):010d}", "ORD_TMD": _now_hms()}))
+
+
+@app.post("/uapi/overseas-stock/v1/trading/order-rvsecncl")
+async def overseas_cancel(request: Request):
+    return await respond(request, dict(ORDER_OK, output={
+        "KRX_FWDG_ORD_ORGNO": "01790", "ODNO": f"{next(_order_no):010d}", "ORD_TMD": _now_hms()}))
+
+
+@app.get("/uapi/overseas-stock/v1/trading/inquire-nccs")
+async def overseas_open_orders(request: Request):
+    exchange = request.query_params.get("OVRS_EXCG_CD", "NASD")
+    rows = [{"odno": f"{exchange}{i:06d}", "pdno": HOLDINGS[i % len(HOLDINGS)], "ft_ord_qty": "5",
+             "ft_ord_unpr3": "100.00", "ord_tmd": "090000", "ovrs_excg_cd": exchange, "orgn_odno": "",
+             "nccs_qty": "5", "sll_buy_dvsn_cd": "02" if i % 2 else "01", "sll_buy_dvsn_cd_name": ""}
+            for i in range(OPEN_ORDERS_PER_EXCHANGE)]
+    rows, ctx, headers = _page(request, "CTX_AREA_FK200", rows)
+    return await respond(request, dict(OK, output=rows, **ctx), headers)
+
+
+# 대역 서버 제어
+
+@app.post("/mock/config")
+async def update_config(request: Request):
+    config.update(await request.json())
+    return config
+
+
+@app.get("/mock/stats")
+async def get_stats():
+    return {"config": config, "calls": dict(calls), "injected": dict(injected)}
+
+
+@app.post("/mock/reset")
+async def reset_stats():
+    calls.clear()
+    injected.clear()
+    return {"status": "reset"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=int(os.getenv("MOCK_KIS_PORT", "8766")), log_level="warning")